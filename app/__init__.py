@@ -4,6 +4,14 @@ from app.blueprints.customers import customers_bp
 from app.blueprints.mechanics import mechanics_bp
 from app.blueprints.tickets import tickets_bp
 from app.blueprints.inventory import inventory_bp
+from app.blueprints.internal import internal_bp
+from app.utils.json_provider import json_provider_class
+from app.utils.pool_stats import instrument
+from app.utils.sql_profiler import init_sql_profiler
+from app.utils.metrics import init_metrics
+from app.utils.seed import seed_command
+from app.utils.etags import stale_data_response
+from sqlalchemy.orm.exc import StaleDataError
 from flask_swagger_ui import get_swaggerui_blueprint
 
 SWAGGER_URL = "/docs" # URL for exposing swagger UI
@@ -18,6 +26,7 @@ swaggerui_blueprint = get_swaggerui_blueprint(
 
 def create_app(config_name: str):
     app = Flask(__name__)
+    app.json = json_provider_class()(app) # orjson when installed
     
     # Import appropriate config
     app.config.from_object(f"config.{config_name}")
@@ -29,11 +38,23 @@ def create_app(config_name: str):
     limiter.init_app(app)
     cache.init_app(app)
     
+    # Connection pool telemetry & request metrics, served at /internal/pool & /metrics
+    with app.app_context():
+        instrument(db.engine)
+        init_metrics(app, db.engine, limiter)
+    init_sql_profiler(app) # opt-in, SQL_PROFILER_ENABLED
+    
     # Register Blueprints
     app.register_blueprint(customers_bp, url_prefix="/customers")
     app.register_blueprint(mechanics_bp, url_prefix="/mechanics")
     app.register_blueprint(tickets_bp, url_prefix="/tickets")
     app.register_blueprint(inventory_bp, url_prefix="/inventory")
+    app.register_blueprint(internal_bp) # /internal/* & /metrics
     app.register_blueprint(swaggerui_blueprint, url_prefix=SWAGGER_URL)
     
+    # Optimistic locking on the row versions, a lost race is a 409 rather than a 500
+    app.register_error_handler(StaleDataError, stale_data_response)
+    
+    app.cli.add_command(seed_command) # flask seed, synthetic data
+    
     return app
\ No newline at end of file
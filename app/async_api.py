@@ -0,0 +1,236 @@
+from app import create_app
+from app.extensions import db, DEFAULT_RATE_LIMITS
+from app.models import Customer, Mechanic, Ticket, Inventory
+from app.blueprints.customers.schemas import customers_serializer
+from app.blueprints.mechanics.schemas import mechanics_serializer
+from app.blueprints.tickets.schemas import tickets_serializer
+from app.blueprints.inventory.schemas import inventory_items_serializer
+from app.blueprints.tickets.routes import TICKET_SORT_KEYS
+from app.utils.pagination import keyset_query, keyset_page, offset_query, parse_limit
+from app.utils.etags import entity_etag, collection_etag
+from app.utils.streaming import NDJSON_MIMETYPE, STREAM_BATCH_SIZE
+from app.utils.pool_stats import instrument
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route, Mount
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header, parse_etags
+from limits.storage import storage_from_string
+from contextlib import asynccontextmanager
+from functools import wraps
+import importlib.util
+import limits
+import limits.aio.strategies
+
+# ASGI entry point (`uvicorn asgi:app`). The read endpoints below run as async views over
+# an async SQLAlchemy engine, so a worker waiting on the database keeps serving other
+# requests. They build the same column-only queries as the Flask views & dump them with the
+# same serializers & JSON provider, so bodies, ETags & status codes are identical.
+# Everything else (writes, auth, search, invoices, ...) is the Flask app, mounted underneath.
+#
+# The async engine points at the Flask app's database, with its driver swapped for an
+# asyncio one (ASYNC_DRIVERS), or at ASYNC_DATABASE_URI when that's configured.
+
+# backend -> (async drivername, module the driver needs)
+ASYNC_DRIVERS = {
+    "sqlite": ("sqlite+aiosqlite", "aiosqlite"),
+    "postgresql": ("postgresql+asyncpg", "asyncpg"),
+    "mysql": ("mysql+aiomysql", "aiomysql")
+}
+
+def async_database_url(url):
+    """The database url with an asyncio driver, ValueError when none is known & installed for its backend"""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver known for '{backend}' databases, set ASYNC_DATABASE_URI to an asyncio URL")
+    drivername, module = ASYNC_DRIVERS[backend]
+    if importlib.util.find_spec(module) is None:
+        raise ValueError(f"'{drivername}' needs the {module} package (pip install -r requirements.txt), or set ASYNC_DATABASE_URI")
+    return url.set(drivername=drivername)
+
+# Rate limits mirror the Flask views' (Flask-Limiter can't see ASGI requests)
+def rate_limited(*limit_strings):
+    """Limits per client address, the app's default limits when none are given"""
+    route_limits = [limits.parse(s) for s in limit_strings]
+
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request):
+            state = request.app.state
+            if state.rate_limiter is not None:
+                key = request.client.host if request.client else "127.0.0.1"
+                for limit in route_limits or state.default_limits:
+                    if not await state.rate_limiter.hit(limit, view.__name__, key):
+                        return json_response(request, {"error": f"Rate limit exceeded: {limit}"}, 429)
+            return await view(request)
+        return wrapper
+    return decorator
+
+def json_response(request, data, status=200, etag=None):
+    """Encoded by the Flask app's JSON provider, so bodies match the sync views byte for byte"""
+    body = request.app.state.flask_app.json.response(data).get_data()
+    headers = {"ETag": f'"{etag}"'} if etag else None
+    return Response(body, status, headers=headers, media_type="application/json")
+
+def not_modified(request, etag):
+    if not parse_etags(request.headers.get("if-none-match")).contains_weak(etag):
+        return None
+    return Response(status_code=304, headers={"ETag": f'"{etag}"'})
+
+def wants_ndjson(request) -> bool:
+    accept = parse_accept_header(request.headers.get("accept"), MIMEAccept)
+    return accept.best_match(["application/json", NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+def wants_stream(request) -> bool:
+    return request.query_params.get("stream", "").lower() in ("1", "true") or wants_ndjson(request)
+
+def stream_rows(request, query, serializer):
+    """Async twin of app.utils.streaming.stream_rows, for column-only queries"""
+    ndjson = wants_ndjson(request)
+    dumps = request.app.state.flask_app.json.dumps
+
+    async def generate():
+        async with request.app.state.engine.connect() as connection:
+            result = await connection.stream(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+            first = True
+            if not ndjson:
+                yield "["
+            async for partition in result.partitions():
+                items = [dumps(item) for item in serializer.dump(partition)]
+                if ndjson:
+                    yield "\n".join(items) + "\n"
+                else:
+                    yield ("" if first else ",") + ",".join(items)
+                first = False
+            if not ndjson:
+                yield "]\n"
+
+    return StreamingResponse(generate(), media_type=NDJSON_MIMETYPE if ndjson else "application/json")
+
+async def fetch_all(request, query):
+    async with request.app.state.engine.connect() as connection:
+        return (await connection.execute(query)).all()
+
+async def fetch_one(request, query):
+    async with request.app.state.engine.connect() as connection:
+        return (await connection.execute(query)).one_or_none()
+
+async def get_entity(request, model, serializer, pk, missing_message):
+    query = select(*serializer.columns, model.version).where(model.id == pk)
+    row = await fetch_one(request, query)
+    if row is None:
+        return json_response(request, {"error": missing_message}, 404)
+
+    etag = entity_etag(model, row.id, row.version)
+    return not_modified(request, etag) or json_response(request, serializer.dump(row, many=False), etag=etag)
+
+async def get_paged_list(request, model, serializer):
+    """The page/per_page listings of customers & inventory"""
+    if wants_stream(request):
+        return stream_rows(request, select(*serializer.columns).order_by(model.id), serializer)
+
+    query = select(*serializer.columns, model.version).order_by(model.id)
+    try:
+        query = offset_query(query, request.query_params.get("page"), request.query_params.get("per_page"))
+    except (TypeError, ValueError):
+        pass # no or invalid paging, return every row
+    rows = await fetch_all(request, query)
+
+    etag = collection_etag(model, rows)
+    return not_modified(request, etag) or json_response(request, serializer.dump(rows), etag=etag)
+
+@rate_limited("60 per minute")
+async def get_tickets(request):
+    sort = request.query_params.get("sort", "id")
+    keys = TICKET_SORT_KEYS.get(sort)
+    if not keys:
+        return json_response(request, {"error": f"sort must be one of: {', '.join(TICKET_SORT_KEYS)}"}, 400)
+
+    if wants_stream(request):
+        return stream_rows(request, select(*tickets_serializer.columns).order_by(*keys), tickets_serializer)
+
+    try:
+        limit = parse_limit(request.query_params.get("limit"))
+        query = keyset_query(select(*tickets_serializer.columns, Ticket.version), keys, request.query_params.get("cursor"), limit)
+    except ValueError as e:
+        return json_response(request, {"error": str(e)}, 400)
+
+    tickets, meta = keyset_page(await fetch_all(request, query), keys, limit)
+
+    etag = collection_etag(Ticket, tickets, meta)
+    return not_modified(request, etag) or json_response(request, {"tickets": tickets_serializer.dump(tickets), "meta": meta}, etag=etag)
+
+@rate_limited()
+async def get_ticket(request):
+    ticket_id = request.path_params["ticket_id"]
+    return await get_entity(request, Ticket, tickets_serializer, ticket_id, f"No ticket found with ticket_id: {ticket_id}")
+
+@rate_limited("15 per hour")
+async def get_customers(request):
+    return await get_paged_list(request, Customer, customers_serializer)
+
+@rate_limited()
+async def get_customer(request):
+    customer_id = request.path_params["customer_id"]
+    return await get_entity(request, Customer, customers_serializer, customer_id, f"Could not find customer w/ customer_id {customer_id}")
+
+@rate_limited("5 per hour")
+async def get_mechanics(request):
+    if wants_stream(request):
+        return stream_rows(request, select(*mechanics_serializer.columns).order_by(Mechanic.id), mechanics_serializer)
+
+    mechanics = await fetch_all(request, select(*mechanics_serializer.columns, Mechanic.version).order_by(Mechanic.id))
+
+    etag = collection_etag(Mechanic, mechanics)
+    return not_modified(request, etag) or json_response(request, mechanics_serializer.dump(mechanics), etag=etag)
+
+@rate_limited()
+async def get_mechanic(request):
+    mechanic_id = request.path_params["mechanic_id"]
+    return await get_entity(request, Mechanic, mechanics_serializer, mechanic_id, f"No mechanic found with id: {mechanic_id}")
+
+@rate_limited()
+async def get_inventory_items(request):
+    return await get_paged_list(request, Inventory, inventory_items_serializer)
+
+def create_asgi_app(config_name: str) -> Starlette:
+    flask_app = create_app(config_name)
+    with flask_app.app_context():
+        sync_url = db.engine.url # with Flask-SQLAlchemy's instance path applied to SQLite files
+    engine = create_async_engine(
+        flask_app.config.get("ASYNC_DATABASE_URI") or async_database_url(sync_url),
+        **flask_app.config.get("ASYNC_ENGINE_OPTIONS", {})
+    )
+    instrument(engine.sync_engine, "async") # reported next to the Flask engine's pool at /internal/pool
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        await engine.dispose()
+
+    routes = [
+        Route("/tickets/", get_tickets, methods=["GET"]),
+        Route("/tickets/{ticket_id:int}", get_ticket, methods=["GET"]),
+        Route("/customers/", get_customers, methods=["GET"]),
+        Route("/customers/{customer_id:int}", get_customer, methods=["GET"]),
+        Route("/mechanics/", get_mechanics, methods=["GET"]),
+        Route("/mechanics/{mechanic_id:int}", get_mechanic, methods=["GET"]),
+        Route("/inventory/", get_inventory_items, methods=["GET"]),
+        Mount("/", app=WSGIMiddleware(flask_app)) # every other method & path
+    ]
+    app = Starlette(routes=routes, lifespan=lifespan)
+    app.state.flask_app = flask_app
+    app.state.engine = engine
+
+    app.state.rate_limiter = None
+    if flask_app.config.get("RATELIMIT_ENABLED", True):
+        storage_uri = flask_app.config.get("RATELIMIT_STORAGE_URI", "memory://")
+        storage = storage_from_string(f"async+{storage_uri}")
+        app.state.rate_limiter = limits.aio.strategies.FixedWindowRateLimiter(storage)
+        app.state.default_limits = [limits.parse(s) for s in DEFAULT_RATE_LIMITS]
+    return app
@@ -1,12 +1,17 @@
-from app.blueprints.customers.schemas import customer_schema, customers_schema, login_schema
+from app.blueprints.customers.schemas import customer_schema, customers_serializer, login_schema
 
-from app.extensions import db, limiter, cache
+from app.extensions import db, limiter
 from app.utils.util import encode_token
+from app.utils.streaming import wants_stream, stream_rows
+from app.utils.pagination import offset_query
+from app.utils.etags import conditional, collection_etag, entity_etag, not_modified, with_etag
+from app.utils.cache_tags import cached_with_tags
+from app.utils.passwords import hash_password, verify_password, burn_verification, PasswordPoolBusy
 from . import customers_bp
 from flask import request, jsonify
 from marshmallow import ValidationError
 from app.models import Customer
-from sqlalchemy import select
+from sqlalchemy import select, update
 from typing import Dict
 
 
@@ -25,7 +30,26 @@ def login():
     query = select(Customer).where(Customer.email == username)
     customer = db.session.execute(query).scalar_one_or_none() # Return the first scalar result or None
     
-    if customer and customer.password == password:
+    try:
+        if customer:
+            valid, rehashed = verify_password(customer.password, password)
+        else:
+            burn_verification(password)
+            valid, rehashed = False, None
+    except PasswordPoolBusy:
+        return jsonify({"error": "Too many logins in progress, try again shortly"}), 503, {"Retry-After": "1"}
+    
+    if valid:
+        # Legacy plaintext passwords (or hashes of an older cost) are upgraded on login. Only
+        # if still unchanged: a concurrent login may have upgraded it first, which is fine
+        if rehashed:
+            db.session.execute(
+                update(Customer)
+                .where(Customer.id == customer.id, Customer.password == customer.password)
+                .values(password=rehashed, version=Customer.version + 1)
+            )
+            db.session.commit()
+        
         auth_token = encode_token(customer.id)
         response = {
             "status": "success",
@@ -42,27 +66,35 @@ def login():
 @limiter.limit("15 per hour")
 @customers_bp.route("/", methods=["GET"])
 def get_customers():
+    if wants_stream():
+        return stream_rows(select(*customers_serializer.columns).order_by(Customer.id), customers_serializer)
+    
+    # Column-only rows, dumped straight from the tuples without building entities
+    query = select(*customers_serializer.columns, Customer.version).order_by(Customer.id)
     try:
-        # we cast to int since we receive query parameters as strings
-        page = int(request.args.get("page"))
-        per_page = int(request.args.get("per_page"))
-        query = select(Customer)
-        customers = db.paginate(query, page=page, per_page=per_page) 
-    except:
-        query = select(Customer)
-        customers = db.session.execute(query).scalars().all()
+        query = offset_query(query, request.args.get("page"), request.args.get("per_page"))
+    except (TypeError, ValueError):
+        pass # no or invalid paging, return every customer
+    customers = db.session.execute(query).all()
     
-    return customers_schema.jsonify(customers), 200
+    etag = collection_etag(Customer, customers)
+    response = not_modified(etag)
+    if response is not None:
+        return response
+    
+    return with_etag(customers_serializer.jsonify(customers), etag), 200
 
-# Cache individual customer lookups to reduce database queries for frequently accessed records
+# Cache individual customer lookups for hours, writes to the customer purge the entry
+# Conditional GETs are answered from the row version before the cache is consulted
 @customers_bp.route("/<int:customer_id>", methods=["GET"])
-@cache.cached(timeout=60)
+@conditional(Customer)
+@cached_with_tags(["customer:{customer_id}", "customers"])
 def get_customer(customer_id):
     customer = db.session.get(Customer, customer_id)
     if not customer:
         return jsonify({"error": f"Could not find customer w/ customer_id {customer_id}"}), 404
     else:
-        return customer_schema.jsonify(customer), 200
+        return with_etag(customer_schema.jsonify(customer), entity_etag(Customer, customer.id, customer.version)), 200
 
 @customers_bp.route("/", methods=["POST"])
 def add_customer():
@@ -83,6 +115,11 @@ def add_customer():
     if existing_customer:
         return jsonify({"error": f"Account with email '{customer_data['email']}' already exists."}), 400
 
+    try:
+        customer_data["password"] = hash_password(customer_data["password"])
+    except PasswordPoolBusy:
+        return jsonify({"error": "Server busy, try again shortly"}), 503, {"Retry-After": "1"}
+
     # Validated, create new customer row
     new_customer = Customer(**customer_data)
     db.session.add(new_customer)
@@ -105,6 +142,12 @@ def update_customer(customer_id):
     except ValidationError as e:
         return jsonify({"error": f"malformed request body: {e.messages}"}), 400
 
+    if "password" in customer_data:
+        try:
+            customer_data["password"] = hash_password(customer_data["password"])
+        except PasswordPoolBusy:
+            return jsonify({"error": "Server busy, try again shortly"}), 503, {"Retry-After": "1"}
+
     # update all column values of pulled customer with Dict api
     for k,v in customer_data.items():
         setattr(customer, k, v)
@@ -1,4 +1,5 @@
 from app.extensions import ma
+from app.utils.serializers import compile_serializer
 from app.models import Customer
 from marshmallow import EXCLUDE, fields
 
@@ -6,6 +7,7 @@ class CustomerSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = Customer
         include_fk=True
+        exclude = ("version",)
         unknown = EXCLUDE
     password = fields.String(load_only=True)
         
@@ -19,4 +21,5 @@ class LoginSchema(ma.Schema):
         
 customer_schema = CustomerSchema()
 customers_schema = CustomerSchema(many=True)
+customers_serializer = compile_serializer(customers_schema)
 login_schema = LoginSchema()
\ No newline at end of file
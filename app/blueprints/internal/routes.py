@@ -0,0 +1,38 @@
+from app.utils.pool_stats import pool_snapshots
+from app.utils.metrics import exposition
+from app.extensions import limiter
+from . import internal_bp
+from flask import current_app, request, jsonify
+import hmac
+
+LOOPBACK_ADDRESSES = ("127.0.0.1", "::1")
+
+# Operational endpoints, not part of the public API. With INTERNAL_API_TOKEN configured they
+# need it as an X-Internal-Token header or a Bearer token (Prometheus' 'authorization'
+# scrape setting). Without one they're closed, unless INTERNAL_ALLOW_LOOPBACK (development,
+# testing & benchmarks only) lets localhost in: behind a reverse proxy on the same host every
+# public request arrives from 127.0.0.1 too.
+@internal_bp.before_request
+def internal_only():
+    token = current_app.config.get("INTERNAL_API_TOKEN")
+    if token:
+        scheme, _, bearer = request.headers.get("Authorization", "").partition(" ")
+        supplied = request.headers.get("X-Internal-Token") or (bearer if scheme.lower() == "bearer" else "")
+        allowed = hmac.compare_digest(supplied.encode(), token.encode())
+    else:
+        allowed = current_app.config.get("INTERNAL_ALLOW_LOOPBACK", False) and request.remote_addr in LOOPBACK_ADDRESSES
+    if not allowed:
+        return jsonify({"error": "Forbidden"}), 403
+
+# Connection pool usage of this worker (see app/utils/pool_stats.py), not rate limited so monitoring can poll it
+@internal_bp.route("/internal/pool", methods=["GET"])
+@limiter.exempt
+def get_pool_stats():
+    return jsonify({"pools": pool_snapshots()}), 200
+
+# Prometheus scrape target (see app/utils/metrics.py)
+@internal_bp.route("/metrics", methods=["GET"])
+@limiter.exempt
+def get_metrics():
+    body, content_type = exposition()
+    return body, 200, {"Content-Type": content_type}
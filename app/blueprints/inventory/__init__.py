@@ -1,5 +1,5 @@
 from flask import Blueprint
 
-inventory_bp = Blueprint("inventory_bp", __file__)
+inventory_bp = Blueprint("inventory_bp", __file__, cli_group="inventory")
 
 from . import routes
\ No newline at end of file
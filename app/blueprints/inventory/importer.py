@@ -0,0 +1,151 @@
+from app.blueprints.inventory.schemas import inventory_items_schema
+from app.extensions import db
+from app.models import Inventory, TicketInventory
+from app.utils.invoices import recompute_parts_totals
+from marshmallow import ValidationError
+from sqlalchemy import select
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+import json
+import csv
+
+IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+
+# Bulk inventory upsert for supplier catalogs. Input is parsed one record at a time
+# (CSV with a name,price header or NDJSON), validated & upserted on the unique name
+# in batches, with a commit per batch so memory & transaction size stay bounded.
+# Input that can't be read any further (bad UTF-8, malformed CSV) stops the import with
+# ImportAborted, whose summary counts the batches already committed before it.
+
+class ImportAborted(Exception):
+    def __init__(self, message, summary):
+        super().__init__(message)
+        self.message = message
+        self.summary = summary
+
+# Parsers yield (record, parse error) pairs & never hold more than one record in memory
+def parse_csv(text_stream):
+    for record in csv.DictReader(text_stream):
+        yield record, None
+
+def parse_ndjson(text_stream):
+    for line in text_stream:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line), None
+        except json.JSONDecodeError:
+            yield None, "Invalid JSON"
+
+PARSERS = {
+    "csv": parse_csv,
+    "ndjson": parse_ndjson
+}
+
+def upsert_statement():
+    """INSERT .. ON CONFLICT (name) DO UPDATE for the bound dialect"""
+    table = Inventory.__table__
+    dialect = db.engine.dialect.name
+    if dialect == "postgresql":
+        statement = postgresql.insert(table)
+        return statement.on_conflict_do_update(index_elements=[table.c.name], set_={"price": statement.excluded.price, "version": table.c.version + 1})
+    if dialect == "sqlite":
+        statement = sqlite.insert(table)
+        return statement.on_conflict_do_update(index_elements=[table.c.name], set_={"price": statement.excluded.price, "version": table.c.version + 1})
+    if dialect in ("mysql", "mariadb"):
+        statement = mysql.insert(table)
+        return statement.on_duplicate_key_update(price=statement.inserted.price, version=table.c.version + 1)
+    raise NotImplementedError(f"Inventory import does not support the '{dialect}' database")
+
+class InventoryImport:
+    def __init__(self, batch_size=None):
+        self.batch_size = batch_size or IMPORT_BATCH_SIZE
+        self.statement = upsert_statement()
+        self.inserted = 0
+        self.updated = 0
+        self.rejected = 0
+        self.errors = []
+        self._batch = {} # name -> (record number, row), names are unique within a batch
+
+    def reject(self, record_number, messages):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"record": record_number, "errors": messages})
+
+    def run(self, records):
+        try:
+            self._run(records)
+        except (UnicodeDecodeError, csv.Error) as e:
+            db.session.rollback() # the batch in progress, earlier ones are committed
+            self._batch = {}
+            reason = "Input must be UTF-8 encoded" if isinstance(e, UnicodeDecodeError) else f"Malformed CSV: {e}"
+            raise ImportAborted(f"{reason}. The import stopped there, the counts cover what was imported before it", self.summary()) from e
+        return self.summary()
+
+    def _run(self, records):
+        for record_number, (record, parse_error) in enumerate(records, start=1):
+            if parse_error:
+                self.reject(record_number, {"_schema": [parse_error]})
+                continue
+            if not isinstance(record, dict):
+                self.reject(record_number, {"_schema": ["Invalid input type."]})
+                continue
+            
+            # Only name & price are imported, extra catalog columns are ignored
+            record = {k: record[k] for k in ("name", "price") if k in record}
+            name = record.get("name")
+            key = name if isinstance(name, str) else ("record", record_number)
+            
+            # A repeated name must update the earlier row, so flush that batch first
+            if key in self._batch:
+                self.flush()
+            self._batch[key] = (record_number, record)
+            if len(self._batch) >= self.batch_size:
+                self.flush()
+        self.flush()
+
+    def flush(self):
+        if not self._batch:
+            return
+        numbers, records = zip(*self._batch.values())
+        self._batch = {}
+
+        # Validate the batch in one pass, errors come back keyed by position
+        try:
+            loaded, errors = inventory_items_schema.load(list(records)), {}
+        except ValidationError as e:
+            loaded, errors = e.valid_data, e.messages
+
+        rows = []
+        for position, row in enumerate(loaded):
+            if position in errors:
+                self.reject(numbers[position], errors[position])
+            else:
+                rows.append({"name": row["name"], "price": row["price"]})
+
+        if rows:
+            names = [row["name"] for row in rows]
+            existing = set(db.session.scalars(select(Inventory.name).where(Inventory.name.in_(names))).all())
+            db.session.execute(self.statement, rows)
+
+            # Price changes on existing items flow through to the tickets using them
+            if existing:
+                affected_tickets = (
+                    select(TicketInventory.ticket_id)
+                    .join(Inventory, Inventory.id == TicketInventory.inventory_id)
+                    .where(Inventory.name.in_(existing))
+                )
+                recompute_parts_totals(affected_tickets)
+
+            self.updated += len(existing)
+            self.inserted += len(rows) - len(existing)
+
+        db.session.commit()
+
+    def summary(self):
+        return {
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "rejected": self.rejected,
+            "errors": self.errors
+        }
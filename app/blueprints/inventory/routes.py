@@ -1,24 +1,91 @@
-from app.blueprints.inventory.schemas import inventory_item_schema, inventory_items_schema
+from app.blueprints.inventory.schemas import inventory_item_schema, inventory_items_serializer, inventory_usage_schema
 from app.blueprints.inventory import inventory_bp
-from sqlalchemy import select
-from app.models import Inventory
+from sqlalchemy import select, func
+from app.models import Inventory, Ticket, TicketInventory
 from flask import request, jsonify
 from app.extensions import db
+from app.utils.streaming import wants_stream, stream_rows
+from app.utils.pagination import offset_query, parse_limit
+from app.utils.util import parse_date_arg
+from app.utils.cache_tags import cached_with_tags
+from app.utils.invoices import recompute_parts_totals
+from app.utils.etags import collection_etag, not_modified, with_etag
 from marshmallow import ValidationError
+from app.blueprints.inventory.importer import InventoryImport, ImportAborted, PARSERS, IMPORT_BATCH_SIZE
 from typing import Dict
+import click
+import io
+import os
 
 @inventory_bp.route("/", methods=["GET"])
 def get_inventory_items():
+    if wants_stream():
+        return stream_rows(select(*inventory_items_serializer.columns).order_by(Inventory.id), inventory_items_serializer)
+    
+    # Column-only rows, dumped straight from the tuples without building entities
+    query = select(*inventory_items_serializer.columns, Inventory.version).order_by(Inventory.id)
     try:
-        page = int(request.args.get("page"))
-        per_page = int(request.args.get("per_page"))
-        query = select(Inventory).order_by(Inventory.id)
-        inventory_items = db.paginate(query, page=page, per_page=per_page)
-    except:
-        query = select(Inventory).order_by(Inventory.id)
-        inventory_items = db.session.execute(query).scalars().all()
-    
-    return inventory_items_schema.jsonify(inventory_items), 200
+        query = offset_query(query, request.args.get("page"), request.args.get("per_page"))
+    except (TypeError, ValueError):
+        pass # no or invalid paging, return every item
+    inventory_items = db.session.execute(query).all()
+    
+    etag = collection_etag(Inventory, inventory_items)
+    response = not_modified(etag)
+    if response is not None:
+        return response
+    
+    return with_etag(inventory_items_serializer.jsonify(inventory_items), etag), 200
+
+# Sort orders for the usage analytics, ties broken by inventory id
+USAGE_SORT_KEYS = ("revenue", "quantity")
+
+def parts_usage_query(top, since=None, until=None, sort="revenue"):
+    """Quantity used, ticket count & revenue per inventory item, aggregated in a single query"""
+    quantity_used = func.sum(TicketInventory.quantity).label("quantity_used")
+    # (ticket_id, inventory_id) is unique, so every row of an item is a different ticket
+    ticket_count = func.count(TicketInventory.ticket_id).label("ticket_count")
+    # Priced at the item's current price, like tickets' parts_total
+    revenue = func.sum(TicketInventory.quantity * Inventory.price).label("revenue")
+    
+    query = (
+        select(Inventory.id, Inventory.name, Inventory.price, quantity_used, ticket_count, revenue)
+        .join(TicketInventory, TicketInventory.inventory_id == Inventory.id)
+    )
+    # Only join tickets when a date window is requested
+    if since or until:
+        query = query.join(Ticket, Ticket.id == TicketInventory.ticket_id)
+    if since:
+        query = query.where(Ticket.service_date >= since)
+    if until:
+        query = query.where(Ticket.service_date <= until)
+    
+    ranking = (revenue, quantity_used) if sort == "revenue" else (quantity_used, revenue)
+    return (
+        query.group_by(Inventory.id)
+        .order_by(*(key.desc() for key in ranking), Inventory.id)
+        .limit(top)
+    )
+
+# Cached per window (the query string is part of the key) until parts, prices or tickets change
+@inventory_bp.route("/analytics", methods=["GET"])
+@cached_with_tags(["ticket_inventory", "ticket_inventory:list", "inventory", "inventory:list", "tickets", "tickets:list"])
+def get_inventory_analytics():
+    sort = request.args.get("sort", "revenue")
+    if sort not in USAGE_SORT_KEYS:
+        return jsonify({"error": f"sort must be one of: {', '.join(USAGE_SORT_KEYS)}"}), 400
+    try:
+        top = parse_limit(request.args.get("top"), default=10, maximum=100)
+    except ValueError:
+        return jsonify({"error": "top must be an integer of at least 1"}), 400
+    try:
+        since = parse_date_arg(request.args, "since")
+        until = parse_date_arg(request.args, "until")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    items = db.session.execute(parts_usage_query(top, since, until, sort)).all()
+    return inventory_usage_schema.jsonify(items), 200
 
 @inventory_bp.route("/", methods=["POST"])
 def add_inventory_item():
@@ -44,6 +111,67 @@ def add_inventory_item():
     
     return inventory_item_schema.jsonify(new_inventory_item), 201
 
+# Request content types & file extensions accepted by the importer
+IMPORT_MIMETYPES = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson"
+}
+IMPORT_EXTENSIONS = {
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson"
+}
+
+# Streams a supplier catalog straight from the request body, upserting on name
+@inventory_bp.route("/import", methods=["POST"])
+def import_inventory_items():
+    file_format = IMPORT_MIMETYPES.get(request.mimetype)
+    if not file_format:
+        return jsonify({"error": f"Content-Type must be one of: {', '.join(IMPORT_MIMETYPES)}"}), 415
+    
+    # The upsert is built per dialect, so an unsupported database fails before anything is read
+    try:
+        importer = InventoryImport()
+    except NotImplementedError as e:
+        return jsonify({"error": str(e)}), 501
+    
+    text_stream = io.TextIOWrapper(request.stream, encoding="utf-8", newline="")
+    try:
+        summary = importer.run(PARSERS[file_format](text_stream))
+    except ImportAborted as e:
+        return jsonify({"error": e.message, **e.summary}), 400
+    
+    return jsonify(summary), 200
+
+# Same import from a local file: flask inventory import catalog.csv
+@inventory_bp.cli.command("import")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "file_format", type=click.Choice(sorted(PARSERS)), help="Defaults to the file extension")
+@click.option("--batch-size", default=IMPORT_BATCH_SIZE, show_default=True, help="Rows per upsert & commit")
+def import_inventory_command(path, file_format, batch_size):
+    """Upsert inventory items from a CSV or NDJSON file."""
+    file_format = file_format or IMPORT_EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    if not file_format:
+        raise click.UsageError("Could not infer the file format from its extension, pass --format")
+    
+    try:
+        importer = InventoryImport(batch_size)
+    except NotImplementedError as e:
+        raise click.ClickException(str(e))
+    aborted = None
+    with open(path, encoding="utf-8", newline="") as text_stream:
+        try:
+            summary = importer.run(PARSERS[file_format](text_stream))
+        except ImportAborted as e:
+            summary, aborted = e.summary, e
+    
+    click.echo(f"Inserted: {summary['inserted']}, Updated: {summary['updated']}, Rejected: {summary['rejected']}")
+    for error in summary["errors"]:
+        click.echo(f"  record {error['record']}: {error['errors']}")
+    if aborted:
+        raise click.ClickException(aborted.message)
+
 @inventory_bp.route("/<int:inventory_id>", methods=["PUT"])
 def update_inventory_item(inventory_id):
     """Allows partial schema for request body"""
@@ -63,6 +191,11 @@ def update_inventory_item(inventory_id):
 
     for k,v in inventory_data.items():
         setattr(inventory_item, k, v)
+    
+    # A new price changes the parts total of every ticket using this item
+    if "price" in inventory_data:
+        db.session.flush()
+        recompute_parts_totals(select(TicketInventory.ticket_id).where(TicketInventory.inventory_id == inventory_id))
         
     db.session.commit()
     return inventory_item_schema.jsonify(inventory_item), 200
@@ -72,7 +205,15 @@ def delete_inventory_item(inventory_id):
     inventory_item = db.session.get(Inventory, inventory_id)
     if not inventory_item:
         return jsonify({"error": f"Could not find inventory item with id: {inventory_id}"}), 404
+    
+    # Deleting cascades to ticket_inventory rows, so re-total the tickets that used it
+    affected_query = select(TicketInventory.ticket_id).where(TicketInventory.inventory_id == inventory_id)
+    affected_ticket_ids = db.session.scalars(affected_query).all()
+    
     db.session.delete(inventory_item)
+    if affected_ticket_ids:
+        db.session.flush()
+        recompute_parts_totals(affected_ticket_ids)
     db.session.commit()
     return "", 204
     
@@ -1,10 +1,25 @@
 from app.models import Inventory
 from app.extensions import ma
+from app.utils.serializers import compile_serializer
+from marshmallow import fields
 
 class InventorySchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = Inventory
         include_fk = True
+        exclude = ("version",)
+    
+# Dumps usage analytics rows, the totals are aggregated in SQL
+class InventoryUsageSchema(ma.SQLAlchemyAutoSchema):
+    class Meta:
+        model = Inventory
+        fields = ("id", "name", "price", "quantity_used", "ticket_count", "revenue")
+    
+    quantity_used = fields.Integer(dump_only=True)
+    ticket_count = fields.Integer(dump_only=True)
+    revenue = fields.Float(dump_only=True)
     
 inventory_item_schema = InventorySchema()
-inventory_items_schema = InventorySchema(many=True)
\ No newline at end of file
+inventory_items_schema = InventorySchema(many=True)
+inventory_items_serializer = compile_serializer(inventory_items_schema)
+inventory_usage_schema = InventoryUsageSchema(many=True)
@@ -1,38 +1,83 @@
-from app.blueprints.mechanics.schemas import mechanic_schema, mechanics_schema, mechanics_with_ticket_count_schema
-from app.extensions import db, limiter, cache
+from app.blueprints.mechanics.schemas import mechanic_schema, mechanics_serializer, mechanics_with_ticket_count_schema
+from app.extensions import db, limiter
 from . import mechanics_bp
 from flask import request, jsonify
 from marshmallow import ValidationError
-from app.models import Mechanic
-from sqlalchemy import select
+from app.models import Mechanic, Ticket, ticket_mechanic_joint_table
+from app.utils.pagination import parse_limit
+from app.utils.util import parse_date_arg
+from app.utils.streaming import wants_stream, stream_rows
+from app.utils.etags import conditional, collection_etag, entity_etag, with_etag
+from app.utils.cache_tags import cached_with_tags
+from sqlalchemy import select, func
 from typing import Dict
 
 # Rate limit to prevent overloading servers with extra requests
-# Cache results to ease strain on popular query
+# Cache results to ease strain on popular query until any mechanic changes (streamed responses bypass the cache)
 @mechanics_bp.route("/", methods=["GET"])
 @limiter.limit("5 per hour")
-@cache.cached(timeout=60)
+@conditional()
+@cached_with_tags(["mechanics:list"], unless=wants_stream)
 def get_mechanics():
-    query = select(Mechanic)
-    mechanics = db.session.execute(query).scalars().all()
+    if wants_stream():
+        return stream_rows(select(*mechanics_serializer.columns).order_by(Mechanic.id), mechanics_serializer)
     
-    return mechanics_schema.jsonify(mechanics), 200
+    # Column-only rows, dumped straight from the tuples without building entities
+    query = select(*mechanics_serializer.columns, Mechanic.version).order_by(Mechanic.id)
+    mechanics = db.session.execute(query).all()
+    
+    return with_etag(mechanics_serializer.jsonify(mechanics), collection_etag(Mechanic, mechanics)), 200
 
-# Cache individual mechanic lookups to reduce database queries for frequently accessed records
+# Cache individual mechanic lookups for hours, writes to the mechanic purge the entry
+# Conditional GETs are answered from the row version before the cache is consulted
 @mechanics_bp.route("/<int:mechanic_id>", methods=["GET"])
-@cache.cached(timeout=60)
+@conditional(Mechanic)
+@cached_with_tags(["mechanic:{mechanic_id}", "mechanics"])
 def get_mechanic(mechanic_id):
     mechanic = db.session.get(Mechanic, mechanic_id)
     if not mechanic:
         return jsonify({"error": f"No mechanic found with id: {mechanic_id}"}), 404
     else:
-        return mechanic_schema.jsonify(mechanic), 200
+        return with_etag(mechanic_schema.jsonify(mechanic), entity_etag(Mechanic, mechanic.id, mechanic.version)), 200
+    
+def leaderboard_query(limit, since=None, until=None):
+    """Mechanics ranked by assigned ticket count, aggregated in a single query"""
+    ticket_mechanic = ticket_mechanic_joint_table.c
+    
+    # Count assignments per mechanic, only joining tickets when a date window is requested
+    counts = select(ticket_mechanic.mechanic_id, func.count(ticket_mechanic.ticket_id).label("ticket_count"))
+    if since or until:
+        counts = counts.join(Ticket, Ticket.id == ticket_mechanic.ticket_id)
+    if since:
+        counts = counts.where(Ticket.service_date >= since)
+    if until:
+        counts = counts.where(Ticket.service_date <= until)
+    counts = counts.group_by(ticket_mechanic.mechanic_id).subquery()
+    
+    # Outer join so mechanics without tickets still rank (with a count of 0); ties break on id
+    ticket_count = func.coalesce(counts.c.ticket_count, 0).label("ticket_count")
+    return (
+        select(Mechanic.id, Mechanic.name, Mechanic.email, ticket_count)
+        .outerjoin(counts, counts.c.mechanic_id == Mechanic.id)
+        .order_by(ticket_count.desc(), Mechanic.id)
+        .limit(limit)
+    )
+
+@mechanics_bp.route("/leaderboard", methods=["GET"])
+def get_mechanics_leaderboard():
+    try:
+        limit = parse_limit(request.args.get("limit"), default=10, maximum=100)
+        since = parse_date_arg(request.args, "since")
+        until = parse_date_arg(request.args, "until")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
+    mechanics = db.session.execute(leaderboard_query(limit, since, until)).all()
+    return mechanics_with_ticket_count_schema.jsonify(mechanics), 200
+
 @mechanics_bp.route("/top-3-mechanics", methods=["GET"])
 def get_top_3_mechanics():
-    query = select(Mechanic)
-    mechanics = db.session.execute(query).scalars().all()
-    mechanics = sorted(mechanics, key=lambda m: len(m.tickets), reverse=True)[0:3]
+    mechanics = db.session.execute(leaderboard_query(3)).all()
     
     return mechanics_with_ticket_count_schema.jsonify(mechanics), 200
 
@@ -1,4 +1,5 @@
 from app.extensions import ma
+from app.utils.serializers import compile_serializer
 from app.models import Mechanic
 from marshmallow import fields
 
@@ -6,18 +7,19 @@ class MechanicSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = Mechanic
         include_fk=True
+        exclude = ("version",)
         
+# Dumps leaderboard rows, 'ticket_count' is aggregated in SQL rather than read off obj.tickets
 class MechanicWithTicketCountSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = Mechanic
         include_fk = True
-        fields = ("name", "email", "ticket_count")
+        fields = ("id", "name", "email", "ticket_count")
     
-    ticket_count = fields.Method("get_ticket_count", dump_only=True)
-    def get_ticket_count(self, obj):
-        return len(obj.tickets) if obj.tickets else 0
+    ticket_count = fields.Integer(dump_only=True)
         
         
 mechanic_schema = MechanicSchema()
 mechanics_schema = MechanicSchema(many=True)
+mechanics_serializer = compile_serializer(mechanics_schema)
 mechanics_with_ticket_count_schema = MechanicWithTicketCountSchema(many=True)
\ No newline at end of file
@@ -1,5 +1,5 @@
 from flask import Blueprint
 
-tickets_bp = Blueprint("tickets_bp", __name__)
+tickets_bp = Blueprint("tickets_bp", __name__, cli_group="tickets")
 
 from . import routes
\ No newline at end of file
@@ -2,49 +2,144 @@ from . import tickets_bp
 from app.blueprints.tickets.schemas import (
     ticket_schema,
     tickets_schema,
+    tickets_serializer,
     update_ticket_mechanics_schema,
     update_ticket_mechanics_response_schema,
-    add_ticket_inventory_items_schema
+    bulk_update_ticket_mechanics_schema,
+    add_ticket_inventory_items_schema,
+    my_tickets_serializers,
+    MY_TICKET_EXPANSIONS
 )
-from app.extensions import db, limiter, cache
+from app.extensions import db, limiter
 from app.utils.util import token_required
+from app.utils.pagination import keyset_query, keyset_page, parse_limit
+from app.utils.streaming import wants_stream, stream_rows
+from app.utils.invoices import invoice_line_items, build_invoice, recompute_parts_totals
+from app.utils.search import ticket_search_query
+from app.utils.etags import conditional, collection_etag, entity_etag, not_modified, with_etag
+from app.utils.eager_loading import get_for, select_for
+from app.utils.cache_tags import cached_with_tags, register_row_tags
 from flask import request, jsonify
 from marshmallow import ValidationError
-from app.models import Ticket, Mechanic, Customer, Inventory, TicketInventory
-from sqlalchemy import select
+from app.models import Ticket, Mechanic, Customer, Inventory, TicketInventory, ticket_mechanic_joint_table
+from sqlalchemy import select, insert, update, delete, tuple_, inspect
 from sqlalchemy.exc import IntegrityError
 from typing import Dict
+import click
 
-# Rate limit to prevent overloading servers with extra requests
-# Cache results to ease strain on popular query
-@limiter.limit("5 per hour")
-@cache.cached(timeout=10)
+# Sortable keys for keyset pagination, each ending in the unique Ticket.id tiebreaker
+TICKET_SORT_KEYS = {
+    "id": (Ticket.id,),
+    "service_date": (Ticket.service_date, Ticket.id)
+}
+
+# Keyset pagination keeps every page cheap, so only a generous rate limit remains
 @tickets_bp.route("/", methods=["GET"])
+@limiter.limit("60 per minute")
 def get_tickets():
-    query = select(Ticket)
-    tickets = db.session.execute(query).scalars().all()
+    sort = request.args.get("sort", "id")
+    keys = TICKET_SORT_KEYS.get(sort)
+    if not keys:
+        return jsonify({"error": f"sort must be one of: {', '.join(TICKET_SORT_KEYS)}"}), 400
+    
+    # Full export, streamed in constant memory instead of paginated
+    if wants_stream():
+        return stream_rows(select(*tickets_serializer.columns).order_by(*keys), tickets_serializer)
+    
+    # Column-only rows: just what the schema dumps plus the version for the ETag, no entities
+    try:
+        limit = parse_limit(request.args.get("limit"))
+        query = keyset_query(select(*tickets_serializer.columns, Ticket.version), keys, request.args.get("cursor"), limit)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    tickets, meta = keyset_page(db.session.execute(query), keys, limit)
+    
+    # Polling clients that already hold this page skip serialization entirely
+    etag = collection_etag(Ticket, tickets, meta)
+    response = not_modified(etag)
+    if response is not None:
+        return response
+    
+    return with_etag(jsonify({"tickets": tickets_serializer.dump(tickets), "meta": meta}), etag), 200
+
+# Ranked full-text search over VIN & service description, keyset paginated on (score, id)
+@tickets_bp.route("/search", methods=["GET"])
+def search_tickets():
+    search_text = request.args.get("q", "").strip()
+    if not search_text:
+        return jsonify({"error": "q query parameter must not be empty"}), 400
+    
+    query, keys = ticket_search_query(db.engine.dialect.name, search_text)
+    try:
+        limit = parse_limit(request.args.get("limit"))
+        query = keyset_query(query, keys, request.args.get("cursor"), limit)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    rows, meta = keyset_page(db.session.execute(query), keys, limit)
     
-    return tickets_schema.jsonify(tickets), 200
+    return jsonify({"tickets": tickets_serializer.dump([row.Ticket for row in rows]), "meta": meta}), 200
 
 @tickets_bp.route("/<int:ticket_id>", methods=["GET"])
+@conditional(Ticket)
 def get_ticket(ticket_id):
     ticket = db.session.get(Ticket, ticket_id)
     if not ticket:
         return jsonify({"error": f"No ticket found with ticket_id: {ticket_id}"}), 404
     else:
-        return ticket_schema.jsonify(ticket), 200
-    
+        return with_etag(ticket_schema.jsonify(ticket), entity_etag(Ticket, ticket.id, ticket.version)), 200
+    
+# A customer's cached pages are purged by changes to their own tickets (the tag below, see
+# _customer_tickets_tags) & to the rows an expansion reads. Bulk statements can't name the
+# customers they touch, so their table tags purge every customer's pages.
+MY_TICKETS_CACHE_TAGS = [
+    "customer:{customer_id}:tickets", "tickets", "ticket_mechanic", "ticket_inventory", "ticket_inventory:list",
+    "mechanics", "mechanics:list", "inventory", "inventory:list"
+]
+
+def _customer_tickets_tags(ticket) -> set:
+    """Tags of the customers a flushed ticket belongs or belonged to, without loading anything"""
+    state = inspect(ticket)
+    customer_ids = {state.dict.get("customer_id"), *state.attrs.customer_id.history.deleted}
+    if None in customer_ids: # not loaded, can't tell whose it was
+        return {"tickets"}
+    return {f"customer:{customer_id}:tickets" for customer_id in customer_ids}
+
+register_row_tags(Ticket, _customer_tickets_tags)
+
+# The customer's tickets, keyset paginated, with ?expand=mechanics,parts nested in. Each
+# expansion is one selectin query for the whole page, so a page costs the same few queries
+# at any size.
 @tickets_bp.route("/my-tickets", methods=["GET"])
 @token_required
 def get_my_tickets(customer_id):
-    customer = db.session.get(Customer, customer_id)
-    if not customer:
-        return jsonify({"error": "Could not find customer with supplied customer ID from your auth token"}), 404
+    return my_tickets_page(customer_id=customer_id)
+
+@cached_with_tags(MY_TICKETS_CACHE_TAGS)
+def my_tickets_page(customer_id):
+    expand = frozenset(name.strip() for name in request.args.get("expand", "").split(",") if name.strip())
+    if not expand <= set(MY_TICKET_EXPANSIONS):
+        return jsonify({"error": f"expand must be a comma separated list of: {', '.join(MY_TICKET_EXPANSIONS)}"}), 400
+    sort = request.args.get("sort", "service_date")
+    keys = TICKET_SORT_KEYS.get(sort)
+    if not keys:
+        return jsonify({"error": f"sort must be one of: {', '.join(TICKET_SORT_KEYS)}"}), 400
+    
+    serializer = my_tickets_serializers[expand]
+    try:
+        limit = parse_limit(request.args.get("limit"))
+        query = keyset_query(select_for(serializer.schema).where(Ticket.customer_id == customer_id), keys, request.args.get("cursor"), limit)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    tickets, meta = keyset_page(db.session.scalars(query), keys, limit)
     
-    query = select(Ticket).where(Ticket.customer_id == customer.id)
-    tickets = db.session.execute(query).scalars().all()
+    # Only an empty first page needs to tell a customer without tickets from a deleted one
+    if not tickets and not request.args.get("cursor") and db.session.get(Customer, customer_id) is None:
+        return jsonify({"error": "Could not find customer with supplied customer ID from your auth token"}), 404
     
-    return tickets_schema.jsonify(tickets), 200
+    return jsonify({"tickets": serializer.dump(tickets), "meta": meta}), 200
     
 @tickets_bp.route("/", methods=["POST"])
 def create_ticket():
@@ -72,6 +167,74 @@ def create_ticket():
         
     return ticket_schema.jsonify(new_ticket), 201
 
+MAX_BULK_TICKETS = 10_000
+BULK_TICKET_COLUMNS = (Ticket.VIN, Ticket.service_date, Ticket.service_description, Ticket.customer_id)
+
+# Intake kiosks sync batches of tickets: validate every row, check all customers with
+# one IN query, then insert the valid rows with a single multi-row INSERT & commit
+@tickets_bp.route("/bulk", methods=["POST"])
+def create_tickets_bulk():
+    data = request.get_json(silent=True)
+    if not isinstance(data, list) or not data:
+        return jsonify({"error": "Request body must be a non-empty JSON array of tickets"}), 400
+    if len(data) > MAX_BULK_TICKETS:
+        return jsonify({"error": f"At most {MAX_BULK_TICKETS} tickets may be created at once"}), 400
+    
+    # Validate the whole array in one pass, errors come back keyed by row index
+    results = [None] * len(data)
+    try:
+        loaded, errors = tickets_schema.load(data), {}
+    except ValidationError as e:
+        loaded, errors = e.valid_data, e.messages
+    
+    valid = []
+    for index, ticket_data in enumerate(loaded):
+        if index in errors:
+            results[index] = {"index": index, "status": "error", "errors": errors[index]}
+        else:
+            valid.append((index, ticket_data))
+    
+    # Validate customers exist
+    customer_ids = {ticket_data["customer_id"] for _, ticket_data in valid}
+    found_customer_ids = set(db.session.scalars(select(Customer.id).where(Customer.id.in_(customer_ids))).all()) if customer_ids else set()
+    
+    rows, row_indexes = [], []
+    for index, ticket_data in valid:
+        if ticket_data["customer_id"] not in found_customer_ids:
+            results[index] = {"index": index, "status": "error", "errors": {"customer_id": [f"Could not find customer with id: {ticket_data['customer_id']}"]}}
+        else:
+            rows.append(ticket_data)
+            row_indexes.append(index)
+    
+    # Multi-row INSERT batched by insertmanyvalues. RETURNING row order isn't guaranteed
+    # (and asking SQLAlchemy to sort degrades SQLite to one INSERT per row), so new ids are
+    # matched back to payload rows by content; rows with identical content are interchangeable
+    if rows:
+        if db.engine.dialect.insert_executemany_returning:
+            pending = {}
+            for index, ticket_data in zip(row_indexes, rows):
+                pending.setdefault(tuple(ticket_data[c.key] for c in BULK_TICKET_COLUMNS), []).append(index)
+            
+            statement = insert(Ticket).returning(Ticket.id, *BULK_TICKET_COLUMNS)
+            for ticket_id, *content in db.session.execute(statement, rows):
+                index = pending[tuple(content)].pop()
+                results[index] = {"index": index, "status": "created", "id": ticket_id}
+        else:
+            tickets = [Ticket(**ticket_data) for ticket_data in rows]
+            db.session.add_all(tickets)
+            db.session.flush()
+            for index, ticket in zip(row_indexes, tickets):
+                results[index] = {"index": index, "status": "created", "id": ticket.id}
+        db.session.commit()
+    
+    created_count = len(rows)
+    return jsonify({
+        "results": results,
+        "requested_count": len(data),
+        "created_count": created_count,
+        "error_count": len(data) - created_count
+    }), 201 if created_count else 400
+
 @tickets_bp.route("/<int:ticket_id>", methods=["PUT"])
 @token_required
 def update_ticket(customer_id, ticket_id):
@@ -105,6 +268,56 @@ def update_ticket(customer_id, ticket_id):
         
     return ticket_schema.jsonify(ticket), 200
 
+def apply_mechanic_updates(updates):
+    """
+    Applies add/remove mechanic id lists for any number of tickets as set operations:
+    one IN query each for mechanics & existing links, then a single bulk INSERT and
+    DELETE on the joint table. Removals win when an id is both added & removed.
+    Returns a result per known ticket (keyed by ticket id) plus unknown ticket ids.
+    """
+    ticket_mechanic = ticket_mechanic_joint_table.c
+    ticket_ids = {u["ticket_id"] for u in updates}
+    mechanic_ids = {m for u in updates for m in u.get("add_mechanic_ids", []) + u.get("remove_mechanic_ids", [])}
+    
+    found_ticket_ids = set(db.session.scalars(select(Ticket.id).where(Ticket.id.in_(ticket_ids))).all())
+    known_mechanic_ids = set(db.session.scalars(select(Mechanic.id).where(Mechanic.id.in_(mechanic_ids))).all()) if mechanic_ids else set()
+    
+    existing_query = select(ticket_mechanic.ticket_id, ticket_mechanic.mechanic_id).where(ticket_mechanic.ticket_id.in_(found_ticket_ids))
+    assigned_by_ticket = {}
+    for t, m in (db.session.execute(existing_query).tuples() if found_ticket_ids else []):
+        assigned_by_ticket.setdefault(t, set()).add(m)
+    
+    results = {}
+    to_insert, to_delete = set(), set()
+    for change in updates:
+        ticket_id = change["ticket_id"]
+        if ticket_id not in found_ticket_ids:
+            continue
+        add_ids = set(change.get("add_mechanic_ids", []))
+        remove_ids = set(change.get("remove_mechanic_ids", []))
+        assigned = assigned_by_ticket.get(ticket_id, set())
+        
+        added = ((add_ids - remove_ids) & known_mechanic_ids) - assigned
+        removed = remove_ids & assigned
+        to_insert.update((ticket_id, m) for m in added)
+        to_delete.update((ticket_id, m) for m in removed)
+        
+        results[ticket_id] = {
+            "ticket_id": ticket_id,
+            "added_mechanic_ids": sorted(added),
+            "removed_mechanic_ids": sorted(removed),
+            "unknown_mechanic_ids": sorted((add_ids | remove_ids) - known_mechanic_ids)
+        }
+    
+    if to_insert:
+        db.session.execute(insert(ticket_mechanic_joint_table), [{"ticket_id": t, "mechanic_id": m} for t, m in to_insert])
+    if to_delete:
+        db.session.execute(delete(ticket_mechanic_joint_table).where(
+            tuple_(ticket_mechanic.ticket_id, ticket_mechanic.mechanic_id).in_(to_delete)
+        ))
+    
+    return results, sorted(ticket_ids - found_ticket_ids)
+
 # NOTE: This should probably require secondary auth for Admin access
 @tickets_bp.route("/<int:ticket_id>/update-mechanics", methods=["PUT"])
 def update_ticket_mechanics(ticket_id):
@@ -113,22 +326,40 @@ def update_ticket_mechanics(ticket_id):
     except ValidationError as e:
         return jsonify(e.messages), 400
     
-    # select ticket we want to update
-    query = select(Ticket).where(Ticket.id == ticket_id)
-    ticket = db.session.execute(query).scalars().first()
+    results, unknown_ticket_ids = apply_mechanic_updates([{"ticket_id": ticket_id, **ticket_updates}])
+    if unknown_ticket_ids:
+        return jsonify({"error": f"No ticket found with ticket_id: {ticket_id}"}), 404
+    
+    db.session.commit()
     
-    for mechanic_id in ticket_updates.get("add_mechanic_ids", []):
-        mechanic = db.session.get(Mechanic, mechanic_id)
-        if mechanic and mechanic not in ticket.mechanics:
-            ticket.mechanics.append(mechanic)
+    ticket = get_for(update_ticket_mechanics_response_schema, ticket_id)
+    response = update_ticket_mechanics_response_schema.dump(ticket)
+    response["unknown_mechanic_ids"] = results[ticket_id]["unknown_mechanic_ids"]
+    return jsonify(response), 200
+
+# Reassign mechanics across many tickets in one request (e.g. a dispatcher's whole day)
+# NOTE: This should probably require secondary auth for Admin access
+@tickets_bp.route("/update-mechanics", methods=["PUT"])
+def bulk_update_ticket_mechanics():
+    try:
+        bulk_updates = bulk_update_ticket_mechanics_schema.load(request.get_json())
+    except ValidationError as e:
+        return jsonify(e.messages), 400
     
-    for mechanic_id in ticket_updates.get("remove_mechanic_ids", []):
-        mechanic = db.session.get(Mechanic, mechanic_id)
-        if mechanic and mechanic in ticket.mechanics:
-            ticket.mechanics.remove(mechanic)
+    updates = bulk_updates["updates"]
+    payload_ids = [u["ticket_id"] for u in updates]
+    if len(payload_ids) != len(set(payload_ids)):
+        return jsonify({"error": "Payload contains at least 1 duplicate ticket ID"}), 400
     
+    results, unknown_ticket_ids = apply_mechanic_updates(updates)
     db.session.commit()
-    return update_ticket_mechanics_response_schema.jsonify(ticket), 200
+    
+    return jsonify({
+        "results": [results[t] for t in payload_ids if t in results],
+        "unknown_ticket_ids": unknown_ticket_ids,
+        "added_count": sum(len(r["added_mechanic_ids"]) for r in results.values()),
+        "removed_count": sum(len(r["removed_mechanic_ids"]) for r in results.values())
+    }), 200
 
 @tickets_bp.route("/<int:ticket_id>/assign-mechanic/<int:mechanic_id>", methods=["PUT"])
 def assign_mechanic(ticket_id, mechanic_id):
@@ -207,8 +438,9 @@ def add_inventory(ticket_id):
     # Validate Inventory items exist
     inventory_ids = set([i["inventory_id"] for i in add_inventory_items])
     
-    inventory_check_query = select(Inventory.id).where(Inventory.id.in_(inventory_ids))
-    found_ids = set(db.session.scalars(inventory_check_query).all())
+    inventory_check_query = select(Inventory.id, Inventory.price).where(Inventory.id.in_(inventory_ids))
+    prices = dict(db.session.execute(inventory_check_query).tuples().all())
+    found_ids = set(prices)
     
     missing = sorted(inventory_ids - found_ids)
     if missing:
@@ -234,6 +466,13 @@ def add_inventory(ticket_id):
                 quantity=item["quantity"]
         ))
     
+    # Keep the denormalized invoice total in step, incremented in SQL within this transaction
+    added_total = sum(prices[i["inventory_id"]] * i["quantity"] for i in inv_to_add)
+    if added_total:
+        db.session.execute(update(Ticket).where(Ticket.id == ticket_id).values(
+            parts_total=Ticket.parts_total + added_total, version=Ticket.version + 1
+        ))
+    
     # Protect against race conditions
     try:
         db.session.commit()
@@ -255,6 +494,48 @@ def add_inventory(ticket_id):
     }), 200
 
 
+MAX_INVOICE_BATCH = 200
+
+@tickets_bp.route("/<int:ticket_id>/invoice", methods=["GET"])
+def get_ticket_invoice(ticket_id):
+    ticket = db.session.get(Ticket, ticket_id)
+    if not ticket:
+        return jsonify({"error": f"Could not find ticket with ticket_id: {ticket_id}"}), 404
+    
+    line_items = invoice_line_items([ticket_id])[ticket_id]
+    return jsonify(build_invoice(ticket, line_items)), 200
+
+@tickets_bp.route("/invoices", methods=["GET"])
+def get_ticket_invoices():
+    # Expecting ?ids=1,2,3
+    try:
+        ticket_ids = list(dict.fromkeys(int(i) for i in request.args.get("ids", "").split(",") if i.strip()))
+    except ValueError:
+        return jsonify({"error": "ids must be a comma separated list of integers"}), 400
+    
+    if not ticket_ids:
+        return jsonify({"error": "ids query parameter must contain at least 1 ticket id"}), 400
+    if len(ticket_ids) > MAX_INVOICE_BATCH:
+        return jsonify({"error": f"At most {MAX_INVOICE_BATCH} ticket ids may be requested at once"}), 400
+    
+    # Two queries regardless of batch size: ticket totals, then every line item
+    ticket_query = select(Ticket.id, Ticket.customer_id, Ticket.service_date, Ticket.parts_total).where(Ticket.id.in_(ticket_ids))
+    tickets = {t.id: t for t in db.session.execute(ticket_query)}
+    line_items = invoice_line_items(list(tickets))
+    
+    return jsonify({
+        "invoices": [build_invoice(tickets[t], line_items[t]) for t in ticket_ids if t in tickets],
+        "missing_ids": [t for t in ticket_ids if t not in tickets]
+    }), 200
+
+# Repairs drifted totals, e.g. after manual edits to ticket_inventory: flask tickets recompute-totals
+@tickets_bp.cli.command("recompute-totals")
+def recompute_totals_command():
+    """Recompute every ticket's parts_total with one SQL aggregate."""
+    updated = recompute_parts_totals()
+    db.session.commit()
+    click.echo(f"Recomputed parts_total for {updated} tickets")
+
 # NOTE: This code opens an endpoint capable of deleting a ticket, not sure we want to do that
 
 """ @tickets_bp.route("/<int:ticket_id>", methods=["DELETE"])
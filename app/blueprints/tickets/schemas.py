@@ -1,7 +1,8 @@
 from typing import Dict
 from app.extensions import ma
-from marshmallow import fields
-from app.models import Ticket
+from app.utils.serializers import compile_serializer
+from marshmallow import fields, validate
+from app.models import Ticket, TicketInventory
 from app.blueprints.mechanics.schemas import MechanicSchema
 
 
@@ -11,20 +12,56 @@ class TicketSchema(ma.SQLAlchemyAutoSchema): # Inheritance allowing for TicketSc
     class Meta:
         model = Ticket
         include_fk=True
+        exclude = ("version",) # row version is served as the ETag header instead
+    
+    parts_total = fields.Float(dump_only=True) # maintained server side, never loaded from requests
 
 class UpdateTicketMechanicsResponseSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = Ticket
         include_fk=True
+        exclude = ("version",)
+        eager_load = ("mechanics",) # see app/utils/eager_loading.py
     
     mechanics = fields.Nested(MechanicSchema(exclude=["salary", "phone", "email"]), many=True, dump_only=True)
         
+# A part used on a ticket, with the inventory item's name & current price
+class TicketPartSchema(ma.SQLAlchemyAutoSchema):
+    class Meta:
+        model = TicketInventory
+        include_fk = True
+        fields = ("inventory_id", "name", "price", "quantity")
+        eager_load = ("inventory_item",)
+    
+    name = fields.String(attribute="inventory_item.name", dump_only=True)
+    price = fields.Float(attribute="inventory_item.price", dump_only=True)
+
+# GET /tickets/my-tickets, 'mechanics' & 'parts' are only dumped when asked for with ?expand=
+class MyTicketSchema(TicketSchema):
+    class Meta(TicketSchema.Meta):
+        eager_load = ("mechanics", "ticket_inventory_items")
+    
+    mechanics = fields.Nested(MechanicSchema(exclude=["salary", "phone", "email"]), many=True, dump_only=True)
+    parts = fields.Nested(TicketPartSchema, many=True, attribute="ticket_inventory_items", dump_only=True)
+
+MY_TICKET_EXPANSIONS = ("mechanics", "parts")
+
 class UpdateTicketMechanicsSchema(ma.Schema):
     add_mechanic_ids = fields.List(fields.Int(), required=True)
     remove_mechanic_ids = fields.List(fields.Int(), required=True)
     class Meta:
         fields = ("add_mechanic_ids", "remove_mechanic_ids") # White list: "Of the fields we have, which do we want to use?"
 
+class TicketMechanicsUpdateSchema(UpdateTicketMechanicsSchema):
+    ticket_id = fields.Int(required=True)
+    class Meta:
+        fields = ("ticket_id", "add_mechanic_ids", "remove_mechanic_ids")
+
+class BulkUpdateTicketMechanicsSchema(ma.Schema):
+    updates = fields.List(fields.Nested(TicketMechanicsUpdateSchema), required=True, validate=validate.Length(min=1, max=1000))
+    class Meta:
+        fields = ("updates",)
+
 class TicketInventoryItemInputSchema(ma.Schema):
     inventory_id = fields.Int(required=True)
     quantity = fields.Int(required=True)
@@ -37,6 +74,13 @@ class AddTicketInventoryItemsSchema(ma.Schema):
         
 ticket_schema = TicketSchema()
 tickets_schema = TicketSchema(many=True)
+tickets_serializer = compile_serializer(tickets_schema) # tickets_schema.dump without the per-field overhead, for lists & streams
+# one serializer per set of expansions, each loading just the relationships it dumps
+my_tickets_serializers = {
+    expand: compile_serializer(MyTicketSchema(many=True, exclude=[name for name in MY_TICKET_EXPANSIONS if name not in expand]))
+    for expand in map(frozenset, [(), ("mechanics",), ("parts",), MY_TICKET_EXPANSIONS])
+}
 update_ticket_mechanics_schema = UpdateTicketMechanicsSchema()
 update_ticket_mechanics_response_schema = UpdateTicketMechanicsResponseSchema()
+bulk_update_ticket_mechanics_schema = BulkUpdateTicketMechanicsSchema()
 add_ticket_inventory_items_schema = AddTicketInventoryItemsSchema()
\ No newline at end of file
@@ -9,6 +9,7 @@ from app.models import Base
 # Instantiations of extensions to be imported elsewhere
 db = SQLAlchemy(model_class=Base)
 ma = Marshmallow()
-cache = Cache(config={'CACHE_TYPE': 'SimpleCache'})
-limiter = Limiter(key_func=get_remote_address, default_limits=["200 per day", "50 per hour"]) # key_function = function returning domain to rate limit based on
+cache = Cache() # backend chosen per config, see CACHE_TYPE in config.py
+DEFAULT_RATE_LIMITS = ["200 per day", "50 per hour"]
+limiter = Limiter(key_func=get_remote_address, default_limits=DEFAULT_RATE_LIMITS) # key_function = function returning domain to rate limit based on
 migrate = Migrate(command='migrate')
\ No newline at end of file
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship, DeclarativeBase
-from sqlalchemy import Table, Column, ForeignKey, String, Date, Float, Integer, UniqueConstraint
+from sqlalchemy import Table, Column, ForeignKey, String, Date, Float, Integer, UniqueConstraint, Index
 from typing import List
 from datetime import date
 
@@ -11,7 +11,9 @@ ticket_mechanic_joint_table = Table(
     "ticket_mechanic",
     Base.metadata,
     Column("ticket_id", ForeignKey("tickets.id"), primary_key=True),
-    Column("mechanic_id", ForeignKey("mechanics.id"), primary_key=True)
+    Column("mechanic_id", ForeignKey("mechanics.id"), primary_key=True),
+    # The primary key only serves ticket -> mechanics, this covers mechanic -> tickets
+    Index("ix_ticket_mechanic_mechanic_id", "mechanic_id", "ticket_id")
 )
 
 class TicketInventory(Base):
@@ -19,6 +21,8 @@ class TicketInventory(Base):
     
     __table_args__ = (
         UniqueConstraint("ticket_id", "inventory_id", name="uq_ticket_inventory_ticket_inventory"),
+        # Tickets using an inventory item, for price changes & deletes
+        Index("ix_ticket_inventory_inventory_id", "inventory_id", "ticket_id"),
     )
     
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -38,17 +42,37 @@ class Customer(Base):
     email: Mapped[str] = mapped_column(String(255), nullable=False, unique=True)
     password: Mapped[str] = mapped_column(String(255), nullable=False)
     
+    # Row version, bumped by every ORM update, backs the ETags in app/utils/etags.py
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+    __mapper_args__ = {"version_id_col": version}
+    
     tickets: Mapped[List["Ticket"]] = relationship(back_populates="customer")
     
 class Ticket(Base):
     __tablename__ = "tickets"
     
+    __table_args__ = (
+        # A customer's tickets in date order (my-tickets), also serves customer_id alone
+        Index("ix_tickets_customer_id_service_date", "customer_id", "service_date"),
+        # Keyset pagination on (service_date, id)
+        Index("ix_tickets_service_date", "service_date", "id"),
+        Index("ix_tickets_vin", "VIN"),
+    )
+    
     id: Mapped[int] = mapped_column(primary_key=True)
     VIN: Mapped[str] = mapped_column(String(255), nullable=False)
     service_date: Mapped[date] = mapped_column(Date, nullable=False)
     service_description: Mapped[str] = mapped_column(String(1000), nullable=False)
     customer_id: Mapped[int] = mapped_column(ForeignKey("customers.id"), nullable=False)
     
+    # Denormalized sum of quantity * price over ticket_inventory, maintained by the
+    # writes that touch it (see app/utils/invoices.py) so invoice reads never re-aggregate
+    parts_total: Mapped[float] = mapped_column(Float, nullable=False, default=0, server_default="0")
+    
+    # Bulk UPDATEs of tickets (parts_total upkeep) bump this themselves
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+    __mapper_args__ = {"version_id_col": version}
+    
     customer: Mapped["Customer"] = relationship(back_populates="tickets")
     mechanics: Mapped[List["Mechanic"]] = relationship(secondary=ticket_mechanic_joint_table, back_populates="tickets")
     ticket_inventory_items: Mapped[List["TicketInventory"]] = relationship(
@@ -62,6 +86,9 @@ class Inventory(Base):
     name: Mapped[str] = mapped_column(String(360), nullable=False, unique=True)
     price: Mapped[float] = mapped_column(Float, nullable=False)
     
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+    __mapper_args__ = {"version_id_col": version}
+    
     ticket_inventory_items: Mapped[List["TicketInventory"]] = relationship(
         back_populates="inventory_item",
         cascade="all, delete-orphan"
@@ -76,5 +103,8 @@ class Mechanic(Base):
     phone: Mapped[str] = mapped_column(String(255), nullable=False)
     salary: Mapped[float] = mapped_column(Float, nullable=False)
     
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+    __mapper_args__ = {"version_id_col": version}
+    
     tickets: Mapped[List["Ticket"]] = relationship(secondary=ticket_mechanic_joint_table, back_populates="mechanics")
     
\ No newline at end of file
@@ -0,0 +1,113 @@
+from app.extensions import cache
+from flask import g, request, has_app_context
+from functools import wraps
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+import uuid
+
+# Tag based invalidation on top of app.extensions.cache, so cached reads can live for hours.
+#
+# Every tag ('customer:42', 'mechanics:list', ...) has a generation token stored in the
+# cache itself, and a cached view's key includes the current token of each of its tags.
+# Invalidating a tag replaces its token, which makes every entry filed under the old one
+# unreachable (they age out with their TTL). The key is built before the view reads the
+# database, so a write committing mid-request can never leave a stale entry reachable.
+#
+# Tags are purged automatically after commit from the SQLAlchemy session events below:
+#   '<model>:<id>'  a row changed through the ORM (e.g. 'customer:42')
+#   '<table>:list'  any row of the table was inserted, changed or deleted
+#   '<table>'       a bulk INSERT/UPDATE/DELETE touched rows we can't name one by one
+# plus whatever register_row_tags() adds for a model's rows (e.g. their owner's listings).
+
+TAGGED_CACHE_TIMEOUT = 6 * 60 * 60
+TAG_KEY_PREFIX = "tag/"
+
+def entity_tag(model, pk) -> str:
+    return f"{model.__name__.lower()}:{pk}"
+
+def tag_generations(tags) -> list:
+    """Current generation token of each tag, starting a new generation for unknown ones"""
+    keys = [TAG_KEY_PREFIX + tag for tag in tags]
+    tokens = cache.get_many(*keys)
+    missing = {key: uuid.uuid4().hex for key, token in zip(keys, tokens) if token is None}
+    if missing:
+        cache.set_many(missing, timeout=0)
+    return [token or missing[key] for key, token in zip(keys, tokens)]
+
+def invalidate_tags(tags):
+    if tags:
+        cache.set_many({TAG_KEY_PREFIX + tag: uuid.uuid4().hex for tag in tags}, timeout=0)
+
+# model -> build(instance), the extra tags a flushed row of the model purges
+_row_tags = {}
+
+def register_row_tags(model, build):
+    _row_tags[model] = build
+
+def cached_with_tags(tags, timeout=None, unless=None):
+    """
+    cache.cached for a view whose entries are purged by 'tags', format strings filled
+    from the view arguments (e.g. "customer:{customer_id}"). Only 200 responses are cached.
+    """
+    def make_cache_key(**view_args):
+        resolved = [tag.format(**view_args) for tag in tags]
+        return f"view/{request.full_path}/" + "/".join(tag_generations(resolved))
+
+    def is_ok(rv):
+        status = rv[1] if isinstance(rv, tuple) else rv.status_code
+        return status == 200
+
+    cached = cache.cached(
+        timeout=timeout or TAGGED_CACHE_TIMEOUT,
+        unless=unless,
+        make_cache_key=make_cache_key,
+        response_filter=is_ok
+    )
+
+    # g.cache_result tells app/utils/metrics.py whether the entry was served or the view ran
+    def decorator(view):
+        @wraps(view)
+        def run_view(**view_args):
+            g.cache_result = "bypass" if unless is not None and unless() else "miss"
+            return view(**view_args)
+        cached_view = cached(run_view)
+
+        @wraps(view)
+        def wrapper(**view_args):
+            g.cache_result = "hit"
+            return cached_view(**view_args)
+        return wrapper
+    return decorator
+
+# Session hooks: collect tags while flushing, purge them once the transaction commits
+def _pending_tags(session) -> set:
+    return session.info.setdefault("cache_tags", set())
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_tags(session, flush_context):
+    tags = _pending_tags(session)
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        mapper = inspect(instance).mapper
+        pk = mapper.primary_key_from_instance(instance)
+        tags.add(f"{mapper.local_table.name}:list")
+        if len(pk) == 1 and pk[0] is not None:
+            tags.add(entity_tag(mapper.class_, pk[0]))
+        build = _row_tags.get(mapper.class_)
+        if build is not None:
+            tags.update(build(instance))
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_tags(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = orm_execute_state.statement.table
+        _pending_tags(orm_execute_state.session).update({table.name, f"{table.name}:list"})
+
+@event.listens_for(Session, "after_commit")
+def _purge_committed_tags(session):
+    tags = session.info.pop("cache_tags", None)
+    if tags and has_app_context():
+        invalidate_tags(tags)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_tags(session):
+    session.info.pop("cache_tags", None)
@@ -0,0 +1,80 @@
+from app.extensions import db
+from marshmallow import fields
+from sqlalchemy import event, select
+from sqlalchemy.orm import RelationshipProperty, Session, selectinload, joinedload
+from contextlib import contextmanager
+
+# Eager loading declared by the schemas that dump relationships.
+#
+# A model schema lists the relationships it dumps in its Meta:
+#
+#     class Meta:
+#         model = Ticket
+#         eager_load = ("mechanics",)
+#
+# & loader_options(schema) turns them into loader options, selectinload for collections (one
+# SELECT ... IN per relationship, however many rows) & joinedload for many-to-one. A nested
+# schema's own eager_load is chained under its parent's, so dumping a list costs the same
+# number of queries for 1 row as for 1000. Relationships a schema instance leaves out with
+# only= or exclude= aren't loaded. select_for() & get_for() apply the options for you.
+# tests/test_eager_loading.py dumps every schema under raise_on_lazy_load(), the lazy="raise"
+# of every relationship at once, so a relationship that's dumped without being declared fails
+# there instead of going N+1 in production.
+
+_options = {} # id(schema) -> (schema, options), the schema kept so its id isn't reused
+
+def _nested_schema(field):
+    if isinstance(field, fields.List):
+        field = field.inner
+    return field.schema if isinstance(field, fields.Nested) else None
+
+def _loaders(schema, model, parent=None) -> list:
+    loaders = []
+    dumped = {} # attribute read -> field, 'inventory_item.name' reads inventory_item
+    for name, field in schema.dump_fields.items():
+        dumped.setdefault((field.attribute or name).split(".")[0], field)
+    for name in getattr(schema.Meta, "eager_load", ()):
+        prop = getattr(getattr(model, name, None), "property", None)
+        if not isinstance(prop, RelationshipProperty):
+            raise ValueError(f"{type(schema).__name__}.Meta.eager_load: {model.__name__}.{name} is not a relationship")
+        if name not in dumped:
+            continue # left out of this instance with only= or exclude=
+        strategy = selectinload if prop.uselist else joinedload
+        loader = strategy(prop.class_attribute) if parent is None else getattr(parent, strategy.__name__)(prop.class_attribute)
+
+        nested = _nested_schema(dumped[name])
+        chained = _loaders(nested, prop.mapper.class_, loader) if nested is not None else []
+        loaders += chained or [loader]
+    return loaders
+
+def loader_options(schema) -> list:
+    """Loader options eager loading every relationship 'schema' (a model schema) dumps"""
+    cached = _options.get(id(schema))
+    if cached is None:
+        cached = _options[id(schema)] = (schema, _loaders(schema, schema.opts.model))
+    return cached[1]
+
+def select_for(schema, *options):
+    """select() of the schema's model, with its loader options & any others"""
+    return select(schema.opts.model).options(*loader_options(schema), *options)
+
+def get_for(schema, ident):
+    """db.session.get() of the schema's model, with its loader options"""
+    return db.session.get(schema.opts.model, ident, options=loader_options(schema))
+
+class LazyLoadError(Exception):
+    pass
+
+def _raise_on_lazy_load(orm_execute_state):
+    parent = orm_execute_state.lazy_loaded_from
+    if parent is not None:
+        raise LazyLoadError(f"{parent.class_.__name__} lazy loaded a relationship: {orm_execute_state.statement}")
+
+@contextmanager
+def raise_on_lazy_load():
+    """Any relationship lazy loading SQL in any session raises LazyLoadError meanwhile, for tests"""
+    event.listen(Session, "do_orm_execute", _raise_on_lazy_load)
+    try:
+        yield
+    finally:
+        event.remove(Session, "do_orm_execute", _raise_on_lazy_load)
@@ -0,0 +1,65 @@
+from app.extensions import db
+from flask import request, make_response, jsonify
+from sqlalchemy import select
+from functools import wraps
+import hashlib
+
+# Strong ETags built from the per-row 'version' column (see app/models.py), so a polling
+# client's If-None-Match can be answered from ids & versions without serializing anything.
+#
+# 'version' is also SQLAlchemy's version_id_col, so an ORM update of a row that another
+# request changed since it was loaded raises StaleDataError instead of silently overwriting
+# it. create_app() turns that into a 409 with stale_data_response().
+
+def entity_etag(model, pk, version) -> str:
+    return f"{model.__tablename__}-{pk}-v{version}"
+
+def collection_etag(model, rows, *extra) -> str:
+    """Digest of the (id, version) pairs in a listing, plus anything else shaping the body"""
+    digest = hashlib.sha1()
+    for row in rows:
+        digest.update(f"{row.id}:{row.version},".encode())
+    for value in extra:
+        digest.update(repr(value).encode())
+    return f"{model.__tablename__}-{digest.hexdigest()}"
+
+def stale_data_response(error):
+    """Error handler for StaleDataError, the row changed between this request's read & its write"""
+    db.session.rollback()
+    return jsonify({"error": "The resource was modified by another request, reload it and retry"}), 409
+
+def not_modified(etag):
+    """A 304 response when the client already holds 'etag', otherwise None"""
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    response = make_response("", 304)
+    response.set_etag(etag)
+    return response
+
+def with_etag(response, etag):
+    response.set_etag(etag)
+    return response
+
+def conditional(model=None):
+    """
+    Makes a GET view conditional. With a 'model', a single-row view's If-None-Match is checked
+    against a version-only lookup of the row, so neither the view nor any cache it wraps runs
+    when the client is up to date. Without one, the view's (possibly cached) response becomes
+    a 304 when its ETag matches.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(**view_args):
+            if model is None:
+                return make_response(view(**view_args)).make_conditional(request)
+            
+            if request.if_none_match:
+                (pk,) = view_args.values()
+                version = db.session.scalar(select(model.version).where(model.id == pk))
+                if version is not None:
+                    response = not_modified(entity_etag(model, pk, version))
+                    if response is not None:
+                        return response
+            return view(**view_args)
+        return wrapper
+    return decorator
@@ -0,0 +1,58 @@
+from app.extensions import db
+from app.models import Ticket, TicketInventory, Inventory
+from sqlalchemy import select, update, func
+
+# Helpers for the denormalized Ticket.parts_total column. Adding parts increments the
+# total in the same transaction (see add_inventory), anything else that changes what a
+# ticket's parts cost (price edits, deleted inventory) recomputes the affected totals.
+
+def parts_total_subquery(ticket_id_column):
+    """Correlated SUM(quantity * price) of the parts on a ticket, 0 when it has none"""
+    return (
+        select(func.coalesce(func.sum(TicketInventory.quantity * Inventory.price), 0))
+        .join(Inventory, Inventory.id == TicketInventory.inventory_id)
+        .where(TicketInventory.ticket_id == ticket_id_column)
+        .scalar_subquery()
+    )
+
+def recompute_parts_totals(ticket_ids=None) -> int:
+    """
+    Recomputes parts_total with a single UPDATE for every ticket, or only for
+    'ticket_ids' (a list or a select of ids). Returns the number of tickets updated.
+    """
+    statement = update(Ticket).values(parts_total=parts_total_subquery(Ticket.id), version=Ticket.version + 1)
+    if ticket_ids is not None:
+        statement = statement.where(Ticket.id.in_(ticket_ids))
+
+    result = db.session.execute(statement.execution_options(synchronize_session=False))
+    return result.rowcount
+
+def invoice_line_items(ticket_ids) -> dict:
+    """Line items for each ticket in 'ticket_ids' from one joined query, keyed by ticket id"""
+    query = (
+        select(TicketInventory.ticket_id, Inventory.id, Inventory.name, Inventory.price, TicketInventory.quantity)
+        .join(Inventory, Inventory.id == TicketInventory.inventory_id)
+        .where(TicketInventory.ticket_id.in_(ticket_ids))
+        .order_by(TicketInventory.ticket_id, TicketInventory.id)
+    )
+
+    line_items = {ticket_id: [] for ticket_id in ticket_ids}
+    for ticket_id, inventory_id, name, price, quantity in db.session.execute(query):
+        line_items[ticket_id].append({
+            "inventory_id": inventory_id,
+            "name": name,
+            "unit_price": price,
+            "quantity": quantity,
+            "line_total": round(price * quantity, 2)
+        })
+    return line_items
+
+def build_invoice(ticket, line_items) -> dict:
+    return {
+        "ticket_id": ticket.id,
+        "customer_id": ticket.customer_id,
+        "service_date": ticket.service_date.isoformat(),
+        "line_items": line_items,
+        "item_count": sum(item["quantity"] for item in line_items),
+        "parts_total": round(ticket.parts_total, 2)
+    }
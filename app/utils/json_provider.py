@@ -0,0 +1,50 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError: # optional, `pip install orjson`
+    orjson = None
+
+# JSON provider registered in create_app: orjson (pinned in requirements.txt) when it's
+# installed, Flask's stdlib json provider otherwise. Output matches DefaultJSONProvider
+# (sorted keys, compact unless in debug, dates as HTTP dates) with two differences that
+# decode to the same values: non-ASCII text is written as UTF-8 rather than \u escapes,
+# and floats in exponent notation drop the exponent's leading zero ('1e-7', not '1e-07').
+# Anything orjson can't encode (e.g. ints beyond 64 bits) falls back to the stdlib encoder.
+
+class OrjsonProvider(DefaultJSONProvider):
+    def _options(self, pretty=False):
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_SUBCLASS # left to self.default, as in Flask
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if pretty:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def _encode(self, obj, pretty=False) -> bytes:
+        return orjson.dumps(obj, default=self.default, option=self._options(pretty))
+
+    def dumps(self, obj, **kwargs) -> str:
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        try:
+            return self._encode(obj).decode()
+        except orjson.JSONEncodeError:
+            return super().dumps(obj)
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        try:
+            body = self._encode(obj, pretty) + b"\n"
+        except orjson.JSONEncodeError:
+            return super().response(obj)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+def json_provider_class():
+    return OrjsonProvider if orjson is not None else DefaultJSONProvider
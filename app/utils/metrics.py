@@ -0,0 +1,115 @@
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from prometheus_client import CollectorRegistry, Counter, Histogram, REGISTRY, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client import multiprocess
+import os
+import time
+
+# Prometheus metrics for the Flask app, served at GET /metrics.
+#
+# Every request is counted & timed per endpoint (Flask's endpoint name, e.g.
+# 'tickets_bp.get_tickets'), with its response size & the time its SQL statements spent in
+# the database. Views cached with cached_with_tags report hits & misses, & requests turned
+# away by Flask-Limiter are counted per limit. Label children are looked up once per
+# endpoint, so a request costs a few histogram observations.
+#
+# Under gunicorn, set PROMETHEUS_MULTIPROC_DIR to an empty directory before the app is
+# imported: every worker then writes its samples to memory-mapped files there & /metrics
+# sums them, so whichever worker answers the scrape reports the whole server
+# (gunicorn.conf.py clears the directory at startup & tidies up after exited workers).
+
+RESPONSE_SIZE_BUCKETS = (100, 500, 1_000, 5_000, 20_000, 100_000, 500_000, 2_000_000)
+DB_TIME_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+REQUESTS = Counter("http_requests_total", "Requests handled", ["blueprint", "endpoint", "method", "status"])
+LATENCY = Histogram("http_request_duration_seconds", "Time spent handling a request", ["blueprint", "endpoint", "method"])
+RESPONSE_SIZE = Histogram("http_response_size_bytes", "Response body size, streamed responses excluded", ["blueprint", "endpoint"], buckets=RESPONSE_SIZE_BUCKETS)
+DB_TIME = Histogram("http_request_db_seconds", "Time a request spent waiting on SQL statements", ["blueprint", "endpoint"], buckets=DB_TIME_BUCKETS)
+CACHE_REQUESTS = Counter("cache_requests_total", "Lookups of views cached with cached_with_tags", ["endpoint", "result"])
+RATE_LIMITED = Counter("rate_limit_rejections_total", "Requests rejected by Flask-Limiter", ["endpoint", "limit"])
+
+UNMATCHED_ENDPOINT = "unmatched" # 404s & 405s, so unknown paths can't create new series
+
+# (endpoint, method) -> label children of the per-request metrics, (..., status) -> request counter
+_children = {}
+_counters = {}
+
+def _request_children(blueprint, endpoint, method):
+    children = _children.get((endpoint, method))
+    if children is None:
+        children = _children[(endpoint, method)] = (
+            LATENCY.labels(blueprint, endpoint, method),
+            RESPONSE_SIZE.labels(blueprint, endpoint),
+            DB_TIME.labels(blueprint, endpoint)
+        )
+    return children
+
+# g.metrics holds [request start, seconds spent in SQL so far]
+def _start_timer():
+    g.metrics = [time.perf_counter(), 0.0]
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("metrics_start")
+    if starts:
+        elapsed = time.perf_counter() - starts.pop()
+        timer = g.get("metrics") if has_request_context() else None
+        if timer is not None:
+            timer[1] += elapsed
+
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("metrics_start"):
+        connection.info["metrics_start"].pop()
+
+def _record(limiter):
+    def record(response):
+        # the proxies resolved once, each access through them costs about a microsecond
+        state = g._get_current_object()
+        timer = state.pop("metrics", None)
+        if timer is None:
+            return response
+        req = request._get_current_object()
+        blueprint = req.blueprint or ""
+        endpoint = req.endpoint if req.url_rule is not None else UNMATCHED_ENDPOINT
+        latency, size, db_time = _request_children(blueprint, endpoint, req.method)
+
+        latency.observe(time.perf_counter() - timer[0])
+        db_time.observe(timer[1])
+        content_length = response.content_length
+        if content_length is not None:
+            size.observe(content_length)
+        key = (endpoint, req.method, response.status_code)
+        counter = _counters.get(key)
+        if counter is None:
+            counter = _counters[key] = REQUESTS.labels(blueprint, *key)
+        counter.inc()
+
+        cache_result = state.pop("cache_result", None)
+        if cache_result is not None:
+            CACHE_REQUESTS.labels(endpoint, cache_result).inc()
+        if response.status_code == 429:
+            limit = limiter.current_limit
+            if limit is not None and limit.breached:
+                RATE_LIMITED.labels(endpoint, str(limit.limit)).inc()
+        return response
+    return record
+
+def init_metrics(app, engine, limiter):
+    # first of the before_request hooks, so requests the limiter rejects are timed too
+    app.before_request_funcs.setdefault(None, []).insert(0, _start_timer)
+    app.after_request(_record(limiter))
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+def exposition():
+    """(body, content type) of the metrics page, summed over every worker in multiprocess mode"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
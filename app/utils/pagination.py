@@ -0,0 +1,83 @@
+from sqlalchemy import tuple_
+from datetime import date
+import binascii
+import base64
+import json
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Keyset (cursor) pagination helpers. Instead of OFFSET, which makes the database
+# walk & discard every skipped row, we remember the sort key of the last row sent
+# and ask for rows strictly after it. Every page costs the same regardless of depth.
+#
+# 'keys' is an ordered tuple of columns to sort on; the last column must be unique
+# (normally the primary key) so the ordering is total & no row is skipped or repeated.
+
+def encode_cursor(values) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, date) else v for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, keys) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError
+
+        # Cursor values travel as JSON, cast them back to each column's python type
+        decoded = []
+        for column, value in zip(keys, values):
+            python_type = column.type.python_type
+            decoded.append(date.fromisoformat(value) if python_type is date else python_type(value))
+        return decoded
+    except (ValueError, TypeError, binascii.Error, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+def parse_limit(raw_limit, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE) -> int:
+    if raw_limit is None:
+        return default
+    try:
+        limit = int(raw_limit)
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+    return min(limit, maximum)
+
+def keyset_query(query, keys, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """Order, filter past the cursor & fetch one extra row to detect a following page"""
+    if cursor:
+        values = decode_cursor(cursor, keys)
+        if len(keys) == 1:
+            query = query.where(keys[0] > values[0])
+        else:
+            query = query.where(tuple_(*keys) > tuple_(*values))
+
+    return query.order_by(*keys).limit(limit + 1)
+
+def keyset_page(rows, keys, limit):
+    """Trim the look-ahead row & build the response metadata for a page"""
+    rows = list(rows)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column in keys])
+
+    meta = {
+        "limit": limit,
+        "count": len(rows),
+        "has_more": has_more,
+        "next_cursor": next_cursor
+    }
+    return rows, meta
+
+def offset_query(query, page, per_page):
+    """Page/per_page (OFFSET) paging for the smaller tables, raising ValueError below 1"""
+    page, per_page = int(page), int(per_page)
+    if page < 1 or per_page < 1:
+        raise ValueError("page & per_page must be at least 1")
+    return query.limit(per_page).offset((page - 1) * per_page)
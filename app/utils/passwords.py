@@ -0,0 +1,90 @@
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+import hmac
+import os
+import threading
+
+# Customer password hashing (werkzeug's scrypt by default) with bounded concurrency. The
+# request thread hashes itself (hashlib releases the GIL meanwhile, so other threads keep
+# running), but at most PASSWORD_HASH_WORKERS hashes per process run at once since scrypt
+# needs ~32MB each at the default cost. When PASSWORD_HASH_MAX_PENDING hashes are already
+# waiting or running, further calls fail fast with PasswordPoolBusy (a 503) instead of
+# piling up behind them. This only limits concurrency: a waiting request still holds its
+# worker (or its gthread thread), sync gunicorn workers hash one login at a time anyway.
+#
+# Config (all optional):
+#   PASSWORD_HASH_METHOD       werkzeug method string, e.g. "scrypt:32768:8:1" or "pbkdf2:sha256:600000"
+#   PASSWORD_HASH_WORKERS      hashes running at once in each process
+#   PASSWORD_HASH_MAX_PENDING  hashes waiting or running before logins are turned away
+
+PASSWORD_HASH_METHOD = "scrypt:32768:8:1"
+PASSWORD_HASH_WORKERS = 2
+PASSWORD_HASH_MAX_PENDING = 32
+HASH_PREFIXES = ("scrypt:", "pbkdf2:")
+
+class PasswordPoolBusy(Exception):
+    pass
+
+_running = None
+_pending = None
+_slots_pid = None
+_slots_lock = threading.Lock()
+
+def _get_slots():
+    # Created lazily in each process, gunicorn workers forked from a preloading master get their own
+    global _running, _pending, _slots_pid
+    if _slots_pid != os.getpid():
+        with _slots_lock:
+            if _slots_pid != os.getpid():
+                config = current_app.config
+                _running = threading.BoundedSemaphore(config.get("PASSWORD_HASH_WORKERS", PASSWORD_HASH_WORKERS))
+                _pending = threading.BoundedSemaphore(config.get("PASSWORD_HASH_MAX_PENDING", PASSWORD_HASH_MAX_PENDING))
+                _slots_pid = os.getpid()
+    return _running, _pending
+
+def _run_bounded(fn, *args):
+    """Runs fn(*args) on the calling thread once a hashing slot is free, PasswordPoolBusy when too many wait"""
+    running, pending = _get_slots()
+    if not pending.acquire(blocking=False):
+        raise PasswordPoolBusy()
+    try:
+        with running:
+            return fn(*args)
+    finally:
+        pending.release()
+
+def hash_method():
+    return current_app.config.get("PASSWORD_HASH_METHOD", PASSWORD_HASH_METHOD)
+
+def is_password_hash(stored) -> bool:
+    return stored.startswith(HASH_PREFIXES) and stored.count("$") == 2
+
+def hash_password(password) -> str:
+    return _run_bounded(generate_password_hash, password, hash_method())
+
+def verify_password(stored, password):
+    """
+    Checks 'password' against a stored hash, or a legacy plaintext value. Returns
+    (matches, replacement) where replacement is a fresh hash to store when the stored
+    value is plaintext or was hashed with a different method than the configured one.
+    """
+    if is_password_hash(stored):
+        try:
+            matches = _run_bounded(check_password_hash, stored, password)
+        except ValueError:
+            pass # a plaintext password that only looks like a hash, e.g. 'scrypt:x$y$z'
+        else:
+            if not matches:
+                return False, None
+            if stored.split("$", 1)[0] != hash_method():
+                return True, hash_password(password)
+            return True, None
+    
+    if not hmac.compare_digest(stored.encode(), password.encode()):
+        burn_verification(password) # as slow as a hashed mismatch, plaintext rows can't be told apart
+        return False, None
+    return True, hash_password(password)
+
+def burn_verification(password):
+    """Spends the same time as a real check, so unknown emails can't be told apart by latency"""
+    _run_bounded(generate_password_hash, password, hash_method())
@@ -0,0 +1,121 @@
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from functools import wraps
+import threading
+import time
+
+# Connection pool telemetry, served by GET /internal/pool.
+#
+# instrument(engine) times every connection checkout (engine.raw_connection, which
+# Connection & Session go through) and listens to the pool's events. A checkout's wait is
+# the time the request spent getting a connection: blocked on a busy pool, plus opening a
+# new connection or pre-pinging an idle one when that's needed. Checkouts that give up
+# after pool_timeout are counted as timeouts. Counters are per process & cover the
+# engine's lifetime, surviving engine.dispose().
+
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+class PoolStats:
+    def __init__(self, engine):
+        self.engine = engine
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1) # the last one is +Inf
+
+    def record_wait(self, seconds, timed_out=False):
+        ms = seconds * 1000
+        bucket = next((i for i, bound in enumerate(WAIT_BUCKETS_MS) if ms <= bound), len(WAIT_BUCKETS_MS))
+        with self._lock:
+            self.wait_buckets[bucket] += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def on_checkout(self, *args):
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+    def on_checkin(self, *args):
+        with self._lock:
+            self.in_use -= 1
+
+    def on_connect(self, *args):
+        with self._lock:
+            self.connects += 1
+
+    def on_invalidate(self, *args):
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self) -> dict:
+        pool = self.engine.pool
+        with self._lock:
+            waits = sum(self.wait_buckets)
+            buckets = dict(zip([str(bound) for bound in WAIT_BUCKETS_MS] + ["+Inf"], self.wait_buckets))
+            stats = {
+                "pool_class": type(pool).__name__,
+                "size": pool.size() if hasattr(pool, "size") else None,
+                "max_overflow": getattr(pool, "_max_overflow", None),
+                "timeout": getattr(pool, "_timeout", None),
+                "checked_in": pool.checkedin() if hasattr(pool, "checkedin") else None,
+                "overflow": max(pool.overflow(), 0) if hasattr(pool, "overflow") else None,
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "wait_ms": {
+                    "count": waits,
+                    "mean": round(self.wait_total * 1000 / waits, 3) if waits else 0.0,
+                    "max": round(self.wait_max * 1000, 3),
+                    "total": round(self.wait_total * 1000, 3),
+                    "buckets": buckets # checkouts that waited at most this many ms
+                }
+            }
+        return stats
+
+# name -> PoolStats, every instrumented engine in this process
+_registry = {}
+
+def instrument(engine, name="default") -> PoolStats:
+    """Starts collecting pool stats for 'engine' (a sync Engine, e.g. async_engine.sync_engine)"""
+    if name in _registry and _registry[name].engine is engine:
+        return _registry[name]
+
+    stats = PoolStats(engine)
+    raw_connection = engine.raw_connection
+
+    @wraps(raw_connection)
+    def timed_raw_connection():
+        start = time.perf_counter()
+        try:
+            connection = raw_connection()
+        except PoolTimeoutError:
+            stats.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        stats.record_wait(time.perf_counter() - start)
+        return connection
+
+    engine.raw_connection = timed_raw_connection
+    # Listeners on the engine carry over to the pool engine.dispose() recreates
+    event.listen(engine, "checkout", stats.on_checkout)
+    event.listen(engine, "checkin", stats.on_checkin)
+    event.listen(engine, "connect", stats.on_connect)
+    event.listen(engine, "invalidate", stats.on_invalidate)
+    event.listen(engine, "soft_invalidate", stats.on_invalidate)
+    _registry[name] = stats
+    return stats
+
+def pool_snapshots() -> dict:
+    return {name: stats.snapshot() for name, stats in _registry.items()}
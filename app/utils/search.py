@@ -0,0 +1,96 @@
+from app.models import Ticket
+from sqlalchemy import DDL, Float, Integer, event, func, literal, literal_column, or_, select, table, column, text
+
+# Full-text search over Ticket.VIN & Ticket.service_description.
+#
+# SQLite: an external-content FTS5 table (tickets_fts) kept in sync by triggers.
+# Postgres: a generated tsvector column (tickets.search_vector) with a GIN index.
+# Both are created by migration 'b81f0c2d6e3a' and, for databases built with
+# db.create_all() (tests, benchmarks), by the DDL listeners below.
+# Other dialects fall back to an unranked substring scan.
+# SQLite & Postgres both match every term as a prefix, so 'brak' & '1HGBH41' find tickets.
+#
+# Every backend yields a 'score' where lower is better, so results can be keyset
+# paginated on (score, Ticket.id) like any other listing.
+
+VIN_WEIGHT = 10.0 # a VIN hit outranks a description hit
+DESCRIPTION_WEIGHT = 1.0
+
+SQLITE_FTS_DDL = [
+    'DROP TABLE IF EXISTS tickets_fts',
+    'CREATE VIRTUAL TABLE tickets_fts USING fts5('
+    '"VIN", service_description, content=\'tickets\', content_rowid=\'id\', tokenize=\'porter unicode61\')',
+    'CREATE TRIGGER tickets_fts_ai AFTER INSERT ON tickets BEGIN '
+    'INSERT INTO tickets_fts(rowid, "VIN", service_description) VALUES (new.id, new."VIN", new.service_description); '
+    'END',
+    'CREATE TRIGGER tickets_fts_ad AFTER DELETE ON tickets BEGIN '
+    'INSERT INTO tickets_fts(tickets_fts, rowid, "VIN", service_description) VALUES (\'delete\', old.id, old."VIN", old.service_description); '
+    'END',
+    'CREATE TRIGGER tickets_fts_au AFTER UPDATE OF "VIN", service_description ON tickets BEGIN '
+    'INSERT INTO tickets_fts(tickets_fts, rowid, "VIN", service_description) VALUES (\'delete\', old.id, old."VIN", old.service_description); '
+    'INSERT INTO tickets_fts(rowid, "VIN", service_description) VALUES (new.id, new."VIN", new.service_description); '
+    'END',
+    'INSERT INTO tickets_fts(tickets_fts) VALUES (\'rebuild\')'
+]
+
+POSTGRES_FTS_DDL = [
+    'ALTER TABLE tickets ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ('
+    'setweight(to_tsvector(\'simple\', coalesce("VIN", \'\')), \'A\') || '
+    'setweight(to_tsvector(\'english\', coalesce(service_description, \'\')), \'B\')) STORED',
+    'CREATE INDEX IF NOT EXISTS ix_tickets_search_vector ON tickets USING GIN (search_vector)'
+]
+
+for statement in SQLITE_FTS_DDL:
+    event.listen(Ticket.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+for statement in POSTGRES_FTS_DDL:
+    event.listen(Ticket.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+event.listen(Ticket.__table__, "before_drop", DDL("DROP TABLE IF EXISTS tickets_fts").execute_if(dialect="sqlite"))
+
+tickets_fts = table("tickets_fts", column("rowid", Integer))
+
+def fts5_match_expression(search_text):
+    """Quote each term so user input can't inject FTS5 syntax, & prefix match every term"""
+    terms = search_text.split()
+    return " ".join('"' + term.replace('"', '""') + '"*' for term in terms)
+
+def tsquery_expression(search_text):
+    """Quote each term so user input can't inject tsquery syntax, & prefix match every term (ANDed, like FTS5)"""
+    terms = search_text.split()
+    return " & ".join("'" + term.replace("\\", "\\\\").replace("'", "''") + "':*" for term in terms)
+
+def ranked_ticket_ids(dialect_name, search_text):
+    """Subquery of (ticket_id, score) for tickets matching 'search_text'"""
+    if dialect_name == "sqlite":
+        score = func.bm25(literal_column("tickets_fts"), VIN_WEIGHT, DESCRIPTION_WEIGHT, type_=Float)
+        return (
+            select(tickets_fts.c.rowid.label("ticket_id"), score.label("score"))
+            .select_from(tickets_fts)
+            .where(text("tickets_fts MATCH :match_expression").bindparams(match_expression=fts5_match_expression(search_text)))
+            .subquery("ranked")
+        )
+
+    if dialect_name == "postgresql":
+        search_vector = literal_column("tickets.search_vector")
+        tsquery = func.to_tsquery("english", tsquery_expression(search_text))
+        # ts_rank_cd is higher for better matches, negate it so lower is better everywhere
+        score = -func.ts_rank_cd(search_vector, tsquery, type_=Float)
+        return (
+            select(Ticket.id.label("ticket_id"), score.label("score"))
+            .where(search_vector.op("@@")(tsquery))
+            .subquery("ranked")
+        )
+
+    return (
+        select(Ticket.id.label("ticket_id"), literal(0.0, Float).label("score"))
+        .where(or_(
+            Ticket.VIN.icontains(search_text, autoescape=True),
+            Ticket.service_description.icontains(search_text, autoescape=True)
+        ))
+        .subquery("ranked")
+    )
+
+def ticket_search_query(dialect_name, search_text):
+    """Returns (query selecting Ticket & score, keyset sort keys)"""
+    ranked = ranked_ticket_ids(dialect_name, search_text)
+    query = select(Ticket, ranked.c.score, ranked.c.ticket_id).join(ranked, ranked.c.ticket_id == Ticket.id)
+    return query, (ranked.c.score, ranked.c.ticket_id)
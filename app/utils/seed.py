@@ -0,0 +1,256 @@
+from app.extensions import db
+from app.models import Customer, Mechanic, Ticket, Inventory, TicketInventory, ticket_mechanic_joint_table
+from app.utils.passwords import hash_password
+from app.utils.search import SQLITE_FTS_DDL
+from flask.cli import with_appcontext
+from sqlalchemy import insert, select, func, text
+from datetime import date, timedelta
+import random
+import click
+import time
+
+# Synthetic data at production scale: flask seed --customers 100000 --tickets 1000000
+#
+# Rows come from a random.Random(seed), so a seed always yields the same dataset, & go in
+# with batched Core executemany INSERTs (no ORM objects) in one transaction. Primary keys
+# are assigned here, continuing after the rows already in each table, so tickets can
+# reference the customers, mechanics & inventory generated alongside them without reading
+# ids back (PostgreSQL's id sequences are moved past them afterwards, MySQL's AUTO_INCREMENT
+# & SQLite's rowid follow explicit ids by themselves). Everything respects the constraints
+# in app/models.py: emails & inventory names embed the row id, a ticket's mechanics & parts
+# are distinct, & parts_total is the sum of the ticket's parts as the API keeps it.
+
+SEED_BATCH_SIZE = 10_000
+SEED_PASSWORD = "password" # every seeded customer can log in with it
+
+FIRST_NAMES = ["James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+               "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Carlos", "Maria",
+               "Wei", "Mei", "Ahmed", "Fatima", "Diego", "Sofia", "Kenji", "Yuki", "Ivan", "Olga"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+              "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+              "Lee", "Chen", "Wang", "Kim", "Nguyen", "Patel", "Khan", "Tanaka", "Ivanov", "Muller"]
+EMAIL_DOMAINS = ["example.com", "example.org", "example.net", "mail.example.com"]
+PART_BRANDS = ["Bosch", "ACDelco", "Motorcraft", "Denso", "NGK", "Mobil 1", "Castrol", "Wagner", "Monroe", "Gates"]
+PART_NAMES = ["Brake Pads", "Brake Rotor", "Oil Filter", "Air Filter", "Cabin Filter", "Spark Plug", "Wiper Blade",
+              "Serpentine Belt", "Timing Belt", "Water Pump", "Alternator", "Starter", "Battery", "Shock Absorber",
+              "Strut Assembly", "Ignition Coil", "Radiator Hose", "Thermostat", "Fuel Pump", "O2 Sensor"]
+SERVICES = ["Oil change", "Brake pad replacement", "Tire rotation", "Wheel alignment", "Battery replacement",
+            "Coolant flush", "Transmission service", "Spark plug replacement", "AC recharge", "Timing belt replacement",
+            "Suspension inspection", "Check engine light diagnosis", "Alternator replacement", "Fuel system cleaning"]
+SERVICE_NOTES = ["customer reports squeaking", "scheduled maintenance", "noise when braking", "vibration at highway speed",
+                 "warning light on dash", "pre-purchase inspection", "fleet vehicle", "follow-up visit"]
+# VIN = manufacturer (WMI) + vehicle descriptor & check digit + model year + plant + serial number
+VIN_MANUFACTURERS = ["1FA", "1FT", "1G1", "1GC", "1HG", "1N4", "2HG", "2T1", "3VW", "4T1", "5YJ", "JHM", "JTD", "KMH", "WBA", "WVW"]
+VIN_CHARACTERS = "ABCDEFGHJKLMNPRSTUVWXYZ0123456789" # VINs never use I, O or Q
+VIN_YEARS = "ABCDEFGHJKLMNPRS123456789"
+SERVICE_HISTORY_END = date(2025, 12, 31) # fixed, so a seed gives the same dates any day it's run
+SERVICE_HISTORY_DAYS = 3 * 365
+FTS_INSERT_TRIGGER = next(statement for statement in SQLITE_FTS_DDL if statement.startswith("CREATE TRIGGER tickets_fts_ai "))
+
+def _next_id(connection, model) -> int:
+    return (connection.scalar(select(func.max(model.id))) or 0) + 1
+
+def _sync_id_sequences(connection):
+    """Moves PostgreSQL's id sequences past the explicit ids, or the API's next INSERT would reuse one"""
+    if connection.dialect.name != "postgresql":
+        return
+    for model in (Customer, Mechanic, Inventory, Ticket):
+        table = model.__tablename__
+        connection.execute(select(func.setval(func.pg_get_serial_sequence(table, "id"), func.max(model.id))))
+
+def _bulk_insert(connection, table, columns, rows):
+    """
+    Rows (tuples in 'columns' order) as one executemany of the table's Core insert(), compiled
+    once & handed to the driver as is: no per row parameter processing, so values must
+    already be what the driver expects. Columns left out get their scalar defaults.
+    """
+    if not rows:
+        return
+    compiled = insert(table).compile(dialect=connection.dialect, column_keys=columns)
+    defaults = {column.key: column.default.arg for column in table.c if column.default is not None and column.default.is_scalar}
+    if compiled.positional:
+        keys = list(compiled.positiontup)
+        if keys[:len(columns)] == columns:
+            extra = tuple(defaults[key] for key in keys[len(columns):])
+            parameters = [row + extra for row in rows] if extra else rows
+        else:
+            order = [columns.index(key) if key in columns else None for key in keys]
+            parameters = [tuple(defaults[key] if i is None else row[i] for key, i in zip(keys, order)) for row in rows]
+    else:
+        parameters = [{**defaults, **dict(zip(columns, row))} for row in rows]
+    connection.exec_driver_sql(compiled.string, parameters)
+
+def _people(rng, first_id, count):
+    rnd = rng.random
+    for row_id in range(first_id, first_id + count):
+        first, last = FIRST_NAMES[int(rnd() * len(FIRST_NAMES))], LAST_NAMES[int(rnd() * len(LAST_NAMES))]
+        yield (
+            row_id,
+            f"{first} {last}",
+            f"{first.lower()}.{last.lower()}.{row_id}@{EMAIL_DOMAINS[int(rnd() * len(EMAIL_DOMAINS))]}",
+            f"{int(rnd() * 800) + 200}{int(rnd() * 10_000_000):07d}"
+        )
+
+def seed_database(customers=0, mechanics=0, inventory=0, tickets=0, mechanics_per_ticket=2, parts_per_ticket=3,
+                  seed=1, batch_size=SEED_BATCH_SIZE) -> dict:
+    """
+    Generates & inserts the requested rows, tickets referencing both new & existing rows.
+    Each ticket gets 1 to 'mechanics_per_ticket' mechanics & 0 to 'parts_per_ticket'
+    parts. Doesn't commit. Returns the number of rows inserted into each table.
+    """
+    rng = random.Random(seed)
+    rnd = rng.random
+    connection = db.session.connection()
+    inserted = {}
+
+    customer_id = _next_id(connection, Customer)
+    password = hash_password(SEED_PASSWORD) if customers else None
+    for offset in range(0, customers, batch_size):
+        rows = [(*person, password) for person in _people(rng, customer_id + offset, min(batch_size, customers - offset))]
+        _bulk_insert(connection, Customer.__table__, ["id", "name", "email", "phone", "password"], rows)
+    inserted["customers"] = customers
+
+    mechanic_id = _next_id(connection, Mechanic)
+    rows = [(*person, float(rng.randrange(40_000, 120_000, 500))) for person in _people(rng, mechanic_id, mechanics)]
+    for offset in range(0, mechanics, batch_size):
+        _bulk_insert(connection, Mechanic.__table__, ["id", "name", "email", "phone", "salary"], rows[offset:offset + batch_size])
+    inserted["mechanics"] = mechanics
+
+    inventory_id = _next_id(connection, Inventory)
+    rows = [(
+        row_id,
+        f"{rng.choice(PART_BRANDS)} {rng.choice(PART_NAMES)} #{row_id}",
+        round(rng.lognormvariate(3.5, 0.9) + 1, 2)
+    ) for row_id in range(inventory_id, inventory_id + inventory)]
+    for offset in range(0, inventory, batch_size):
+        _bulk_insert(connection, Inventory.__table__, ["id", "name", "price"], rows[offset:offset + batch_size])
+    inserted["inventory"] = inventory
+
+    inserted.update(tickets=0, ticket_mechanic=0, ticket_inventory=0)
+    if not tickets:
+        _sync_id_sequences(connection)
+        return inserted
+
+    customer_ids = connection.scalars(select(Customer.id).order_by(Customer.id)).all()
+    mechanic_ids = connection.scalars(select(Mechanic.id).order_by(Mechanic.id)).all()
+    prices = dict(connection.execute(select(Inventory.id, Inventory.price).order_by(Inventory.id)).tuples().all())
+    inventory_ids = list(prices)
+    if not customer_ids or not mechanic_ids:
+        raise click.UsageError("Tickets need at least one customer & one mechanic, seed some with --customers & --mechanics")
+    mechanic_count, inventory_count = len(mechanic_ids), len(inventory_ids)
+    mechanics_per_ticket = min(mechanics_per_ticket, mechanic_count)
+    parts_per_ticket = min(parts_per_ticket, inventory_count)
+
+    # pools drawn from per ticket, dates as the ISO text SQLite stores them (sqlite3's date
+    # adapter is slow & deprecated), date objects for other drivers
+    to_date = date.isoformat if connection.dialect.name == "sqlite" else (lambda value: value)
+    service_dates = [to_date(SERVICE_HISTORY_END - timedelta(days=d)) for d in range(SERVICE_HISTORY_DAYS)]
+    descriptions = SERVICES + [f"{service}, {note}" for service in SERVICES for note in SERVICE_NOTES]
+    # a vehicle per customer, so a customer's tickets are repeat visits of the same car
+    vehicles = [(
+        customer,
+        rng.choice(VIN_MANUFACTURERS) + "".join(rng.choices(VIN_CHARACTERS, k=6)) + rng.choice(VIN_YEARS)
+            + rng.choice(VIN_CHARACTERS) + f"{rng.randrange(1_000_000):06d}"
+    ) for customer in customer_ids]
+
+    # On SQLite, a load at least doubling the tickets skips the FTS insert trigger & the
+    # secondary indexes of the ticket tables, then indexes everything once at the end:
+    # several times faster than maintaining them row by row
+    first_ticket_id = _next_id(connection, Ticket)
+    deferred_indexes, fts_trigger = [], False
+    if connection.dialect.name == "sqlite" and tickets >= first_ticket_id - 1:
+        # sqlite3 only BEGINs before DML, a savepoint opens the transaction now so the DDL is
+        # in it too (never released, the session's commit or rollback ends it)
+        connection.exec_driver_sql("SAVEPOINT seed_tickets")
+        existing = set(connection.scalars(text("SELECT name FROM sqlite_master WHERE type IN ('index', 'trigger')")))
+        fts_trigger = "tickets_fts_ai" in existing
+        if fts_trigger:
+            connection.exec_driver_sql("DROP TRIGGER tickets_fts_ai")
+        for table in (Ticket.__table__, ticket_mechanic_joint_table, TicketInventory.__table__):
+            deferred_indexes += [index for index in table.indexes if index.name in existing]
+        for index in deferred_indexes:
+            index.drop(connection)
+
+    for offset in range(0, tickets, batch_size):
+        ticket_rows, mechanic_rows, part_rows = [], [], []
+        add_ticket, add_mechanic, add_part = ticket_rows.append, mechanic_rows.append, part_rows.append
+        for ticket_id in range(first_ticket_id + offset, first_ticket_id + min(offset + batch_size, tickets)):
+            # distinct parts & mechanics by redrawing repeats, cheaper than random.sample for a few
+            parts, parts_total = [], 0.0
+            for _ in range(int(rnd() * (parts_per_ticket + 1))):
+                part_id = inventory_ids[int(rnd() * inventory_count)]
+                while part_id in parts:
+                    part_id = inventory_ids[int(rnd() * inventory_count)]
+                parts.append(part_id)
+                quantity = int(rnd() * 4) + 1
+                parts_total += prices[part_id] * quantity
+                add_part((ticket_id, part_id, quantity))
+            assigned = []
+            for _ in range(int(rnd() * mechanics_per_ticket) + 1):
+                mechanic = mechanic_ids[int(rnd() * mechanic_count)]
+                while mechanic in assigned:
+                    mechanic = mechanic_ids[int(rnd() * mechanic_count)]
+                assigned.append(mechanic)
+                add_mechanic((ticket_id, mechanic))
+            customer, vin = vehicles[int(rnd() * len(vehicles))]
+            add_ticket((
+                ticket_id,
+                vin,
+                service_dates[int(rnd() * SERVICE_HISTORY_DAYS)],
+                descriptions[int(rnd() * len(descriptions))],
+                customer,
+                round(parts_total, 2)
+            ))
+        _bulk_insert(connection, Ticket.__table__, ["id", "VIN", "service_date", "service_description", "customer_id", "parts_total"], ticket_rows)
+        _bulk_insert(connection, ticket_mechanic_joint_table, ["ticket_id", "mechanic_id"], mechanic_rows)
+        _bulk_insert(connection, TicketInventory.__table__, ["ticket_id", "inventory_id", "quantity"], part_rows)
+        inserted["ticket_mechanic"] += len(mechanic_rows)
+        inserted["ticket_inventory"] += len(part_rows)
+
+    for index in deferred_indexes:
+        index.create(connection)
+    if fts_trigger:
+        connection.exec_driver_sql(FTS_INSERT_TRIGGER)
+        connection.exec_driver_sql("INSERT INTO tickets_fts(tickets_fts) VALUES ('rebuild')")
+    _sync_id_sequences(connection)
+    inserted["tickets"] = tickets
+    return inserted
+
+@click.command("seed")
+@click.option("--customers", default=1_000, show_default=True)
+@click.option("--mechanics", default=50, show_default=True)
+@click.option("--inventory", default=500, show_default=True)
+@click.option("--tickets", default=10_000, show_default=True)
+@click.option("--mechanics-per-ticket", default=2, show_default=True, help="Each ticket gets 1 to this many")
+@click.option("--parts-per-ticket", default=3, show_default=True, help="Each ticket gets 0 to this many")
+@click.option("--seed", default=1, show_default=True, help="Same seed, same data")
+@click.option("--batch-size", default=SEED_BATCH_SIZE, show_default=True, help="Rows per INSERT executemany")
+@click.option("--create-tables", is_flag=True, help="Create missing tables first (db.create_all)")
+@with_appcontext
+def seed_command(customers, mechanics, inventory, tickets, mechanics_per_ticket, parts_per_ticket, seed, batch_size, create_tables):
+    """Insert deterministic synthetic customers, mechanics, inventory & tickets."""
+    if create_tables:
+        db.create_all()
+
+    start = time.perf_counter()
+    connection = db.session.connection()
+    sqlite = connection.dialect.name == "sqlite"
+    if sqlite: # no fsyncs & a bigger page cache while loading, restored for the app afterwards
+        pragmas = {pragma: connection.exec_driver_sql(f"PRAGMA {pragma}").scalar() for pragma in ("synchronous", "cache_size")}
+        connection.exec_driver_sql("PRAGMA synchronous = OFF")
+        connection.exec_driver_sql("PRAGMA cache_size = -262144") # KiB
+    try:
+        inserted = seed_database(customers, mechanics, inventory, tickets, mechanics_per_ticket, parts_per_ticket, seed, batch_size)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    finally:
+        if sqlite:
+            connection = db.session.connection()
+            for pragma, value in pragmas.items():
+                connection.exec_driver_sql(f"PRAGMA {pragma} = {int(value)}")
+            db.session.commit()
+
+    click.echo(", ".join(f"{table}: {count}" for table, count in inserted.items()))
+    click.echo(f"Seeded in {time.perf_counter() - start:.1f}s, customers log in with password '{SEED_PASSWORD}'")
@@ -0,0 +1,123 @@
+from app.extensions import db
+from flask import current_app, g, request, has_request_context
+from sqlalchemy import event
+from collections import Counter
+import logging
+import json
+import time
+import re
+
+# Opt-in per-request SQL profiler (SQL_PROFILER_ENABLED). Cursor execute events count the
+# statements each request sends, time them & group them by shape: the SQL text with its
+# whitespace collapsed & IN lists reduced to one placeholder, so the same lazy load for
+# different rows shares a shape. A SELECT shape repeated SQL_PROFILER_N_PLUS_ONE_THRESHOLD
+# times or more in one request is flagged as a likely N+1.
+#
+# SQL_PROFILER_OUTPUT picks where results go, by default headers in debug & logs otherwise:
+#   "headers"  X-SQL-Query-Count, X-SQL-Time-Ms, Server-Timing (shown by browser dev tools)
+#              & an X-SQL-N-Plus-One header per flagged shape
+#   "log"      one JSON line per request on this module's logger, a warning when flagged.
+#              Nothing configures logging in production (gunicorn only sets up its own
+#              loggers), so the logger gets an INFO level & a stderr handler of its own
+#              unless logging was configured already.
+
+SQL_PROFILER_N_PLUS_ONE_THRESHOLD = 5
+MAX_HEADER_STATEMENT = 200
+
+logger = logging.getLogger(__name__)
+
+_whitespace = re.compile(r"\s+")
+_placeholder = r"(?:\?|%s|%\(\w+\)s|:\w+)"
+_in_list = re.compile(rf"\(\s*{_placeholder}(?:\s*,\s*{_placeholder})+\s*\)")
+
+def statement_shape(statement) -> str:
+    return _in_list.sub("(?)", _whitespace.sub(" ", statement).strip())
+
+class RequestProfile:
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement, seconds):
+        self.queries += 1
+        self.seconds += seconds
+        self.shapes[statement_shape(statement)] += 1
+
+    def n_plus_one(self, threshold) -> list:
+        """(count, shape) of repeated SELECT shapes, most repeated first"""
+        return [
+            (count, shape) for shape, count in self.shapes.most_common()
+            if count >= threshold and shape[:6].upper() == "SELECT"
+        ]
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and "sql_profile" in g:
+        conn.info.setdefault("sql_profiler_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and "sql_profile" in g:
+        starts = conn.info.get("sql_profiler_start")
+        if starts:
+            g.sql_profile.record(statement, time.perf_counter() - starts.pop())
+
+def _handle_error(exception_context):
+    # the statement failed, after_cursor_execute won't pop its start time
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("sql_profiler_start"):
+        connection.info["sql_profiler_start"].pop()
+
+def _start_profile():
+    g.sql_profile = RequestProfile()
+
+def _report(response):
+    profile = g.pop("sql_profile", None)
+    if profile is None:
+        return response
+    config = current_app.config
+    output = config.get("SQL_PROFILER_OUTPUT") or ("headers" if current_app.debug else "log")
+    suspects = profile.n_plus_one(config.get("SQL_PROFILER_N_PLUS_ONE_THRESHOLD", SQL_PROFILER_N_PLUS_ONE_THRESHOLD))
+    db_ms = round(profile.seconds * 1000, 3)
+
+    if output == "headers":
+        response.headers["X-SQL-Query-Count"] = str(profile.queries)
+        response.headers["X-SQL-Time-Ms"] = str(db_ms)
+        response.headers.add("Server-Timing", f'db;dur={db_ms};desc="{profile.queries} queries"')
+        for count, shape in suspects:
+            response.headers.add("X-SQL-N-Plus-One", f"{count}x {shape[:MAX_HEADER_STATEMENT]}")
+    else:
+        record = {
+            "event": "sql_profile",
+            "method": request.method,
+            "path": request.path,
+            "endpoint": request.endpoint,
+            "status": response.status_code,
+            "queries": profile.queries,
+            "db_ms": db_ms,
+            "n_plus_one": [{"count": count, "statement": shape} for count, shape in suspects]
+        }
+        logger.log(logging.WARNING if suspects else logging.INFO, json.dumps(record))
+    return response
+
+def _configure_logger():
+    if logger.level == logging.NOTSET:
+        logger.setLevel(logging.INFO)
+    if not logger.handlers and not logging.getLogger().handlers:
+        handler = logging.StreamHandler() # stderr, one JSON record per line
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.propagate = False # a root handler configured later would print every record twice
+
+def init_sql_profiler(app):
+    """Profiles every request of 'app' when SQL_PROFILER_ENABLED is set, call with db initialized"""
+    if not app.config.get("SQL_PROFILER_ENABLED", False):
+        return
+    if app.config.get("SQL_PROFILER_OUTPUT") != "headers": # "log", or the default once debug is off
+        _configure_logger()
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    app.before_request(_start_profile)
+    app.after_request(_report)
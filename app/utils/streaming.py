@@ -0,0 +1,46 @@
+from app.extensions import db
+from flask import Response, current_app, request, stream_with_context
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+STREAM_BATCH_SIZE = 500
+
+# Streaming list responses. Rows are read from the database in batches with
+# yield_per & each batch is serialized & flushed to the client before the next
+# is fetched, so memory stays flat no matter how large the table grows.
+
+def wants_ndjson() -> bool:
+    return request.accept_mimetypes.best_match(["application/json", NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+def wants_stream() -> bool:
+    """Streaming is requested with ?stream=1 or an 'Accept: application/x-ndjson' header"""
+    return request.args.get("stream", "").lower() in ("1", "true") or wants_ndjson()
+
+def stream_rows(query, schema, batch_size=None) -> Response:
+    """
+    Streams every row of 'query' (entities or column rows) through 'schema', a many=True
+    schema or compiled serializer. Responds with NDJSON (one object per line) when the
+    client accepts it, otherwise with a JSON array equivalent to the non-streamed body.
+    """
+    ndjson = wants_ndjson()
+    dumps = current_app.json.dumps
+    batch_size = batch_size or STREAM_BATCH_SIZE
+
+    def generate():
+        result = db.session.execute(query.execution_options(yield_per=batch_size))
+        if len(query.selected_columns) == 1:
+            result = result.scalars() # entities, rather than column-only rows
+        first = True
+        if not ndjson:
+            yield "["
+        for partition in result.partitions():
+            items = [dumps(item) for item in schema.dump(partition)]
+            if ndjson:
+                yield "\n".join(items) + "\n"
+            else:
+                yield ("" if first else ",") + ",".join(items)
+            first = False
+        if not ndjson:
+            yield "]\n"
+
+    mimetype = NDJSON_MIMETYPE if ndjson else "application/json"
+    return Response(stream_with_context(generate()), mimetype=mimetype)
@@ -0,0 +1,293 @@
+from flask_caching.backends.base import BaseCache
+from werkzeug.utils import import_string
+from collections import OrderedDict
+import logging
+import os
+import pickle
+import threading
+import time
+import uuid
+
+# Two-tier cache backend for multi-worker deployments (CACHE_TYPE = "app.utils.two_tier_cache.TwoTierCache").
+#
+# L1 is a bounded LRU inside each worker process, L2 is shared by every worker: Redis
+# (CACHE_REDIS_URL) or a FileSystemCache in CACHE_DIR on a single host (point it at
+# /dev/shm to keep it in shared memory). Reads fall through L1 -> L2, writes go to L2
+# first & then broadcast the changed keys so every other worker drops them from its L1:
+#   Redis       pub/sub on the L2 server, applied by a listener thread per worker
+#   filesystem  an append-only journal next to CACHE_DIR that workers tail before each read
+# L1 entries also expire after CACHE_L1_TIMEOUT seconds, which bounds staleness should an
+# invalidation message ever be lost (e.g. while Redis is unreachable).
+
+L1_MAX_ENTRIES = 1024
+L1_TIMEOUT = 30
+JOURNAL_MAX_BYTES = 1 << 20
+CLEAR_ALL = "*"
+
+logger = logging.getLogger(__name__)
+
+class LRUCache:
+    """Bounded, thread safe in-process LRU holding pickled values, so requests never share objects"""
+    def __init__(self, max_entries, timeout):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.version = 0 # bumped by every local change, see fill()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return pickle.loads(payload)
+
+    def set(self, key, value, timeout=0):
+        with self._lock:
+            self._store(key, value, timeout)
+
+    def fill(self, key, value, seen_version):
+        """Stores a value read from L2, unless anything changed locally since the read began"""
+        with self._lock:
+            if self.version == seen_version:
+                self._store(key, value, 0)
+
+    def _store(self, key, value, timeout):
+        ttl = min(timeout, self.timeout) if timeout else self.timeout
+        self._entries[key] = (time.monotonic() + ttl, pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def evict(self, keys):
+        with self._lock:
+            self.version += 1
+            if CLEAR_ALL in keys:
+                self._entries.clear()
+            for key in keys:
+                self._entries.pop(key, None)
+
+class NullInvalidationBus:
+    """Single process deployments, nobody else holds an L1"""
+    def publish(self, keys):
+        pass
+
+    def poll(self):
+        pass
+
+class FileInvalidationBus:
+    """
+    Single host: invalidated keys are appended to a journal file (one short O_APPEND write
+    per change, so lines never interleave) that every worker tails from its last offset.
+    Past JOURNAL_MAX_BYTES the file is unlinked & restarted, readers noticing the new file
+    drop their whole L1 since they may have missed its last lines.
+    """
+    def __init__(self, path, on_invalidate):
+        self.path = path
+        self.on_invalidate = on_invalidate
+        self.sender = uuid.uuid4().hex
+        self._lock = threading.Lock()
+        stat = self._stat()
+        self._inode, self._offset = (stat.st_ino, stat.st_size) if stat else (None, 0)
+
+    def _stat(self):
+        try:
+            return os.stat(self.path)
+        except FileNotFoundError:
+            return None
+
+    def publish(self, keys):
+        data = "".join(f"{self.sender}\t{key}\n" for key in keys).encode()
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, data)
+            size = os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+        if size > JOURNAL_MAX_BYTES:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+    def poll(self):
+        stat = self._stat()
+        inode, size = (stat.st_ino, stat.st_size) if stat else (None, 0)
+        with self._lock:
+            if inode != self._inode or size < self._offset:
+                rotated = self._inode is not None
+                self._inode, self._offset = inode, 0
+                if rotated:
+                    self.on_invalidate([CLEAR_ALL])
+            if size <= self._offset:
+                return
+            with open(self.path, "rb") as journal:
+                journal.seek(self._offset)
+                chunk = journal.read(size - self._offset)
+            complete = chunk.rfind(b"\n") + 1 # a line still being written is read next time
+            self._offset += complete
+
+        keys = []
+        for line in chunk[:complete].decode().splitlines():
+            sender, key = line.split("\t", 1)
+            if sender != self.sender:
+                keys.append(key)
+        if keys:
+            self.on_invalidate(keys)
+
+class RedisInvalidationBus:
+    """
+    Redis pub/sub on the L2 server. The listener thread starts lazily in each process, so
+    workers forked from a preloading master each get their own.
+    """
+    def __init__(self, client, channel, on_invalidate):
+        self.client = client
+        self.channel = channel
+        self.on_invalidate = on_invalidate
+        self.sender = uuid.uuid4().hex
+        self._listener_pid = None
+        self._lock = threading.Lock()
+
+    def publish(self, keys):
+        self.client.publish(self.channel, self.sender + "\t" + "\n".join(keys))
+
+    def poll(self):
+        if self._listener_pid == os.getpid():
+            return
+        with self._lock:
+            if self._listener_pid != os.getpid():
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(**{self.channel: self._handle})
+                pubsub.run_in_thread(sleep_time=1.0, daemon=True, exception_handler=self._handle_error)
+                self._listener_pid = os.getpid()
+
+    def _handle(self, message):
+        data = message["data"]
+        sender, keys = (data.decode() if isinstance(data, bytes) else data).split("\t", 1)
+        if sender != self.sender:
+            self.on_invalidate(keys.split("\n"))
+
+    def _handle_error(self, error, pubsub, thread):
+        # Messages may have been missed while disconnected, start over with an empty L1
+        logger.warning("L1 invalidation listener lost its Redis connection: %s", error)
+        self.on_invalidate([CLEAR_ALL])
+        time.sleep(1.0)
+
+def redis_client(config):
+    """Client the invalidation bus publishes & subscribes with, on the CACHE_REDIS_URL server"""
+    import redis # only needed with CACHE_REDIS_URL, like flask_caching's RedisCache
+    return redis.from_url(config["CACHE_REDIS_URL"])
+
+class TwoTierCache(BaseCache):
+    def __init__(self, l2, bus_factory, l1_max_entries=L1_MAX_ENTRIES, l1_timeout=L1_TIMEOUT, default_timeout=300):
+        super().__init__(default_timeout=default_timeout)
+        self.l2 = l2
+        self.l1 = LRUCache(l1_max_entries, l1_timeout)
+        self.bus = bus_factory(self.l1.evict)
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        l2_type = config.get("CACHE_L2_TYPE") or ("RedisCache" if config.get("CACHE_REDIS_URL") else "FileSystemCache")
+        backend = import_string(l2_type if "." in l2_type else f"flask_caching.backends.{l2_type}")
+        l2 = backend.factory(app, config, list(args), dict(kwargs))
+
+        if config.get("CACHE_REDIS_URL"):
+            channel = f"{config['CACHE_KEY_PREFIX']}l1-invalidations"
+            client = redis_client(config)
+            bus_factory = lambda on_invalidate: RedisInvalidationBus(client, channel, on_invalidate)
+        elif config.get("CACHE_DIR"):
+            journal = config.get("CACHE_L1_JOURNAL") or config["CACHE_DIR"].rstrip(os.sep) + ".invalidations"
+            bus_factory = lambda on_invalidate: FileInvalidationBus(journal, on_invalidate)
+        else:
+            bus_factory = lambda on_invalidate: NullInvalidationBus()
+
+        return cls(
+            l2,
+            bus_factory,
+            l1_max_entries=config.get("CACHE_L1_MAX_ENTRIES", L1_MAX_ENTRIES),
+            l1_timeout=config.get("CACHE_L1_TIMEOUT", L1_TIMEOUT),
+            **kwargs
+        )
+
+    def _changed(self, keys):
+        """Drops 'keys' from this worker's L1 & tells every other worker to do the same"""
+        self.l1.evict(keys)
+        self.bus.publish(keys)
+
+    def get(self, key):
+        self.bus.poll()
+        value = self.l1.get(key)
+        if value is None:
+            seen_version = self.l1.version
+            value = self.l2.get(key)
+            if value is not None:
+                self.l1.fill(key, value, seen_version)
+        return value
+
+    def get_many(self, *keys):
+        self.bus.poll()
+        values = [self.l1.get(key) for key in keys]
+        missing = [key for key, value in zip(keys, values) if value is None]
+        if missing:
+            seen_version = self.l1.version
+            found = dict(zip(missing, self.l2.get_many(*missing)))
+            for key, value in found.items():
+                if value is not None:
+                    self.l1.fill(key, value, seen_version)
+            values = [found[key] if value is None else value for key, value in zip(keys, values)]
+        return values
+
+    def has(self, key):
+        self.bus.poll()
+        return self.l1.get(key) is not None or self.l2.has(key)
+
+    def set(self, key, value, timeout=None):
+        result = self.l2.set(key, value, timeout)
+        self._changed([key])
+        if result:
+            self.l1.set(key, value, self._normalize_timeout(timeout))
+        return result
+
+    def add(self, key, value, timeout=None):
+        added = self.l2.add(key, value, timeout)
+        if added:
+            self._changed([key])
+            self.l1.set(key, value, self._normalize_timeout(timeout))
+        return added
+
+    def set_many(self, mapping, timeout=None):
+        stored = self.l2.set_many(mapping, timeout)
+        self._changed(list(mapping))
+        for key in stored:
+            self.l1.set(key, mapping[key], self._normalize_timeout(timeout))
+        return stored
+
+    def delete(self, key):
+        deleted = self.l2.delete(key)
+        self._changed([key])
+        return deleted
+
+    def delete_many(self, *keys):
+        deleted = self.l2.delete_many(*keys)
+        self._changed(list(keys))
+        return deleted
+
+    def clear(self):
+        cleared = self.l2.clear()
+        self._changed([CLEAR_ALL])
+        return cleared
+
+    def inc(self, key, delta=1):
+        value = self.l2.inc(key, delta)
+        self._changed([key])
+        return value
+
+    def dec(self, key, delta=1):
+        value = self.l2.dec(key, delta)
+        self._changed([key])
+        return value
@@ -1,10 +1,14 @@
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 from jose import jwt
 from functools import wraps
 from flask import request, jsonify
+from collections import OrderedDict
 import dotenv
+import hashlib
 import jose
 import os
+import threading
+import time
 
 dotenv.load_dotenv(override=False)
 SECRET_KEY = os.getenv('SECRET_KEY') or "super secret secrets"
@@ -20,6 +24,34 @@ def encode_token(customer_id): # uses unique pieces of info to make our tokens u
     
     return token
 
+# Verified claims of recently seen tokens, so a client making many calls with one token
+# pays for the HS256 check once. Entries are keyed by the SHA-256 digest of the whole token
+# (never a prefix of it, and the raw token isn't kept in memory) and stop being served once
+# the token's own 'exp' passes, so caching can never extend a token's lifetime.
+TOKEN_CACHE_MAX_ENTRIES = 4096
+_verified_tokens = OrderedDict()
+_verified_tokens_lock = threading.Lock()
+
+def verify_token(token):
+    """Claims of a valid token, raising the same jose errors as jwt.decode"""
+    digest = hashlib.sha256(token.encode()).digest()
+    with _verified_tokens_lock:
+        entry = _verified_tokens.get(digest)
+        if entry is not None:
+            expires_at, claims = entry
+            if time.time() < expires_at:
+                _verified_tokens.move_to_end(digest)
+                return claims
+            del _verified_tokens[digest]
+
+    claims = jwt.decode(token, SECRET_KEY, algorithms=["HS256"]) # raises once expired
+    if isinstance(claims.get('exp'), (int, float)):
+        with _verified_tokens_lock:
+            _verified_tokens[digest] = (claims['exp'], claims)
+            while len(_verified_tokens) > TOKEN_CACHE_MAX_ENTRIES:
+                _verified_tokens.popitem(last=False)
+    return claims
+
 # Checks the request 'Authorization' header for a JWT. Parses this token
 # for token string & decodes token string to deduce customer id. If
 # token string cannot be decoded, we throw an error for an invalid token.
@@ -27,18 +59,16 @@ def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
         
-        # Look for token in authorization header
-        token = None
-        auth_section = request.headers.get('Authorization', '')
-        if auth_section:
-            token = auth_section.split(" ")[1] if 'Bearer' in auth_section else auth_section
+        # Look for token in authorization header, "Bearer <token>" or the bare token
+        scheme, _, credentials = request.headers.get('Authorization', '').strip().partition(" ")
+        token = credentials.strip() if scheme.lower() == "bearer" else scheme
         
         if not token:
             return jsonify({"message": "Token is missing!"}), 401
         
         try:
-            # Decode the token
-            data = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])    
+            # Decode the token (or reuse its cached claims)
+            data = verify_token(token)
             customer_id = data['sub'] # Fetch the user_id
             
         except jose.exceptions.ExpiredSignatureError:
@@ -49,5 +79,15 @@ def token_required(f):
         return f(customer_id, *args, **kwargs)
     
     return decorated
-        
-    
\ No newline at end of file
+
+
+# Parses an optional ISO 'YYYY-MM-DD' query argument, raising a readable
+# ValueError so routes can turn it straight into a 400 response
+def parse_date_arg(args, name):
+    raw_value = args.get(name)
+    if not raw_value:
+        return None
+    try:
+        return date.fromisoformat(raw_value)
+    except ValueError:
+        raise ValueError(f"{name} must be a date in YYYY-MM-DD format")
@@ -0,0 +1,3 @@
+from app.async_api import create_asgi_app
+
+app = create_asgi_app("ProductionConfig")
\ No newline at end of file
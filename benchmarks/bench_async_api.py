@@ -0,0 +1,147 @@
+from benchmarks.common import make_app, report
+from app import create_app
+from app.extensions import db
+from app.models import Customer, Ticket
+from sqlalchemy import event, insert
+from sqlalchemy.util import await_only
+from datetime import date, timedelta
+import subprocess
+import statistics
+import argparse
+import asyncio
+import socket
+import sys
+import time
+
+# Read concurrency of the sync Flask app on sync gunicorn workers vs the ASGI app (asgi.py) on
+# one uvicorn worker, with --concurrency clients polling GET /tickets/<id> & GET /tickets/.
+#
+# The benchmark database is a local SQLite file, so every query gets an artificial
+# --db-latency-ms delay to stand in for the network round trip to a database server. It
+# sleeps inside the SQLite connection's own thread (a trace callback), blocking exactly
+# what a slow database would: the whole sync worker, or just one aiosqlite thread.
+
+def add_db_latency(engine, latency_ms, is_async):
+    def on_connect(dbapi_connection, connection_record):
+        wait = lambda statement: time.sleep(latency_ms / 1000)
+        if is_async:
+            await_only(dbapi_connection.driver_connection.set_trace_callback(wait))
+        else:
+            dbapi_connection.set_trace_callback(wait)
+    event.listen(engine, "connect", on_connect)
+
+def serve(kind, port, workers, latency_ms):
+    if kind == "sync":
+        from gunicorn.app.base import BaseApplication
+
+        app = create_app("BenchmarkConfig")
+        with app.app_context():
+            add_db_latency(db.engine, latency_ms, is_async=False)
+
+        class Server(BaseApplication):
+            def load_config(self):
+                self.cfg.set("bind", f"127.0.0.1:{port}")
+                self.cfg.set("workers", workers)
+                self.cfg.set("worker_class", "sync")
+                self.cfg.set("loglevel", "warning")
+
+            def load(self):
+                return app
+
+        Server().run()
+    else:
+        import uvicorn
+        from app.async_api import create_asgi_app
+
+        app = create_asgi_app("BenchmarkConfig")
+        add_db_latency(app.state.engine.sync_engine, latency_ms, is_async=True)
+        uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+async def http_get(reader, writer, path):
+    """Minimal keep-alive HTTP/1.1 GET, httpx costs more CPU than the servers being measured"""
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: bench\r\n\r\n".encode())
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    headers = dict(line.split(b":", 1) for line in head.lower().split(b"\r\n")[1:] if b":" in line)
+    await reader.readexactly(int(headers[b"content-length"]))
+    return status, headers.get(b"connection", b"").strip() != b"close" # sync gunicorn workers close every connection
+
+async def load(port, concurrency, duration, tickets):
+    latencies = []
+    deadline = time.perf_counter() + duration
+
+    async def client_loop(i):
+        writer = None
+        n = i
+        while time.perf_counter() < deadline:
+            path = f"/tickets/{n % tickets + 1}" if n % 2 else "/tickets/?limit=20"
+            start = time.perf_counter()
+            if writer is None:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            status, keep_alive = await http_get(reader, writer, path)
+            latencies.append((time.perf_counter() - start) * 1000)
+            assert status == 200, status
+            if not keep_alive:
+                writer.close()
+                writer = None
+            n += concurrency
+        if writer is not None:
+            writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client_loop(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 1)
+    }
+
+def wait_until_up(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port)).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server on port {port} didn't start")
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync (gunicorn) vs async (uvicorn) read concurrency")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[4, 16, 64])
+    parser.add_argument("--sync-workers", type=int, default=4)
+    parser.add_argument("--db-latency-ms", type=float, default=5)
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--tickets", type=int, default=1000)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--serve", choices=["sync", "async"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        return serve(args.serve, args.port, args.sync_workers, args.db_latency_ms)
+
+    with make_app().app_context():
+        db.session.execute(insert(Customer), [{"name": "bench", "phone": "0000000000", "email": "bench@example.com", "password": "bench"}])
+        db.session.execute(insert(Ticket), [
+            {"VIN": f"VIN{i:014d}", "service_date": date(2025, 1, 1) + timedelta(days=i % 365), "service_description": "brake pads and rotors, front axle", "customer_id": 1}
+            for i in range(args.tickets)
+        ])
+        db.session.commit()
+
+    for kind, title in [("sync", f"Flask, {args.sync_workers} sync gunicorn workers"), ("async", "ASGI, 1 uvicorn worker")]:
+        server = subprocess.Popen([
+            sys.executable, "-m", "benchmarks.bench_async_api", "--serve", kind, "--port", str(args.port),
+            "--sync-workers", str(args.sync_workers), "--db-latency-ms", str(args.db_latency_ms)
+        ])
+        try:
+            wait_until_up(args.port)
+            results = {f"{concurrency} clients": asyncio.run(load(args.port, concurrency, args.duration, args.tickets)) for concurrency in args.concurrency}
+        finally:
+            server.terminate()
+            server.wait()
+        report(f"{title}, {args.db_latency_ms}ms per query", results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+from benchmarks.common import make_app, measure, report
+from app.utils import util
+from app.utils.util import encode_token, token_required
+from unittest.mock import patch
+import argparse
+
+# Per-request cost of token_required alone: a mobile client firing many authenticated calls
+# with one token, verifying its HS256 signature on every call vs once per token lifetime.
+
+def main():
+    parser = argparse.ArgumentParser(description="token_required overhead benchmark")
+    parser.add_argument("--requests", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = make_app()
+    headers = {"Authorization": f"Bearer {encode_token(1)}"}
+    view = token_required(lambda customer_id: customer_id)
+
+    def authenticate():
+        for _ in range(args.requests):
+            view()
+
+    results = {}
+    with app.test_request_context("/tickets/my-tickets", headers=headers):
+        for name, max_entries in [("jwt.decode every request", 0), ("verified claims cache", util.TOKEN_CACHE_MAX_ENTRIES)]:
+            util._verified_tokens.clear()
+            with patch.object(util, "TOKEN_CACHE_MAX_ENTRIES", max_entries):
+                stats = measure(authenticate, args.repeat)
+            results[name] = {"us_per_request": round(stats["median_ms"] * 1000 / args.requests, 2), **stats}
+
+    report(f"token_required x {args.requests}", results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+from benchmarks.common import make_app, QueryCounter, report
+from app.extensions import db
+from app.models import Customer, Ticket
+from sqlalchemy import insert, delete
+import argparse
+import time
+
+# Ticket intake throughput: one POST /tickets/ per ticket (a customer lookup, insert &
+# commit each) against a single POST /tickets/bulk carrying the whole batch.
+
+def payload(count):
+    return [
+        {"VIN": f"VIN{i:014d}", "service_date": "2026-01-06", "service_description": "intake kiosk sync", "customer_id": 1 + i % 100}
+        for i in range(count)
+    ]
+
+def run(fn, engine, count):
+    with QueryCounter(engine) as counter:
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+    return {"seconds": round(elapsed, 3), "tickets_per_s": round(count / elapsed), "queries": counter.count}
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk ticket creation throughput benchmark")
+    parser.add_argument("--tickets", type=int, nargs="+", default=[1_000, 10_000])
+    args = parser.parse_args()
+
+    app = make_app()
+    client = app.test_client()
+    with app.app_context():
+        db.session.execute(insert(Customer), [
+            {"name": f"bench {i}", "phone": "0000000000", "email": f"bench{i}@example.com", "password": "bench"}
+            for i in range(100)
+        ])
+        db.session.commit()
+
+        for count in args.tickets:
+            tickets = payload(count)
+
+            def single():
+                for ticket in tickets:
+                    assert client.post("/tickets/", json=ticket).status_code == 201
+
+            def bulk():
+                response = client.post("/tickets/bulk", json=tickets)
+                assert response.json["created_count"] == count
+
+            results = {}
+            for name, fn in [("one POST per ticket", single), ("POST /tickets/bulk", bulk)]:
+                results[name] = run(fn, db.engine, count)
+                db.session.execute(delete(Ticket))
+                db.session.commit()
+
+            report(f"Creating {count} tickets", results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+from benchmarks.common import make_app, measure, report
+from app.extensions import db
+from app.models import Customer, Ticket
+from app.blueprints.tickets.schemas import tickets_serializer
+from sqlalchemy import insert, select
+from datetime import date, timedelta
+import argparse
+import tracemalloc
+
+# Reading & dumping a list of tickets as ORM entities vs column-only Core rows (what the list
+# endpoints now select): CPU time per row and peak Python memory per row.
+
+def main():
+    parser = argparse.ArgumentParser(description="ORM entities vs Core rows for list endpoints")
+    parser.add_argument("--tickets", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = make_app()
+    with app.app_context():
+        db.session.execute(insert(Customer), [{"name": "bench", "phone": "0000000000", "email": "bench@example.com", "password": "bench"}])
+        start = date(2025, 1, 1)
+        db.session.execute(insert(Ticket), [
+            {"VIN": f"VIN{i:014d}", "service_date": start + timedelta(days=i % 365), "service_description": "brake pads and rotors, front axle", "customer_id": 1, "parts_total": i * 0.25}
+            for i in range(args.tickets)
+        ])
+        db.session.commit()
+
+        def entities():
+            tickets = db.session.execute(select(Ticket).order_by(Ticket.id)).scalars().all()
+            body = tickets_serializer.dump(tickets)
+            db.session.expunge_all() # every request starts with an empty identity map
+            return body
+
+        def core_rows():
+            rows = db.session.execute(select(*tickets_serializer.columns, Ticket.version).order_by(Ticket.id)).all()
+            return tickets_serializer.dump(rows)
+
+        assert entities() == core_rows()
+
+        results = {}
+        for name, fn in [("ORM entities", entities), ("Core rows", core_rows)]:
+            stats = measure(fn, args.repeat)
+            tracemalloc.start()
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results[name] = {
+                "us_per_row": round(stats["median_ms"] * 1000 / args.tickets, 2),
+                "peak_bytes_per_row": peak // args.tickets,
+                **stats
+            }
+
+    report(f"Reading & dumping {args.tickets} tickets", results)
+
+if __name__ == "__main__":
+    main()
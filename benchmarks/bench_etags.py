@@ -0,0 +1,49 @@
+from benchmarks.common import make_app, QueryCounter, measure, report
+from app.extensions import db
+from app.models import Customer, Ticket
+from sqlalchemy import insert
+from datetime import date, timedelta
+import argparse
+
+# A shop-floor tablet polling for changes: every poll re-downloading the resource against
+# a conditional GET with the ETag from the previous poll, while nothing has changed.
+
+def seed(ticket_count):
+    db.session.execute(insert(Customer), [
+        {"name": "bench", "phone": "0000000000", "email": "bench@example.com", "password": "bench"}
+    ])
+    start = date(2025, 1, 1)
+    db.session.execute(insert(Ticket), [
+        {"VIN": f"VIN{i:014d}", "service_date": start + timedelta(days=i % 365), "service_description": "brake pads and rotors, front axle", "customer_id": 1}
+        for i in range(ticket_count)
+    ])
+    db.session.commit()
+
+def main():
+    parser = argparse.ArgumentParser(description="Conditional GET (ETag) polling benchmark")
+    parser.add_argument("--tickets", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    app = make_app()
+    client = app.test_client()
+    with app.app_context():
+        seed(args.tickets)
+
+        for title, url in [("GET /tickets/1", "/tickets/1"), ("GET /tickets/?limit=200", "/tickets/?limit=200")]:
+            etag = client.get(url).headers["ETag"]
+            results = {}
+            for name, headers in [("full body", {}), ("If-None-Match", {"If-None-Match": etag})]:
+                response = client.get(url, headers=headers)
+                with QueryCounter(db.engine) as counter:
+                    client.get(url, headers=headers)
+                results[name] = {
+                    "status": response.status_code,
+                    "bytes": len(response.data),
+                    "queries": counter.count,
+                    **measure(lambda: client.get(url, headers=headers), args.repeat)
+                }
+            report(f"Polling {title}, {args.tickets} tickets", results)
+
+if __name__ == "__main__":
+    main()
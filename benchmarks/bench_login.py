@@ -0,0 +1,79 @@
+from benchmarks.common import make_app, report
+from app.extensions import db
+from app.models import Customer
+from app.utils import passwords
+from werkzeug.security import generate_password_hash
+from sqlalchemy import insert
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import threading
+import statistics
+import time
+
+# Login throughput & latency at several hashing costs, with --clients concurrent clients
+# (threads, as under a gthread gunicorn worker) with at most --workers hashes running at once.
+# A probe client keeps calling a cheap endpoint meanwhile, to show logins don't starve it.
+
+METHODS = ["scrypt:16384:8:1", "scrypt:32768:8:1", "scrypt:65536:8:1", "pbkdf2:sha256:600000"]
+
+def run(app, method, clients, logins):
+    app.config["PASSWORD_HASH_METHOD"] = method
+    with app.app_context():
+        db.session.execute(Customer.__table__.delete())
+        db.session.execute(insert(Customer), [
+            {"name": f"bench {i}", "phone": "0000000000", "email": f"bench{i}@example.com", "password": generate_password_hash("bench-password", method)}
+            for i in range(clients)
+        ])
+        db.session.commit()
+
+    def client_loop(i):
+        client = app.test_client()
+        latencies = []
+        for _ in range(logins // clients):
+            start = time.perf_counter()
+            response = client.post("/customers/login", json={"email": f"bench{i}@example.com", "password": "bench-password"})
+            latencies.append((time.perf_counter() - start) * 1000)
+            assert response.status_code == 200, response.json
+        return latencies
+
+    probe_latencies = []
+    done = threading.Event()
+    def probe_loop():
+        client = app.test_client()
+        while not done.is_set():
+            start = time.perf_counter()
+            client.get("/tickets/?limit=10")
+            probe_latencies.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.01)
+
+    probe = threading.Thread(target=probe_loop)
+    probe.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(clients) as executor:
+        latencies = sorted(ms for result in executor.map(client_loop, range(clients)) for ms in result)
+    elapsed = time.perf_counter() - start
+    done.set()
+    probe.join()
+    return {
+        "logins_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 1),
+        "probe_p50_ms": round(statistics.median(probe_latencies), 1)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Login throughput/latency per password hashing cost")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=passwords.PASSWORD_HASH_WORKERS)
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--methods", nargs="+", default=METHODS)
+    args = parser.parse_args()
+
+    app = make_app()
+    app.config["PASSWORD_HASH_WORKERS"] = args.workers
+    app.config["PASSWORD_HASH_MAX_PENDING"] = args.clients
+    results = {method: run(app, method, args.clients, args.logins) for method in args.methods}
+    report(f"{args.logins} logins, {args.clients} concurrent clients, {args.workers} concurrent hashes", results)
+
+if __name__ == "__main__":
+    main()
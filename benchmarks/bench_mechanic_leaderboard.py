@@ -0,0 +1,68 @@
+from benchmarks.common import make_app, QueryCounter, measure, report
+from app.blueprints.mechanics.routes import leaderboard_query
+from app.extensions import db
+from app.models import Customer, Mechanic, Ticket, ticket_mechanic_joint_table
+from sqlalchemy import insert, select
+from datetime import date, timedelta
+import argparse
+import random
+
+# Compares the original top-3 implementation (load every Mechanic, then lazy load
+# m.tickets one mechanic at a time) against the single GROUP BY leaderboard query.
+
+def seed(mechanic_count, ticket_count, rng):
+    db.session.execute(insert(Customer), [
+        {"name": "bench", "phone": "0000000000", "email": "bench@example.com", "password": "bench"}
+    ])
+    db.session.execute(insert(Mechanic), [
+        {"name": f"mechanic {i}", "email": f"mechanic{i}@example.com", "phone": "0000000000", "salary": 50000}
+        for i in range(1, mechanic_count + 1)
+    ])
+    start = date(2025, 1, 1)
+    db.session.execute(insert(Ticket), [
+        {"VIN": f"VIN{i:014d}", "service_date": start + timedelta(days=i % 365), "service_description": "bench", "customer_id": 1}
+        for i in range(1, ticket_count + 1)
+    ])
+    # one or two mechanics per ticket
+    assignments = set()
+    for ticket_id in range(1, ticket_count + 1):
+        for mechanic_id in rng.sample(range(1, mechanic_count + 1), rng.randint(1, 2)):
+            assignments.add((ticket_id, mechanic_id))
+    db.session.execute(insert(ticket_mechanic_joint_table), [
+        {"ticket_id": t, "mechanic_id": m} for t, m in assignments
+    ])
+    db.session.commit()
+
+def legacy_top_3():
+    mechanics = db.session.execute(select(Mechanic)).scalars().all()
+    top = sorted(mechanics, key=lambda m: len(m.tickets), reverse=True)[0:3]
+    db.session.expunge_all() # drop the identity map so each run lazy loads again
+    return top
+
+def aggregate_top_3():
+    return db.session.execute(leaderboard_query(3)).all()
+
+def windowed_top_10():
+    return db.session.execute(leaderboard_query(10, date(2025, 3, 1), date(2025, 5, 31))).all()
+
+def main():
+    parser = argparse.ArgumentParser(description="Mechanic leaderboard benchmark")
+    parser.add_argument("--mechanics", type=int, default=1_000)
+    parser.add_argument("--tickets", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = make_app()
+    with app.app_context():
+        seed(args.mechanics, args.tickets, random.Random(42))
+
+        results = {}
+        for name, fn in [("legacy (N+1 lazy loads)", legacy_top_3), ("aggregate top 3", aggregate_top_3), ("aggregate top 10, 3 month window", windowed_top_10)]:
+            with QueryCounter(db.engine) as counter:
+                fn()
+            results[name] = {"queries": counter.count, **measure(fn, args.repeat)}
+
+        report(f"Mechanic leaderboard: {args.mechanics} mechanics, {args.tickets} tickets", results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+from benchmarks.common import make_app, measure, report
+from app.extensions import limiter
+from app.utils import metrics
+import argparse
+import os
+
+# Per-request cost of the Prometheus instrumentation (app/utils/metrics.py): the
+# before/after_request hooks plus one timed SQL statement, run directly in a request
+# context. --multiproc uses PROMETHEUS_MULTIPROC_DIR's memory-mapped files like gunicorn
+# workers do (the variable must be set before prometheus_client is imported).
+
+def main():
+    parser = argparse.ArgumentParser(description="Prometheus instrumentation overhead benchmark")
+    parser.add_argument("--requests", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = make_app()
+    record = metrics._record(limiter)
+    response = app.response_class("x" * 512)
+
+    def instrumented_requests():
+        for _ in range(args.requests):
+            metrics._start_timer()
+            metrics._before_cursor_execute(connection, None, None, None, None, False)
+            metrics._after_cursor_execute(connection, None, None, None, None, False)
+            record(response)
+
+    class Connection:
+        info = {}
+    connection = Connection()
+
+    with app.test_request_context("/mechanics/1") as context:
+        context.match_request()
+        stats = measure(instrumented_requests, args.repeat)
+
+    mode = "multiprocess files" if os.environ.get("PROMETHEUS_MULTIPROC_DIR") else "in-process"
+    report(f"metrics hooks x {args.requests} ({mode})", {
+        "per request": {"us_per_request": round(stats["median_ms"] * 1000 / args.requests, 2), **stats}
+    })
+
+if __name__ == "__main__":
+    main()
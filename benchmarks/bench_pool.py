@@ -0,0 +1,79 @@
+from benchmarks.common import make_app, report
+from benchmarks.bench_async_api import add_db_latency
+from app.extensions import db
+from app.models import Customer, Ticket
+from app.utils.pool_stats import instrument
+from config import BenchmarkConfig
+from sqlalchemy import insert
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+import argparse
+import time
+
+# Pool sizing from /internal/pool's numbers: --threads request threads (a gthread worker's
+# worth) fetch GET /tickets/<id> against a range of --pool-sizes, with --db-latency-ms added
+# to every query. A pool smaller than the thread count shows up as checkout waits &
+# timeouts; once it's big enough extra connections only raise peak_in_use.
+
+def seed(app, tickets):
+    with app.app_context():
+        db.session.execute(insert(Customer), [{"name": "c", "email": "c@example.com", "phone": "1", "password": "x"}])
+        db.session.execute(insert(Ticket), [
+            {"VIN": f"VIN{i:014d}", "service_date": date(2024, 1, 1), "service_description": "oil change", "customer_id": 1}
+            for i in range(tickets)
+        ])
+        db.session.commit()
+
+def run(pool_size, args):
+    BenchmarkConfig.SQLALCHEMY_ENGINE_OPTIONS = {"pool_size": pool_size, "max_overflow": 0, "pool_timeout": args.pool_timeout}
+    app = make_app()
+    seed(app, args.tickets)
+    app.logger.disabled = True # pool timeouts are expected with small pools, counted below
+    with app.app_context():
+        db.engine.dispose() # so every connection is opened with the latency hook
+        add_db_latency(db.engine, args.db_latency_ms, is_async=False)
+        stats = instrument(db.engine, f"bench-{pool_size}")
+
+    def worker(n):
+        client = app.test_client()
+        errors = 0
+        for i in range(args.requests):
+            try:
+                if client.get(f"/tickets/{(n * args.requests + i) % args.tickets + 1}").status_code != 200:
+                    errors += 1
+            except Exception: # pool timeouts surface as 500s or, with TESTING, raised errors
+                errors += 1
+        return errors
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.threads) as pool:
+        errors = sum(pool.map(worker, range(args.threads)))
+    elapsed = time.perf_counter() - start
+
+    snapshot = stats.snapshot()
+    with app.app_context():
+        db.engine.dispose()
+    return {
+        "req_per_s": round(args.threads * args.requests / elapsed),
+        "wait_mean_ms": snapshot["wait_ms"]["mean"],
+        "wait_max_ms": snapshot["wait_ms"]["max"],
+        "peak_in_use": snapshot["peak_in_use"],
+        "timeouts": snapshot["timeouts"],
+        "errors": errors
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=50, help="per thread")
+    parser.add_argument("--tickets", type=int, default=1000)
+    parser.add_argument("--db-latency-ms", type=float, default=20)
+    parser.add_argument("--pool-timeout", type=float, default=1)
+    args = parser.parse_args()
+
+    rows = {f"pool_size={size}": run(size, args) for size in args.pool_sizes}
+    report(f"{args.threads} threads x {args.requests} requests, {args.db_latency_ms}ms per query", rows)
+
+if __name__ == "__main__":
+    main()
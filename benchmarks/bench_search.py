@@ -0,0 +1,80 @@
+from benchmarks.common import make_app, QueryCounter, measure, report
+from app.extensions import db
+from app.models import Customer, Ticket
+from app.utils.pagination import keyset_query
+from app.utils.search import ticket_search_query
+from sqlalchemy import insert, or_, select
+from datetime import date, timedelta
+import argparse
+import random
+import time
+
+# First page of a ticket search: an unranked LIKE scan against the ranked full-text index.
+# Most descriptions use a small common vocabulary, roughly 1 in 1000 tickets also mention
+# a rare repair. Selective terms are where the index wins; a LIKE page over a very common
+# term stops after 50 hits while ranking has to score every match.
+
+WORDS = [
+    "oil", "change", "brake", "pads", "rotors", "tire", "rotation", "alignment", "battery",
+    "replaced", "front", "rear", "coolant", "flush", "transmission", "spark", "plugs",
+    "inspection", "wiper", "blades", "headlight", "bulb", "exhaust", "muffler", "filter"
+]
+
+RARE_REPAIRS = ["catalytic converter", "timing belt", "head gasket", "starter motor", "fuel pump"]
+
+def description(rng):
+    words = rng.choices(WORDS, k=6)
+    if rng.random() < 0.001:
+        words.append(rng.choice(RARE_REPAIRS))
+    return " ".join(words)
+
+def seed(ticket_count, rng):
+    db.session.execute(insert(Customer), [
+        {"name": "bench", "phone": "0000000000", "email": "bench@example.com", "password": "bench"}
+    ])
+    start = date(2020, 1, 1)
+    for offset in range(0, ticket_count, 50_000):
+        db.session.execute(insert(Ticket), [
+            {
+                "VIN": f"{rng.getrandbits(64):017X}",
+                "service_date": start + timedelta(days=i % 2000),
+                "service_description": description(rng),
+                "customer_id": 1
+            }
+            for i in range(offset, min(offset + 50_000, ticket_count))
+        ])
+    db.session.commit()
+
+def like_scan(search_text, limit):
+    query = select(Ticket).where(or_(
+        Ticket.VIN.icontains(search_text), Ticket.service_description.icontains(search_text)
+    )).order_by(Ticket.id).limit(limit)
+    return db.session.execute(query).scalars().all()
+
+def full_text(search_text, limit):
+    query, keys = ticket_search_query(db.engine.dialect.name, search_text)
+    return db.session.execute(keyset_query(query, keys, None, limit)).all()
+
+def main():
+    parser = argparse.ArgumentParser(description="Ticket full-text search benchmark")
+    parser.add_argument("--tickets", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = make_app()
+    with app.app_context():
+        start = time.perf_counter()
+        seed(args.tickets, random.Random(42))
+        print(f"Seeded {args.tickets} tickets (FTS kept in sync by triggers) in {time.perf_counter() - start:.1f}s")
+
+        results = {}
+        for search_text in ["catalytic", "timing belt", "brake pads"]:
+            for name, fn in [("LIKE scan", like_scan), ("full-text", full_text)]:
+                with QueryCounter(db.engine) as counter:
+                    fn(search_text, 50)
+                results[f"{name} '{search_text}'"] = {"queries": counter.count, **measure(lambda: fn(search_text, 50), args.repeat)}
+
+        report(f"First page (50) of ticket search, {args.tickets} tickets", results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+from benchmarks.common import make_app, measure, report
+from app.extensions import db
+from app.models import Customer, Ticket
+from app.blueprints.tickets.schemas import tickets_schema, tickets_serializer
+from app.utils.json_provider import OrjsonProvider, orjson
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import insert, select
+from datetime import date, timedelta
+import argparse
+
+# Dump & encode cost of a list response body: tickets_schema (marshmallow) vs the precompiled
+# tickets_serializer, each encoded by Flask's stdlib provider & by the orjson provider.
+
+def main():
+    parser = argparse.ArgumentParser(description="Schema vs precompiled serializer, stdlib vs orjson")
+    parser.add_argument("--tickets", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    app = make_app()
+    with app.app_context():
+        db.session.execute(insert(Customer), [{"name": "bench", "phone": "0000000000", "email": "bench@example.com", "password": "bench"}])
+        start = date(2025, 1, 1)
+        db.session.execute(insert(Ticket), [
+            {"VIN": f"VIN{i:014d}", "service_date": start + timedelta(days=i % 365), "service_description": "brake pads and rotors, front axle", "customer_id": 1, "parts_total": i * 0.25}
+            for i in range(args.tickets)
+        ])
+        db.session.commit()
+        tickets = db.session.execute(select(Ticket)).scalars().all()
+
+        providers = [("stdlib", DefaultJSONProvider(app))]
+        if orjson is not None:
+            providers.append(("orjson", OrjsonProvider(app)))
+
+        results = {}
+        for dump_name, dump in [("marshmallow", tickets_schema.dump), ("precompiled", tickets_serializer.dump)]:
+            results[f"{dump_name} dump only"] = measure(lambda: dump(tickets), args.repeat)
+            for provider_name, provider in providers:
+                results[f"{dump_name} + {provider_name}"] = measure(lambda: provider.response(dump(tickets)), args.repeat)
+
+        bodies = {provider.response(tickets_schema.dump(tickets)).data == provider.response(tickets_serializer.dump(tickets)).data for _, provider in providers}
+        assert bodies == {True}, "precompiled output differs from the schema"
+
+    report(f"Serializing {args.tickets} tickets", results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+from benchmarks.common import measure, report
+from app import create_app
+from app.extensions import db
+from app.models import Mechanic
+from config import BenchmarkConfig
+from sqlalchemy import insert
+from unittest.mock import patch
+import statistics
+import argparse
+import logging
+
+# Overhead of the SQL profiler (app/utils/sql_profiler.py) on GET /mechanics/<id>, a request
+# making a single query, with the profiler off, adding headers & logging one JSON line.
+
+def make_client(enabled, output=None):
+    with patch.object(BenchmarkConfig, "SQL_PROFILER_ENABLED", enabled, create=True), \
+         patch.object(BenchmarkConfig, "SQL_PROFILER_OUTPUT", output, create=True):
+        app = create_app("BenchmarkConfig")
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.execute(insert(Mechanic), [{"name": "m", "email": "m@example.com", "phone": "1", "salary": 1}])
+        db.session.commit()
+    return app.test_client()
+
+def main():
+    parser = argparse.ArgumentParser(description="SQL profiler overhead benchmark")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    logging.getLogger("app.utils.sql_profiler").addHandler(logging.NullHandler())
+    logging.getLogger("app.utils.sql_profiler").setLevel(logging.INFO)
+
+    clients = {name: make_client(enabled, output) for name, enabled, output in [("off", False, None), ("headers", True, "headers"), ("log", True, "log")]}
+    samples = {name: [] for name in clients}
+    for _ in range(args.repeat): # rounds alternate between the apps, so drift hits them all alike
+        for name, client in clients.items():
+            def requests():
+                for _ in range(args.requests):
+                    # a fresh If-None-Match skips the cache, the version lookup always queries
+                    client.get("/mechanics/1", headers={"If-None-Match": '"stale"'})
+            samples[name].append(measure(requests, 1)["median_ms"])
+
+    results = {
+        name: {"us_per_request": round(statistics.median(ms) * 1000 / args.requests, 1), "min_ms": min(ms), "max_ms": max(ms)}
+        for name, ms in samples.items()
+    }
+    report(f"GET /mechanics/1 x {args.requests}", results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+from benchmarks.common import make_app, report
+from app.blueprints.tickets.schemas import tickets_schema
+from app.extensions import db
+from app.models import Customer, Ticket
+from sqlalchemy import insert, select
+from datetime import date, timedelta
+import argparse
+import tracemalloc
+import time
+
+# Peak Python heap while answering a full ticket listing: the buffered path (load every
+# ORM object, then serialize one big string) against the yield_per streaming path.
+# The streamed body is consumed & discarded chunk by chunk, as a socket would.
+
+def seed(ticket_count):
+    db.session.execute(insert(Customer), [
+        {"name": "bench", "phone": "0000000000", "email": "bench@example.com", "password": "bench"}
+    ])
+    start = date(2025, 1, 1)
+    for offset in range(0, ticket_count, 50_000):
+        db.session.execute(insert(Ticket), [
+            {"VIN": f"VIN{i:014d}", "service_date": start + timedelta(days=i % 365), "service_description": "brake pads and rotors, front axle", "customer_id": 1}
+            for i in range(offset, min(offset + 50_000, ticket_count))
+        ])
+    db.session.commit()
+
+def buffered(app):
+    with app.test_request_context("/tickets/"):
+        tickets = db.session.execute(select(Ticket)).scalars().all()
+        response = tickets_schema.jsonify(tickets)
+        return len(response.get_data())
+
+def streamed(app, headers):
+    client = app.test_client()
+    response = client.get("/tickets/?stream=1", headers=headers, buffered=False)
+    size = sum(len(chunk) for chunk in response.response)
+    response.close()
+    return size
+
+def profile(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"peak_mb": round(peak / 2**20, 1), "seconds": round(elapsed, 2), "body_mb": round(size / 2**20, 1)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming list response memory benchmark")
+    parser.add_argument("--tickets", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    app = make_app()
+    for ticket_count in args.tickets:
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+            seed(ticket_count)
+            db.session.remove()
+
+        report(f"GET /tickets/ full listing, {ticket_count} tickets", {
+            "buffered (scalars().all())": profile(lambda: buffered(app)),
+            "streamed JSON array": profile(lambda: streamed(app, {})),
+            "streamed NDJSON": profile(lambda: streamed(app, {"Accept": "application/x-ndjson"}))
+        })
+
+if __name__ == "__main__":
+    main()
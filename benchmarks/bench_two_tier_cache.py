@@ -0,0 +1,60 @@
+from benchmarks.common import make_app, QueryCounter, report
+from app import create_app
+from app.extensions import db, cache
+from app.models import Customer
+from sqlalchemy import insert
+from contextlib import ExitStack
+import argparse
+import random
+import tempfile
+import time
+
+# Database load from random hot GET /customers/<id> reads spread round robin over N gunicorn-style
+# workers (one app & cache per worker, all in this process): a private SimpleCache per
+# worker against the two-tier cache (private L1, one FileSystemCache L2 shared by all).
+
+def make_worker(config):
+    app = create_app("BenchmarkConfig")
+    cache.init_app(app, config=config)
+    with app.app_context():
+        engine = db.engine
+    return app.test_client(), engine
+
+def run(workers, customers, requests):
+    with ExitStack() as stack:
+        counters = [stack.enter_context(QueryCounter(engine)) for _, engine in workers]
+        start = time.perf_counter()
+        rng = random.Random(42)
+        for i in range(requests):
+            client, _ = workers[i % len(workers)]
+            assert client.get(f"/customers/{rng.randint(1, customers)}").status_code == 200
+        elapsed = time.perf_counter() - start
+    return {"db_queries": sum(counter.count for counter in counters), "ms_per_request": round(elapsed * 1000 / requests, 3)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-worker vs two-tier cache benchmark")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--customers", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=20_000)
+    args = parser.parse_args()
+
+    with make_app().app_context():
+        db.session.execute(insert(Customer), [
+            {"name": f"bench {i}", "phone": "0000000000", "email": f"bench{i}@example.com", "password": "bench"}
+            for i in range(args.customers)
+        ])
+        db.session.commit()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as shared_dir:
+        for name, config in [
+            ("SimpleCache per worker", {"CACHE_TYPE": "SimpleCache", "CACHE_THRESHOLD": 100_000}),
+            ("two-tier, shared L2", {"CACHE_TYPE": "app.utils.two_tier_cache.TwoTierCache", "CACHE_DIR": f"{shared_dir}/l2", "CACHE_THRESHOLD": 100_000})
+        ]:
+            workers = [make_worker(config) for _ in range(args.workers)]
+            results[name] = run(workers, args.customers, args.requests)
+
+    report(f"{args.requests} GET /customers/<id> over {args.customers} customers, {args.workers} workers", results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+from app import create_app
+from app.extensions import db
+from sqlalchemy import event
+from contextlib import contextmanager
+import statistics
+import threading
+import time
+
+# Shared helpers for the benchmark scripts in this folder. Run each script as a module
+# from the project root, e.g. `python -m benchmarks.bench_mechanic_leaderboard`.
+
+def make_app():
+    """App bound to the benchmark database, with a freshly created empty schema"""
+    app = create_app("BenchmarkConfig")
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    return app
+
+class QueryCounter:
+    """Counts statements sent to the database while active, from any thread"""
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        with self._lock:
+            self.count += 1
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._before_cursor_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._before_cursor_execute)
+
+@contextmanager
+def stopwatch(results, name):
+    start = time.perf_counter()
+    yield
+    results[name] = time.perf_counter() - start
+
+def measure(fn, repeat=5):
+    """Runs fn `repeat` times & returns latency stats in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "min_ms": round(min(samples), 2),
+        "median_ms": round(statistics.median(samples), 2),
+        "max_ms": round(max(samples), 2)
+    }
+
+def report(title, rows):
+    print(f"\n{title}")
+    for name, values in rows.items():
+        stats = ", ".join(f"{k}={v}" for k, v in values.items())
+        print(f"  {name:<32} {stats}")
@@ -0,0 +1,288 @@
+from benchmarks.common import make_app, QueryCounter
+from app.extensions import db
+from app.models import Customer, Mechanic, Ticket, Inventory, TicketInventory, ticket_mechanic_joint_table
+from app.utils.passwords import hash_password
+from app.utils.util import encode_token
+from sqlalchemy import insert
+from concurrent.futures import ThreadPoolExecutor
+from collections import namedtuple
+from datetime import date, timedelta, datetime, timezone
+import sqlalchemy
+import statistics
+import threading
+import platform
+import argparse
+import resource
+import random
+import json
+import time
+import sys
+import os
+
+# Load benchmark of every route, with a JSON baseline to catch regressions.
+#
+# Builds the app with create_app("BenchmarkConfig") on its SQLite file, seeds a dataset
+# of the requested size (deterministic for a given --seed) & drives each route in SCENARIOS
+# through the test client from --concurrency threads. Every route records p50/p95/p99
+# latency, SQL statements per request, peak RSS while it ran & requests that didn't get the
+# expected status.
+#
+#   python -m benchmarks.suite --output baseline.json               record a baseline
+#   python -m benchmarks.suite --compare baseline.json              rerun with the baseline's
+#                                                                   settings, exit 1 on a regression
+#
+# A metric regresses when it grows by more than --threshold (relative) over the baseline;
+# latencies must also grow by more than --min-latency-delta-ms, so sub-millisecond routes
+# don't flap on scheduler noise. Routes without a scenario fail the run, add one below.
+
+PASSWORD = "bench-password"
+EXCLUDED_ENDPOINTS = {"static", "swagger_ui.show", "swagger_ui.static"}
+LATENCY_METRICS = ("p50_ms", "p95_ms", "p99_ms")
+COMPARED_METRICS = (*LATENCY_METRICS, "queries_per_request", "peak_rss_mb")
+WORDS = ["brake", "pads", "oil", "change", "rotor", "tire", "rotation", "alignment", "battery", "coolant", "flush", "filter", "spark", "plugs", "transmission"]
+
+# Seeded ids are sequential, so the 'n'th customer is id n. Each ticket belongs to customer
+# ((id - 1) % customers) + 1 & has mechanic ((id - 1) % mechanics) + 1 assigned. Routes that
+# delete rows get spare mechanics & inventory items after the regular ones, one per request.
+Dataset = namedtuple("Dataset", "customers mechanics tickets inventory spares tokens")
+
+# request(i, data) -> (path, test client kwargs) for the i'th request of the run
+Scenario = namedtuple("Scenario", "endpoint method status request")
+
+def customer_body(i):
+    return {"name": f"Customer {i}", "email": f"customer{i}@example.com", "phone": f"555{i:07d}", "password": PASSWORD}
+
+def mechanic_body(i):
+    return {"name": f"Mechanic {i}", "email": f"mechanic{i}@example.com", "phone": f"556{i:07d}", "salary": 50_000 + i}
+
+def ticket_body(i, data):
+    return {"VIN": f"1HGCM{i:012d}", "service_date": "2024-06-01", "service_description": "brake pads & rotor", "customer_id": i % data.customers + 1}
+
+def owner(ticket_id, data):
+    return (ticket_id - 1) % data.customers + 1
+
+def inventory_csv(i, rows=100):
+    lines = ["name,price"] + [f"Imported part {i}-{n},{n % 90 + 9.99}" for n in range(rows)]
+    return "\n".join(lines) + "\n"
+
+SCENARIOS = [
+    Scenario("customers_bp.get_customers", "GET", 200, lambda i, d: (f"/customers/?page={i % 20 + 1}&per_page=50", {})),
+    Scenario("customers_bp.get_customer", "GET", 200, lambda i, d: (f"/customers/{i % d.customers + 1}", {})),
+    Scenario("customers_bp.add_customer", "POST", 201, lambda i, d: ("/customers/", {"json": customer_body(d.customers + 1 + i)})),
+    Scenario("customers_bp.update_customer", "PUT", 200, lambda i, d: (f"/customers/{i % d.customers + 1}", {"json": customer_body(i % d.customers + 1)})),
+    Scenario("customers_bp.login", "POST", 200, lambda i, d: ("/customers/login", {"json": {"email": f"customer{i % d.customers + 1}@example.com", "password": PASSWORD}})),
+    Scenario("mechanics_bp.get_mechanics", "GET", 200, lambda i, d: ("/mechanics/", {})),
+    Scenario("mechanics_bp.get_mechanic", "GET", 200, lambda i, d: (f"/mechanics/{i % d.mechanics + 1}", {})),
+    Scenario("mechanics_bp.get_mechanics_leaderboard", "GET", 200, lambda i, d: ("/mechanics/leaderboard?limit=10&since=2023-01-01", {})),
+    Scenario("mechanics_bp.get_top_3_mechanics", "GET", 200, lambda i, d: ("/mechanics/top-3-mechanics", {})),
+    Scenario("mechanics_bp.create_mechanic", "POST", 201, lambda i, d: ("/mechanics/", {"json": mechanic_body(d.mechanics + d.spares + 1 + i)})),
+    Scenario("mechanics_bp.update_mechanic", "PUT", 200, lambda i, d: (f"/mechanics/{i % d.mechanics + 1}", {"json": mechanic_body(i % d.mechanics + 1)})),
+    Scenario("mechanics_bp.delete_mechanic", "DELETE", 204, lambda i, d: (f"/mechanics/{d.mechanics + 1 + i}", {})),
+    Scenario("inventory_bp.get_inventory_items", "GET", 200, lambda i, d: (f"/inventory/?page={i % 10 + 1}&per_page=50", {})),
+    Scenario("inventory_bp.add_inventory_item", "POST", 201, lambda i, d: ("/inventory/", {"json": {"name": f"New part {i}", "price": 19.99}})),
+    Scenario("inventory_bp.update_inventory_item", "PUT", 200, lambda i, d: (f"/inventory/{i % d.inventory + 1}", {"json": {"name": f"Part {i % d.inventory + 1}", "price": 10 + i % 50}})),
+    Scenario("inventory_bp.delete_inventory_item", "DELETE", 204, lambda i, d: (f"/inventory/{d.inventory + 1 + i}", {})),
+    Scenario("inventory_bp.import_inventory_items", "POST", 200, lambda i, d: ("/inventory/import", {"data": inventory_csv(i), "content_type": "text/csv"})),
+    Scenario("inventory_bp.get_inventory_analytics", "GET", 200, lambda i, d: ("/inventory/analytics?top=10" + ("&since=2024-01-01&until=2024-06-30" if i % 2 else ""), {})),
+    Scenario("tickets_bp.get_tickets", "GET", 200, lambda i, d: ("/tickets/?limit=50" + ("&sort=service_date" if i % 2 else ""), {})),
+    Scenario("tickets_bp.get_ticket", "GET", 200, lambda i, d: (f"/tickets/{i % d.tickets + 1}", {})),
+    Scenario("tickets_bp.search_tickets", "GET", 200, lambda i, d: (f"/tickets/search?q={WORDS[i % len(WORDS)]}", {})),
+    Scenario("tickets_bp.get_my_tickets", "GET", 200, lambda i, d: ("/tickets/my-tickets", {"headers": {"Authorization": f"Bearer {d.tokens[i % d.customers]}"}})),
+    Scenario("tickets_bp.create_ticket", "POST", 201, lambda i, d: ("/tickets/", {"json": ticket_body(i, d)})),
+    Scenario("tickets_bp.create_tickets_bulk", "POST", 201, lambda i, d: ("/tickets/bulk", {"json": [ticket_body(i * 100 + n, d) for n in range(100)]})),
+    Scenario("tickets_bp.update_ticket", "PUT", 200, lambda i, d: (f"/tickets/{i % d.tickets + 1}", {
+        "json": {**ticket_body(i, d), "customer_id": owner(i % d.tickets + 1, d)},
+        "headers": {"Authorization": f"Bearer {d.tokens[owner(i % d.tickets + 1, d) - 1]}"}
+    })),
+    Scenario("tickets_bp.update_ticket_mechanics", "PUT", 200, lambda i, d: (f"/tickets/{i % d.tickets + 1}/update-mechanics", {
+        "json": {"add_mechanic_ids": [(i + 1) % d.mechanics + 1], "remove_mechanic_ids": []}
+    })),
+    Scenario("tickets_bp.bulk_update_ticket_mechanics", "PUT", 200, lambda i, d: ("/tickets/update-mechanics", {"json": {"updates": [
+        {"ticket_id": (i * 50 + n) % d.tickets + 1, "add_mechanic_ids": [(i + 2) % d.mechanics + 1], "remove_mechanic_ids": []} for n in range(50)
+    ]}})),
+    Scenario("tickets_bp.assign_mechanic", "PUT", 200, lambda i, d: (f"/tickets/{i % d.tickets + 1}/assign-mechanic/{(i + 3) % d.mechanics + 1}", {})),
+    Scenario("tickets_bp.remove_mechanic", "PUT", 200, lambda i, d: (f"/tickets/{d.tickets - i}/remove-mechanic/{(d.tickets - i - 1) % d.mechanics + 1}", {})),
+    Scenario("tickets_bp.add_inventory", "POST", 200, lambda i, d: (f"/tickets/{i % d.tickets + 1}/inventory", {
+        "json": {"add_inventory_items": [{"inventory_id": (i + n) % d.inventory + 1, "quantity": 1} for n in range(5)]}
+    })),
+    Scenario("tickets_bp.get_ticket_invoice", "GET", 200, lambda i, d: (f"/tickets/{i % d.tickets + 1}/invoice", {})),
+    Scenario("tickets_bp.get_ticket_invoices", "GET", 200, lambda i, d: ("/tickets/invoices?ids=" + ",".join(str((i * 50 + n) % d.tickets + 1) for n in range(50)), {})),
+    Scenario("internal_bp.get_pool_stats", "GET", 200, lambda i, d: ("/internal/pool", {})),
+    Scenario("internal_bp.get_metrics", "GET", 200, lambda i, d: ("/metrics", {}))
+]
+
+def seed(app, args, spares) -> Dataset:
+    rng = random.Random(args.seed)
+    start = date(2023, 1, 1)
+    with app.app_context():
+        password = hash_password(PASSWORD) # one hash shared by every seeded customer
+        db.session.execute(insert(Customer), [{**customer_body(i), "password": password} for i in range(1, args.customers + 1)])
+        db.session.execute(insert(Mechanic), [mechanic_body(i) for i in range(1, args.mechanics + spares + 1)])
+        db.session.execute(insert(Inventory), [
+            {"name": f"Part {i}", "price": round(rng.uniform(5, 500), 2)} for i in range(1, args.inventory + spares + 1)
+        ])
+        for offset in range(0, args.tickets, 10_000):
+            ids = range(offset + 1, min(offset + 10_000, args.tickets) + 1)
+            db.session.execute(insert(Ticket), [{
+                "VIN": f"1HGCM{rng.randrange(10 ** 12):012d}",
+                "service_date": start + timedelta(days=rng.randrange(730)),
+                "service_description": " ".join(rng.sample(WORDS, 4)),
+                "customer_id": (t - 1) % args.customers + 1
+            } for t in ids])
+            db.session.execute(insert(ticket_mechanic_joint_table), [{"ticket_id": t, "mechanic_id": (t - 1) % args.mechanics + 1} for t in ids])
+            db.session.execute(insert(TicketInventory), [{"ticket_id": t, "inventory_id": rng.randrange(args.inventory) + 1, "quantity": 2} for t in ids])
+        db.session.commit()
+        tokens = [encode_token(c) for c in range(1, args.customers + 1)]
+    return Dataset(args.customers, args.mechanics, args.tickets, args.inventory, spares, tokens)
+
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError: # not Linux, fall back to the process' peak so far
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == "darwin" else peak / 1024
+
+class RssSampler:
+    """Peak resident memory while active, sampled every few milliseconds"""
+    def __enter__(self):
+        self.peak = rss_mb()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def _sample(self):
+        while not self._stop.wait(0.005):
+            self.peak = max(self.peak, rss_mb())
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, rss_mb())
+
+def percentile(samples, p):
+    return statistics.quantiles(samples, n=100, method="inclusive")[p - 1] if len(samples) > 1 else samples[0]
+
+def run_scenario(app, scenario, data, args) -> dict:
+    def send(client, i):
+        path, kwargs = scenario.request(i, data)
+        start = time.perf_counter()
+        response = client.open(path, method=scenario.method, **kwargs)
+        elapsed = (time.perf_counter() - start) * 1000
+        return elapsed, response.status_code == scenario.status
+
+    def worker(thread_index, indexes):
+        client = app.test_client()
+        return [send(client, i) for i in indexes[thread_index::args.concurrency]]
+
+    warmup = list(range(args.warmup))
+    timed = list(range(args.warmup, args.warmup + args.requests))
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        list(pool.map(worker, range(args.concurrency), [warmup] * args.concurrency))
+        with app.app_context(), QueryCounter(db.engine) as counter, RssSampler() as rss:
+            results = [r for batch in pool.map(worker, range(args.concurrency), [timed] * args.concurrency) for r in batch]
+
+    latencies = [elapsed for elapsed, _ in results]
+    return {
+        "method": scenario.method,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "queries_per_request": round(counter.count / len(results), 2),
+        "peak_rss_mb": round(rss.peak, 1),
+        "errors": sum(1 for _, ok in results if not ok)
+    }
+
+def run_suite(args) -> dict:
+    app = make_app()
+    app.logger.disabled = True # failed requests are counted as errors instead
+    missing = sorted({rule.endpoint for rule in app.url_map.iter_rules()} - EXCLUDED_ENDPOINTS - {s.endpoint for s in SCENARIOS})
+    if missing:
+        sys.exit(f"Routes without a benchmark scenario: {', '.join(missing)}")
+
+    selected = [s for s in SCENARIOS if not args.routes or any(pattern in s.endpoint for pattern in args.routes)]
+    data = seed(app, args, spares=args.warmup + args.requests)
+    routes = {}
+    for scenario in selected:
+        routes[scenario.endpoint] = run_scenario(app, scenario, data, args)
+        print(format_row(scenario.endpoint, routes[scenario.endpoint]), flush=True)
+
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "platform": platform.platform(),
+            "settings": {key: getattr(args, key) for key in SETTINGS}
+        },
+        "routes": routes
+    }
+
+def format_row(endpoint, result):
+    return (f"  {endpoint:<42} p50={result['p50_ms']:>8.2f}ms p95={result['p95_ms']:>8.2f}ms p99={result['p99_ms']:>8.2f}ms "
+            f"queries={result['queries_per_request']:>6} rss={result['peak_rss_mb']:>7}MB errors={result['errors']}")
+
+def compare(baseline, current, threshold, min_latency_delta_ms) -> list:
+    """Metrics of 'current' that grew more than 'threshold' over 'baseline', plus newly failing routes"""
+    regressions = []
+    for endpoint, base in baseline["routes"].items():
+        result = current["routes"].get(endpoint)
+        if result is None:
+            continue
+        for metric in COMPARED_METRICS:
+            before, after = base[metric], result[metric]
+            if after <= before * (1 + threshold):
+                continue
+            if metric in LATENCY_METRICS and after - before <= min_latency_delta_ms:
+                continue
+            regressions.append(f"{endpoint} {metric}: {before} -> {after} (+{(after / before - 1) * 100 if before else float('inf'):.0f}%)")
+        if result["errors"] > base["errors"]:
+            regressions.append(f"{endpoint} errors: {base['errors']} -> {result['errors']}")
+    return regressions
+
+SETTINGS = ("customers", "mechanics", "tickets", "inventory", "seed", "requests", "warmup", "concurrency")
+
+def main():
+    parser = argparse.ArgumentParser(description="Endpoint load benchmark with regression thresholds")
+    parser.add_argument("--customers", type=int, default=1_000)
+    parser.add_argument("--mechanics", type=int, default=100)
+    parser.add_argument("--tickets", type=int, default=50_000)
+    parser.add_argument("--inventory", type=int, default=1_000)
+    parser.add_argument("--seed", type=int, default=1, help="random seed of the generated dataset")
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per route")
+    parser.add_argument("--warmup", type=int, default=10, help="untimed requests per route first")
+    parser.add_argument("--concurrency", type=int, default=4, help="client threads")
+    parser.add_argument("--routes", nargs="*", help="only run endpoints containing one of these strings")
+    parser.add_argument("--output", help="write results as JSON, e.g. a baseline")
+    parser.add_argument("--compare", help="baseline JSON to check against, its settings replace the dataset & load options")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative growth of a metric")
+    parser.add_argument("--min-latency-delta-ms", type=float, default=2.5, help="latency growth always allowed")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        for key, value in baseline["meta"]["settings"].items():
+            setattr(args, key, value)
+        args.routes = args.routes or list(baseline["routes"])
+
+    print(f"Seeding {args.tickets} tickets, {args.customers} customers; {args.requests} requests per route from {args.concurrency} threads")
+    results = run_suite(args)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+            file.write("\n")
+
+    if baseline is not None:
+        regressions = compare(baseline, results, args.threshold, args.min_latency_delta_ms)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.compare} (threshold {args.threshold:.0%}):")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions over {args.compare} (threshold {args.threshold:.0%})")
+
+if __name__ == "__main__":
+    main()
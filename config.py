@@ -3,16 +3,69 @@ from dotenv import load_dotenv
 
 load_dotenv(override=False)
 
+def engine_options(pool_size=5, max_overflow=10, pool_timeout=30, pool_recycle=-1, pool_pre_ping=False):
+    """SQLALCHEMY_ENGINE_OPTIONS with every pool setting overridable by a DB_POOL_* environment variable"""
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", pool_size)),
+        "max_overflow": int(os.getenv("DB_POOL_MAX_OVERFLOW", max_overflow)),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", pool_timeout)), # seconds a checkout waits for a free connection
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", pool_recycle)), # seconds before a connection is replaced, -1 never
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", str(pool_pre_ping)).lower() in ("1", "true", "yes")
+    }
+
 class DevelopmentConfig:
     SQLALCHEMY_DATABASE_URI = os.getenv("DEV_DATABASE_URI")
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(pool_recycle=3600, pool_pre_ping=True)
     DEBUG = True
+    CACHE_TYPE = 'SimpleCache'
+    # Per-request query counts, DB time & N+1 warnings as response headers (see app/utils/sql_profiler.py)
+    SQL_PROFILER_ENABLED = os.getenv("SQL_PROFILER_ENABLED", "false").lower() in ("1", "true", "yes")
+    INTERNAL_ALLOW_LOOPBACK = True # /internal/* & /metrics answer localhost without INTERNAL_API_TOKEN
     
 class TestingConfig:
    SQLALCHEMY_DATABASE_URI = "sqlite:///testing.db"
+   # Library defaults, but a QueuePool like the other configs so the pool telemetry is exercised
+   SQLALCHEMY_ENGINE_OPTIONS = engine_options()
    DEBUG=True
    CACHE_TYPE='SimpleCache'
    SQLALCHEMY_TRACK_MODIFICATIONS=False
+   PASSWORD_HASH_METHOD='scrypt:1024:8:1' # cheap hashes keep the suite fast
+   INTERNAL_ALLOW_LOOPBACK=True
 
 class ProductionConfig:
     SQLALCHEMY_DATABASE_URI = os.getenv("PROD_DATABASE_URI")
-    DEBUG = False
\ No newline at end of file
+    # Pool per worker process, size it from /internal/pool (see app/utils/pool_stats.py).
+    # Connections are recycled well inside MySQL's wait_timeout & pinged before reuse
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(pool_size=10, max_overflow=10, pool_timeout=10, pool_recycle=1800, pool_pre_ping=True)
+    DEBUG = False
+    # Every gunicorn worker keeps a small in-process L1 in front of a cache shared by all
+    # workers: Redis when CACHE_REDIS_URL is set, else files in CACHE_DIR (see app/utils/two_tier_cache.py)
+    CACHE_TYPE = os.getenv("CACHE_TYPE", "app.utils.two_tier_cache.TwoTierCache")
+    CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL")
+    CACHE_DIR = os.getenv("CACHE_DIR", "/tmp/mechanic_shop_cache")
+    CACHE_THRESHOLD = 10_000 # tagged entries take a few keys each, the default 500 would keep pruning
+    CACHE_L1_MAX_ENTRIES = 1024
+    CACHE_L1_TIMEOUT = 30
+    # Password hashing cost & the per-worker pool running it (see app/utils/passwords.py)
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 32))
+    # Async read endpoints (asgi.py), defaults to PROD_DATABASE_URI with an asyncio driver
+    ASYNC_DATABASE_URI = os.getenv("ASYNC_DATABASE_URI")
+    # Required as X-Internal-Token by /internal/* & /metrics, which are closed when it's unset
+    INTERNAL_API_TOKEN = os.getenv("INTERNAL_API_TOKEN")
+    # Per-request query counts, DB time & N+1 warnings logged as JSON (see app/utils/sql_profiler.py)
+    SQL_PROFILER_ENABLED = os.getenv("SQL_PROFILER_ENABLED", "false").lower() in ("1", "true", "yes")
+    SQL_PROFILER_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_PROFILER_N_PLUS_ONE_THRESHOLD", 5))
+    SQL_PROFILER_OUTPUT = os.getenv("SQL_PROFILER_OUTPUT") # "headers" or "log", logs when unset
+
+# Used by the scripts in benchmarks/, points at its own SQLite file so seeded data
+# never collides with the test database. Rate limits would throttle the load generator.
+class BenchmarkConfig:
+    SQLALCHEMY_DATABASE_URI = os.getenv("BENCH_DATABASE_URI", "sqlite:///benchmark.db")
+    DEBUG = False
+    CACHE_TYPE = 'SimpleCache'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    RATELIMIT_ENABLED = False
+    INTERNAL_ALLOW_LOOPBACK = True
+    ASYNC_ENGINE_OPTIONS = {"pool_size": 16, "max_overflow": 0} # aiosqlite runs a thread per connection
@@ -0,0 +1,18 @@
+from prometheus_client import multiprocess
+import shutil
+import os
+
+# Loaded by gunicorn from the working directory. With PROMETHEUS_MULTIPROC_DIR set, every
+# worker writes its metrics to files in that directory (see app/utils/metrics.py):
+# samples of a previous run are cleared when the server starts, & an exited worker's
+# live gauges are dropped while its counters & histograms keep counting in the totals.
+
+def on_starting(server):
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory)
+
+def child_exit(server, worker):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,34 @@
+"""Add denormalized tickets.parts_total
+
+Revision ID: 7c3e9a1d2b4f
+Revises: 41a66c20f68d
+Create Date: 2026-10-18 10:12:41.532871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c3e9a1d2b4f'
+down_revision = '41a66c20f68d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('tickets', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('parts_total', sa.Float(), nullable=False, server_default=sa.text('0')))
+
+    # Backfill existing tickets with one aggregate UPDATE
+    op.execute(
+        "UPDATE tickets SET parts_total = COALESCE(("
+        "SELECT SUM(ticket_inventory.quantity * inventory.price) "
+        "FROM ticket_inventory JOIN inventory ON inventory.id = ticket_inventory.inventory_id "
+        "WHERE ticket_inventory.ticket_id = tickets.id), 0)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('tickets', schema=None) as batch_op:
+        batch_op.drop_column('parts_total')
@@ -0,0 +1,68 @@
+"""Add full-text search over tickets.VIN & tickets.service_description
+
+Revision ID: b81f0c2d6e3a
+Revises: 7c3e9a1d2b4f
+Create Date: 2026-10-18 11:04:27.918254
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b81f0c2d6e3a'
+down_revision = '7c3e9a1d2b4f'
+branch_labels = None
+depends_on = None
+
+
+# SQLite: external-content FTS5 table kept in sync with tickets by triggers
+SQLITE_UPGRADE = [
+    'CREATE VIRTUAL TABLE tickets_fts USING fts5('
+    '"VIN", service_description, content=\'tickets\', content_rowid=\'id\', tokenize=\'porter unicode61\')',
+    'CREATE TRIGGER tickets_fts_ai AFTER INSERT ON tickets BEGIN '
+    'INSERT INTO tickets_fts(rowid, "VIN", service_description) VALUES (new.id, new."VIN", new.service_description); '
+    'END',
+    'CREATE TRIGGER tickets_fts_ad AFTER DELETE ON tickets BEGIN '
+    'INSERT INTO tickets_fts(tickets_fts, rowid, "VIN", service_description) VALUES (\'delete\', old.id, old."VIN", old.service_description); '
+    'END',
+    'CREATE TRIGGER tickets_fts_au AFTER UPDATE OF "VIN", service_description ON tickets BEGIN '
+    'INSERT INTO tickets_fts(tickets_fts, rowid, "VIN", service_description) VALUES (\'delete\', old.id, old."VIN", old.service_description); '
+    'INSERT INTO tickets_fts(rowid, "VIN", service_description) VALUES (new.id, new."VIN", new.service_description); '
+    'END',
+    # Index the tickets that already exist
+    'INSERT INTO tickets_fts(tickets_fts) VALUES (\'rebuild\')'
+]
+
+SQLITE_DOWNGRADE = [
+    'DROP TRIGGER IF EXISTS tickets_fts_au',
+    'DROP TRIGGER IF EXISTS tickets_fts_ad',
+    'DROP TRIGGER IF EXISTS tickets_fts_ai',
+    'DROP TABLE IF EXISTS tickets_fts'
+]
+
+# Postgres: stored generated tsvector (always in sync) with a GIN index
+POSTGRES_UPGRADE = [
+    'ALTER TABLE tickets ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ('
+    'setweight(to_tsvector(\'simple\', coalesce("VIN", \'\')), \'A\') || '
+    'setweight(to_tsvector(\'english\', coalesce(service_description, \'\')), \'B\')) STORED',
+    'CREATE INDEX ix_tickets_search_vector ON tickets USING GIN (search_vector)'
+]
+
+POSTGRES_DOWNGRADE = [
+    'DROP INDEX IF EXISTS ix_tickets_search_vector',
+    'ALTER TABLE tickets DROP COLUMN IF EXISTS search_vector'
+]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    statements = {"sqlite": SQLITE_UPGRADE, "postgresql": POSTGRES_UPGRADE}.get(dialect, [])
+    for statement in statements:
+        op.execute(statement)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    statements = {"sqlite": SQLITE_DOWNGRADE, "postgresql": POSTGRES_DOWNGRADE}.get(dialect, [])
+    for statement in statements:
+        op.execute(statement)
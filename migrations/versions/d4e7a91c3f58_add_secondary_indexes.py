@@ -0,0 +1,42 @@
+"""Add secondary indexes for foreign keys & hot lookups
+
+Revision ID: d4e7a91c3f58
+Revises: b81f0c2d6e3a
+Create Date: 2026-10-18 14:05:12.204117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4e7a91c3f58'
+down_revision = 'b81f0c2d6e3a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('tickets', schema=None) as batch_op:
+        batch_op.create_index('ix_tickets_customer_id_service_date', ['customer_id', 'service_date'], unique=False)
+        batch_op.create_index('ix_tickets_service_date', ['service_date', 'id'], unique=False)
+        batch_op.create_index('ix_tickets_vin', ['VIN'], unique=False)
+
+    with op.batch_alter_table('ticket_mechanic', schema=None) as batch_op:
+        batch_op.create_index('ix_ticket_mechanic_mechanic_id', ['mechanic_id', 'ticket_id'], unique=False)
+
+    with op.batch_alter_table('ticket_inventory', schema=None) as batch_op:
+        batch_op.create_index('ix_ticket_inventory_inventory_id', ['inventory_id', 'ticket_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('ticket_inventory', schema=None) as batch_op:
+        batch_op.drop_index('ix_ticket_inventory_inventory_id')
+
+    with op.batch_alter_table('ticket_mechanic', schema=None) as batch_op:
+        batch_op.drop_index('ix_ticket_mechanic_mechanic_id')
+
+    with op.batch_alter_table('tickets', schema=None) as batch_op:
+        batch_op.drop_index('ix_tickets_vin')
+        batch_op.drop_index('ix_tickets_service_date')
+        batch_op.drop_index('ix_tickets_customer_id_service_date')
@@ -0,0 +1,31 @@
+"""Add row version columns backing ETags
+
+Revision ID: e2a5c7b91d04
+Revises: d4e7a91c3f58
+Create Date: 2026-10-18 15:21:37.840512
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a5c7b91d04'
+down_revision = 'd4e7a91c3f58'
+branch_labels = None
+depends_on = None
+
+VERSIONED_TABLES = ['customers', 'tickets', 'inventory', 'mechanics']
+
+# Plain ALTER TABLE rather than batch mode, a batch table rebuild on SQLite would drop
+# the full-text search triggers on tickets (see b81f0c2d6e3a)
+
+
+def upgrade():
+    for table_name in VERSIONED_TABLES:
+        op.add_column(table_name, sa.Column('version', sa.Integer(), nullable=False, server_default=sa.text('1')))
+
+
+def downgrade():
+    for table_name in reversed(VERSIONED_TABLES):
+        op.drop_column(table_name, 'version')
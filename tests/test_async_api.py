@@ -0,0 +1,93 @@
+from app import async_api
+from app.async_api import create_asgi_app, async_database_url
+from app.extensions import db
+from app.models import Customer, Mechanic, Ticket, Inventory
+from starlette.testclient import TestClient
+from unittest.mock import patch
+from datetime import date
+import unittest
+
+# The async read endpoints must answer exactly like the Flask views they shadow
+class TestAsyncApi(unittest.TestCase):
+    def setUp(self):
+        self.asgi_app = create_asgi_app("TestingConfig")
+        self.app = self.asgi_app.state.flask_app
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.drop_all()
+        db.create_all()
+        
+        customers = [Customer(name=f"customer {i}", phone="2159151004", email=f"c{i}@example.com", password="x") for i in range(3)]
+        db.session.add_all(customers)
+        db.session.add_all([Mechanic(name=f"mechanic {i}", email=f"m{i}@example.com", phone="1", salary=50000 + i) for i in range(3)])
+        db.session.add_all([Inventory(name=f"part {i}", price=i + 0.99) for i in range(3)])
+        db.session.flush()
+        db.session.add_all([
+            Ticket(VIN=f"VIN{i}", service_date=date(2025, 1, 3 - i % 3), service_description="brakes", customer_id=customers[i % 3].id)
+            for i in range(5)
+        ])
+        db.session.commit()
+        
+        self.client = self.app.test_client()
+        self.async_client = TestClient(self.asgi_app).__enter__()
+        
+    def tearDown(self):
+        self.async_client.__exit__(None, None, None)
+        db.session.remove()
+        db.engine.dispose()
+        self.ctx.pop()
+        
+    def assertSameResponse(self, url, headers=None):
+        expected = self.client.get(url, headers=headers)
+        actual = self.async_client.get(url, headers=headers)
+        self.assertEqual(actual.status_code, expected.status_code, url)
+        self.assertEqual(actual.content, expected.data, url)
+        self.assertEqual(actual.headers.get("etag"), expected.headers.get("ETag"), url)
+        self.assertEqual(actual.headers.get("content-type"), expected.headers.get("Content-Type"), url)
+        return actual
+        
+    def test_reads_match_flask_views(self):
+        for url in [
+            "/tickets/", "/tickets/?limit=2", "/tickets/?sort=service_date&limit=2", "/tickets/?limit=0",
+            "/tickets/?cursor=garbage", "/tickets/?sort=vin", "/tickets/1", "/tickets/99",
+            "/customers/", "/customers/?page=2&per_page=2", "/customers/2", "/customers/99",
+            "/mechanics/", "/mechanics/3", "/mechanics/99",
+            "/inventory/", "/inventory/?page=1&per_page=2",
+            "/tickets/?stream=1", "/customers/?stream=1", "/mechanics/?stream=1", "/inventory/?stream=1"
+        ]:
+            self.assertSameResponse(url)
+        self.assertSameResponse("/tickets/", headers={"Accept": "application/x-ndjson"})
+        
+        # test following a cursor & conditional GETs
+        next_cursor = self.async_client.get("/tickets/?limit=2").json()["meta"]["next_cursor"]
+        self.assertSameResponse(f"/tickets/?limit=2&cursor={next_cursor}")
+        for url in ["/tickets/1", "/tickets/?limit=2", "/customers/1", "/mechanics/"]:
+            etag = self.async_client.get(url).headers["etag"]
+            response = self.assertSameResponse(url, headers={"If-None-Match": etag})
+            self.assertEqual(response.status_code, 304)
+            
+    def test_other_requests_reach_flask_app(self):
+        # test writes & endpoints without an async version are served by the mounted Flask app
+        response = self.async_client.post("/inventory/", json={"name": "new part", "price": 5.0})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.async_client.get("/inventory/").json()[-1]["name"], "new part")
+        self.assertEqual(self.async_client.get("/tickets/1/invoice").status_code, 200)
+
+class TestAsyncDatabaseUrl(unittest.TestCase):
+    def test_drivers_swapped_per_backend(self):
+        for sync_url, async_url in [
+            ("mysql+mysqlconnector://user:pw@db:3306/shop", "mysql+aiomysql://user:pw@db:3306/shop"),
+            ("postgresql+psycopg2://user:pw@db/shop", "postgresql+asyncpg://user:pw@db/shop"),
+            ("postgresql://user:pw@db/shop", "postgresql+asyncpg://user:pw@db/shop"),
+            ("sqlite:///instance/app.db", "sqlite+aiosqlite:///instance/app.db")
+        ]:
+            with self.subTest(url=sync_url):
+                self.assertEqual(async_database_url(sync_url).render_as_string(hide_password=False), async_url)
+
+    def test_missing_driver_names_async_database_uri(self):
+        # test a backend without its async driver installed fails with what to do, not on first query
+        with patch.object(async_api.importlib.util, "find_spec", return_value=None):
+            with self.assertRaisesRegex(ValueError, "aiomysql.*ASYNC_DATABASE_URI"):
+                async_database_url("mysql+mysqlconnector://user:pw@db/shop")
+        with self.assertRaisesRegex(ValueError, "ASYNC_DATABASE_URI"):
+            async_database_url("oracle://user:pw@db/shop")
@@ -2,7 +2,11 @@ from app import create_app
 from app.extensions import db
 from app.models import Customer
 from app.blueprints.customers.schemas import customer_schema
-from sqlalchemy import select
+from app.utils import passwords
+from sqlalchemy import select, update
+from app.blueprints.customers import routes as customer_routes
+from werkzeug.security import check_password_hash
+from unittest.mock import patch
 import unittest
 
 class TestCustomer(unittest.TestCase):
@@ -42,6 +46,80 @@ class TestCustomer(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json['status'], "success") 
     
+    def test_login_upgrades_legacy_password(self):
+        customer = Customer(name="john pork", phone="2224445555", email="johnpork@gmail.com", password="testpassword")
+        db.session.add(customer)
+        db.session.commit()
+        credentials = {"email": "johnpork@gmail.com", "password": "testpassword"}
+        
+        # test a wrong password leaves the plaintext row alone
+        response = self.client.post("/customers/login", json={**credentials, "password": "testpassword2"})
+        self.assertEqual(response.status_code, 401)
+        db.session.refresh(customer)
+        self.assertEqual(customer.password, "testpassword")
+        
+        # test the first successful login replaces plaintext with a hash that keeps working
+        self.assertEqual(self.client.post("/customers/login", json=credentials).status_code, 200)
+        db.session.refresh(customer)
+        self.assertTrue(customer.password.startswith(self.app.config["PASSWORD_HASH_METHOD"] + "$"))
+        self.assertTrue(check_password_hash(customer.password, "testpassword"))
+        self.assertEqual(self.client.post("/customers/login", json=credentials).status_code, 200)
+        self.assertEqual(self.client.post("/customers/login", json={**credentials, "password": "testpassword2"}).status_code, 401)
+        
+        # test raising the configured cost rehashes on the next login
+        self.app.config["PASSWORD_HASH_METHOD"] = "scrypt:2048:8:1"
+        self.assertEqual(self.client.post("/customers/login", json=credentials).status_code, 200)
+        db.session.refresh(customer)
+        self.assertTrue(customer.password.startswith("scrypt:2048:8:1$"))
+    
+    def test_concurrent_legacy_logins(self):
+        customer = Customer(name="john pork", phone="2224445555", email="johnpork@gmail.com", password="testpassword")
+        db.session.add(customer)
+        db.session.commit()
+        other_hash = passwords.hash_password("testpassword")
+        
+        # another login upgrades the same plaintext row while this one is verifying
+        def verify_racing(stored, password):
+            result = passwords.verify_password(stored, password)
+            with db.engine.begin() as connection:
+                connection.execute(update(Customer).values(password=other_hash, version=Customer.version + 1))
+            return result
+        
+        # test both logins succeed & the first upgrade is kept
+        with patch.object(customer_routes, "verify_password", side_effect=verify_racing):
+            response = self.client.post("/customers/login", json={"email": "johnpork@gmail.com", "password": "testpassword"})
+        self.assertEqual(response.status_code, 200)
+        db.session.expire_all()
+        self.assertEqual(db.session.get(Customer, customer.id).password, other_hash)
+    
+    def test_login_legacy_password_edge_cases(self):
+        customer = Customer(name="john pork", phone="2224445555", email="johnpork@gmail.com", password="scrypt:x$y$z")
+        db.session.add(customer)
+        db.session.commit()
+        credentials = {"email": "johnpork@gmail.com", "password": "scrypt:x$y$z"}
+        
+        # test a wrong password for a plaintext row spends a hash like a hashed row would
+        with patch.object(passwords, "burn_verification", wraps=passwords.burn_verification) as burn:
+            self.assertEqual(self.client.post("/customers/login", json={**credentials, "password": "nope"}).status_code, 401)
+        burn.assert_called_once()
+        
+        # test a plaintext password shaped like a hash still logs in & gets hashed
+        self.assertEqual(self.client.post("/customers/login", json=credentials).status_code, 200)
+        db.session.refresh(customer)
+        self.assertTrue(check_password_hash(customer.password, "scrypt:x$y$z"))
+    
+    def test_login_pool_busy(self):
+        customer = Customer(name="john pork", phone="2224445555", email="johnpork@gmail.com", password="testpassword")
+        db.session.add(customer)
+        db.session.commit()
+        
+        # test logins are turned away instead of queueing once the hashing pool is saturated
+        running, pending = passwords._get_slots()
+        with patch.object(pending, "acquire", return_value=False):
+            response = self.client.post("/customers/login", json={"email": "johnpork@gmail.com", "password": "testpassword"})
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("Retry-After", response.headers)
+    
     def test_invalid_login(self):
         credentials = {
             "email": "andrew@example.com",
@@ -118,8 +196,26 @@ class TestCustomer(unittest.TestCase):
         # test password separately due to load_only=True in 
         # schema def for 'password' field in Customer
         
+        # stored hashed, never as plaintext
         db.session.refresh(customer) # protect against stale cache
         live_password = customer.password
-        self.assertEqual(payload['password'], live_password)
+        self.assertNotEqual(payload['password'], live_password)
+        self.assertTrue(check_password_hash(live_password, payload['password']))
+    
+    def test_get_customer_conditional(self):
+        customer = Customer(name="Test-Customer", email="test-email@example.com", phone="2159151004", password="AnExamplePassword")
+        db.session.add(customer)
+        db.session.commit()
         
-        
\ No newline at end of file
+        # test the cached response carries an ETag that a conditional GET can match
+        response = self.client.get(f'/customers/{customer.id}')
+        etag = response.headers['ETag']
+        response = self.client.get(f'/customers/{customer.id}', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        
+        # test an update changes the ETag & purges the cached response
+        customer.phone = "2155550000"
+        db.session.commit()
+        response = self.client.get(f'/customers/{customer.id}', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["phone"], "2155550000")
@@ -0,0 +1,113 @@
+from app.models import Mechanic, Ticket, Customer, Inventory, TicketInventory
+from app.extensions import db, ma
+from app import create_app
+from app.utils.eager_loading import loader_options, select_for, raise_on_lazy_load, LazyLoadError
+from app.blueprints.customers import schemas as customer_schemas
+from app.blueprints.mechanics import schemas as mechanic_schemas
+from app.blueprints.tickets import schemas as ticket_schemas
+from app.blueprints.inventory import schemas as inventory_schemas
+from app.blueprints.tickets.schemas import update_ticket_mechanics_response_schema
+from marshmallow import fields
+from sqlalchemy import event, select
+from datetime import date
+import unittest
+
+# Every model schema instance the blueprints dump with, directly or through compiled serializers
+def _model_schemas():
+    for module in (customer_schemas, mechanic_schemas, ticket_schemas, inventory_schemas):
+        for name, value in vars(module).items():
+            items = {f"{name}[{','.join(sorted(key))}]": item for key, item in value.items()} if isinstance(value, dict) else {name: value}
+            for label, item in items.items():
+                schema = getattr(item, "schema", item) # CompiledSerializer
+                if isinstance(schema, ma.SQLAlchemyAutoSchema):
+                    yield f"{module.__name__}.{label}", schema
+
+MODEL_SCHEMAS = list(_model_schemas())
+
+class TestEagerLoading(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app("TestingConfig")
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.drop_all()
+        db.create_all()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        db.session.remove()
+        db.engine.dispose()
+        self.ctx.pop()
+
+    def seed(self, tickets):
+        mechanics = [Mechanic(name=f'm{i}', email=f'm{tickets}-{i}@example.com', phone='2222222222', salary=1) for i in range(3)]
+        inventory = Inventory(name=f'part{tickets}', price=10)
+        for i in range(tickets):
+            customer = Customer(name='c', email=f'c{tickets}-{i}@example.com', phone='1111111111', password='x')
+            ticket = Ticket(VIN=f'VIN{i:014d}', service_date=date(2024, 1, 1), service_description='oil',
+                            customer=customer, mechanics=mechanics[:i % 3 + 1])
+            ticket.ticket_inventory_items.append(TicketInventory(inventory_item=inventory, quantity=1))
+            db.session.add(ticket)
+        db.session.commit()
+        db.session.expunge_all()
+
+    def dump_all(self, schema):
+        """Loads every row of the schema's model through select_for & dumps it, returns the SQL statements run"""
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, "before_cursor_execute", listener)
+        try:
+            with raise_on_lazy_load():
+                rows = db.session.scalars(select_for(schema)).unique().all()
+                dumped = schema.dump(rows) if schema.many else [schema.dump(row) for row in rows]
+        finally:
+            event.remove(db.engine, "before_cursor_execute", listener)
+        db.session.expunge_all()
+        return dumped, statements
+
+    def test_schemas_declare_dumped_relationships(self):
+        self.seed(6)
+        self.assertTrue(MODEL_SCHEMAS)
+        for name, schema in MODEL_SCHEMAS:
+            with self.subTest(schema=name):
+                dumped, statements = self.dump_all(schema)
+                self.assertEqual(len(dumped), len(db.session.scalars(select(schema.opts.model)).all()))
+                self.assertLessEqual(len(statements), 1 + len(loader_options(schema))) # a SELECT per selectinload at most
+
+    def test_queries_dont_grow_with_rows(self):
+        self.seed(2)
+        _, few = self.dump_all(update_ticket_mechanics_response_schema)
+        self.seed(20)
+        dumped, many = self.dump_all(update_ticket_mechanics_response_schema)
+
+        self.assertEqual(len(dumped), 22)
+        self.assertEqual(len(few), len(many))
+        self.assertEqual({len(ticket["mechanics"]) for ticket in dumped}, {1, 2, 3})
+
+    def test_undeclared_relationship_raises(self):
+        self.seed(2)
+        tickets = db.session.scalars(select(Ticket)).all() # no loader options
+
+        with raise_on_lazy_load(), self.assertRaises(LazyLoadError):
+            update_ticket_mechanics_response_schema.dump(tickets, many=True)
+
+    def test_eager_load_must_name_a_relationship(self):
+        class BrokenSchema(ma.SQLAlchemyAutoSchema):
+            class Meta:
+                model = Ticket
+                eager_load = ("VIN",)
+
+        with self.assertRaises(ValueError):
+            loader_options(BrokenSchema())
+
+    def test_nested_eager_loads_chain(self):
+        class MechanicTicketsSchema(ma.SQLAlchemyAutoSchema):
+            class Meta:
+                model = Mechanic
+                eager_load = ("tickets",)
+            tickets = fields.Nested(update_ticket_mechanics_response_schema, many=True)
+        schema = MechanicTicketsSchema(many=True)
+        self.seed(4)
+
+        dumped, statements = self.dump_all(schema)
+        self.assertEqual(len(statements), 3) # mechanics, their tickets, those tickets' mechanics
+        self.assertEqual(sum(len(mechanic["tickets"]) for mechanic in dumped), 7) # tickets have 1, 2, 3 & 1 mechanics
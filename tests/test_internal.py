@@ -0,0 +1,80 @@
+from app.extensions import db
+from app import create_app
+from app.utils.pool_stats import instrument
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+import tempfile
+import unittest
+import os
+
+class TestInternal(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app("TestingConfig")
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.drop_all()
+        db.create_all()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        db.session.remove()
+        db.engine.dispose()
+        self.ctx.pop()
+
+    def test_pool_stats(self):
+        before = self.client.get('/internal/pool').json["pools"]["default"]
+        self.client.get('/mechanics/')
+        after = self.client.get('/internal/pool').json["pools"]["default"]
+
+        self.assertEqual(after["pool_class"], "QueuePool")
+        self.assertGreater(after["checkouts"], before["checkouts"])
+        self.assertEqual(after["wait_ms"]["count"], after["checkouts"])
+        self.assertEqual(sum(after["wait_ms"]["buckets"].values()), after["wait_ms"]["count"])
+        self.assertEqual(after["in_use"], 1) # the request ran in the test's app context, whose session still holds it
+        self.assertEqual(after["timeouts"], 0)
+
+    def test_pool_stats_internal_only(self):
+        response = self.client.get('/internal/pool', environ_base={"REMOTE_ADDR": "203.0.113.7"})
+        self.assertEqual(response.status_code, 403)
+
+        # test a configured token replaces the localhost check
+        self.app.config["INTERNAL_API_TOKEN"] = "s3cret"
+        self.assertEqual(self.client.get('/internal/pool').status_code, 403)
+        response = self.client.get('/internal/pool', headers={"X-Internal-Token": "s3cret"}, environ_base={"REMOTE_ADDR": "203.0.113.7"})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get('/metrics', headers={"Authorization": "Bearer s3cret"}, environ_base={"REMOTE_ADDR": "203.0.113.7"})
+        self.assertEqual(response.status_code, 200)
+        
+        # test without a token, localhost is only trusted where INTERNAL_ALLOW_LOOPBACK is set
+        # (never in production, where a same-host reverse proxy makes every request local)
+        self.app.config["INTERNAL_API_TOKEN"] = None
+        self.assertEqual(self.client.get('/internal/pool').status_code, 200)
+        self.app.config["INTERNAL_ALLOW_LOOPBACK"] = False
+        self.assertEqual(self.client.get('/internal/pool').status_code, 403)
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+
+    def test_pool_timeouts_and_overflow(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(f"sqlite:///{os.path.join(tmp, 'pool.db')}", poolclass=QueuePool, pool_size=1, max_overflow=1, pool_timeout=0.05)
+            stats = instrument(engine, "test")
+            first, second = engine.connect(), engine.connect()
+            snapshot = stats.snapshot()
+            self.assertEqual((snapshot["in_use"], snapshot["overflow"], snapshot["connects"]), (2, 1, 2))
+
+            # test a checkout from an exhausted pool is counted as a timeout & waits ~pool_timeout
+            with self.assertRaises(PoolTimeoutError):
+                engine.connect()
+            snapshot = stats.snapshot()
+            self.assertEqual(snapshot["timeouts"], 1)
+            self.assertGreaterEqual(snapshot["wait_ms"]["max"], 50)
+
+            # test stats survive the pool being recreated by dispose()
+            first.close()
+            second.close()
+            engine.dispose()
+            with engine.connect() as connection:
+                connection.execute(text("select 1"))
+            snapshot = stats.snapshot()
+            self.assertEqual((snapshot["checkouts"], snapshot["in_use"], snapshot["peak_in_use"]), (3, 0, 2))
+            engine.dispose()
@@ -1,8 +1,14 @@
 from app import create_app
 from app.extensions import db
-from app.models import Inventory
+from app.models import Inventory, Customer, Ticket, TicketInventory
+from sqlalchemy import select, func
 from app.blueprints.inventory.schemas import inventory_item_schema
+from unittest.mock import patch
+from datetime import date
 import unittest
+import tempfile
+import json
+import os
 
 class TestInventory(unittest.TestCase):
     def setUp(self):
@@ -57,6 +63,60 @@ class TestInventory(unittest.TestCase):
         response = self.client.get('/inventory/?per_page=1&page=4')
         self.assertEqual(response.status_code, 200)
     
+
+    def test_get_inventory_stream(self):
+        # seed more items than a single stream batch
+        db.session.add_all([Inventory(name=f"test{i}", price=i + 0.99) for i in range(3)])
+        db.session.commit()
+        
+        # streamed JSON array matches the buffered response
+        buffered = self.client.get('/inventory/')
+        with patch('app.utils.streaming.STREAM_BATCH_SIZE', 2):
+            streamed = self.client.get('/inventory/?stream=1')
+        self.assertEqual(streamed.status_code, 200)
+        self.assertTrue(streamed.is_streamed)
+        self.assertEqual(streamed.json, buffered.json)
+        
+        # NDJSON, one item per line
+        response = self.client.get('/inventory/', headers={'Accept': 'application/x-ndjson'})
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual(lines, buffered.json)
+    
+    def test_get_inventory_analytics(self):
+        # seed parts used on january & february tickets
+        customer = Customer(name='test_customer', email='test@email.com', phone='2159151004', password='test-password')
+        parts = [Inventory(name=f"part{i}", price=price) for i, price in enumerate([10.0, 2.0, 5.0])]
+        january = [Ticket(VIN=f"J{i}", service_date=date(2026, 1, 10), service_description="jan", customer=customer) for i in range(2)]
+        february = Ticket(VIN="F0", service_date=date(2026, 2, 10), service_description="feb", customer=customer)
+        # part0: 1 + 1 in january, part1: 20 in january & 5 in february, part2 unused
+        for ticket, part, quantity in [(january[0], parts[0], 1), (january[1], parts[0], 1), (january[0], parts[1], 20), (february, parts[1], 5)]:
+            ticket.ticket_inventory_items.append(TicketInventory(inventory_item=part, quantity=quantity))
+        db.session.add_all(parts + january + [february])
+        db.session.commit()
+        
+        # test totals ranked by revenue, unused items left out
+        response = self.client.get('/inventory/analytics')
+        self.assertEqual(response.status_code, 200)
+        ranking = [(item['name'], item['quantity_used'], item['ticket_count'], item['revenue']) for item in response.json]
+        self.assertEqual(ranking, [('part1', 25, 2, 50.0), ('part0', 2, 2, 20.0)])
+        
+        # test date window, top & sort
+        response = self.client.get('/inventory/analytics?since=2026-01-01&until=2026-01-31&sort=quantity&top=1')
+        self.assertEqual([(item['name'], item['quantity_used']) for item in response.json], [('part1', 20)])
+        
+        # test the cached window is purged by new usage & price changes
+        february.ticket_inventory_items.append(TicketInventory(inventory_item=parts[2], quantity=1))
+        parts[0].price = 100.0
+        db.session.commit()
+        ranking = [(item['name'], item['revenue']) for item in self.client.get('/inventory/analytics').json]
+        self.assertEqual(ranking, [('part0', 200.0), ('part1', 50.0), ('part2', 5.0)])
+        
+        # test invalid arguments
+        self.assertEqual(self.client.get('/inventory/analytics?since=yesterday').status_code, 400)
+        self.assertEqual(self.client.get('/inventory/analytics?top=0').status_code, 400)
+        self.assertEqual(self.client.get('/inventory/analytics?sort=name').status_code, 400)
+    
     def test_duplicate_add_inventory_item(self):
         # seed test item
         inventory_item = Inventory(name="test_item", price=1.99)
@@ -126,4 +186,67 @@ class TestInventory(unittest.TestCase):
         # test deletion of non-existant item
         nonexistant_id = self.inventory_item.id + 9999
         response = self.client.delete(f'/inventory/{nonexistant_id}')
-        self.assertEqual(response.status_code, 404)
\ No newline at end of file
+        self.assertEqual(response.status_code, 404)
+    
+    def test_import_inventory_items(self):
+        # seed an existing item that the import will update
+        db.session.add(Inventory(name="oil filter", price=5.00))
+        db.session.commit()
+        
+        # CSV import, extra columns ignored, bad price rejected, repeated name updates
+        body = "name,price,sku\noil filter,6.50,A1\nair filter,12.00,A2\nwiper blade,abc,A3\nair filter,13.00,A2\n"
+        with patch('app.blueprints.inventory.importer.IMPORT_BATCH_SIZE', 2):
+            response = self.client.post('/inventory/import', data=body, content_type='text/csv')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['inserted'], 1)
+        self.assertEqual(response.json['updated'], 2)
+        self.assertEqual(response.json['rejected'], 1)
+        self.assertEqual(response.json['errors'][0]['record'], 3)
+        
+        prices = dict(db.session.execute(select(Inventory.name, Inventory.price)).tuples().all())
+        self.assertEqual(prices, {"oil filter": 6.50, "air filter": 13.00})
+        
+        # NDJSON import
+        body = '{"name": "spark plug", "price": 3.25}\nnot json\n{"name": "oil filter", "price": 7}\n'
+        response = self.client.post('/inventory/import', data=body, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json['inserted'], response.json['updated'], response.json['rejected']), (1, 1, 1))
+        
+        # unsupported content type
+        response = self.client.post('/inventory/import', json=[{"name": "x", "price": 1}])
+        self.assertEqual(response.status_code, 415)
+    
+    def test_import_inventory_items_aborted(self):
+        # test unreadable input partway through reports what earlier batches already imported
+        rows = "".join(f"part {i},1.00\n" for i in range(2000))
+        body = b"name,price\n" + rows.encode() + b"bad \xff byte,1.00\n"
+        with patch('app.blueprints.inventory.importer.IMPORT_BATCH_SIZE', 100):
+            response = self.client.post('/inventory/import', data=body, content_type='text/csv')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("UTF-8", response.json['error'])
+        imported = db.session.scalar(select(func.count()).select_from(Inventory))
+        self.assertGreater(imported, 0)
+        self.assertEqual(response.json['inserted'], imported)
+        
+        # test malformed CSV is a 400 rather than a 500
+        body = 'name,price\n"unterminated,' + "x" * 200_000
+        response = self.client.post('/inventory/import', data=body, content_type='text/csv')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Malformed CSV", response.json['error'])
+        
+        # test a database without an upsert is refused before reading anything
+        with patch('app.blueprints.inventory.importer.upsert_statement', side_effect=NotImplementedError("Inventory import does not support the 'oracle' database")):
+            response = self.client.post('/inventory/import', data="name,price\nx,1\n", content_type='text/csv')
+        self.assertEqual(response.status_code, 501)
+        self.assertEqual(db.session.scalar(select(func.count()).select_from(Inventory)), imported)
+    
+    def test_import_inventory_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "catalog.csv")
+            with open(path, "w") as f:
+                f.write("name,price\nbrake pads,40\nrotor,75.5\n")
+            
+            result = self.app.test_cli_runner().invoke(args=["inventory", "import", path, "--batch-size", "1"])
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("Inserted: 2, Updated: 0, Rejected: 0", result.output)
+        self.assertEqual(db.session.scalar(select(func.count()).select_from(Inventory)), 2)
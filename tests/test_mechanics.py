@@ -1,6 +1,7 @@
 from app.models import Mechanic, Ticket, Customer
 from app.extensions import db
 from app import create_app
+from sqlalchemy import update
 from datetime import date
 import unittest
 
@@ -89,6 +90,42 @@ class TestMechanics(unittest.TestCase):
         actual_names = [item['name'] for item in response.json]
         self.assertEqual(actual_names, expected_names)
     
+    def test_get_mechanics_leaderboard(self):
+        # seed customer, mechanics and tickets across two months
+        customer = Customer(name='test_customer', email='test@email.com', phone='2159151004', password='test-password')
+        db.session.add(customer)
+        db.session.flush()
+        
+        mechanics = [
+            Mechanic(name=f'test{i}', email=f'test{i}@example.com', phone="1111111111", salary=100000)
+            for i in range(4)
+        ]
+        january = [Ticket(VIN=f"J{i}", service_date=date(2026, 1, 10), service_description="jan", customer_id=customer.id) for i in range(3)]
+        february = [Ticket(VIN=f"F{i}", service_date=date(2026, 2, 10), service_description="feb", customer_id=customer.id) for i in range(3)]
+        
+        # m0 works january, m1 works february, m2 has one of each, m3 has none
+        mechanics[0].tickets.extend(january)
+        mechanics[1].tickets.extend(february)
+        mechanics[2].tickets.extend([january[0], february[0]])
+        db.session.add_all(mechanics + january + february)
+        db.session.commit()
+        
+        # test overall ranking, ties broken by id & zero-ticket mechanics included
+        response = self.client.get('/mechanics/leaderboard?limit=4')
+        self.assertEqual(response.status_code, 200)
+        ranking = [(item['name'], item['ticket_count']) for item in response.json]
+        self.assertEqual(ranking, [('test0', 3), ('test1', 3), ('test2', 2), ('test3', 0)])
+        
+        # test date window
+        response = self.client.get('/mechanics/leaderboard?limit=2&since=2026-02-01&until=2026-02-28')
+        self.assertEqual(response.status_code, 200)
+        ranking = [(item['name'], item['ticket_count']) for item in response.json]
+        self.assertEqual(ranking, [('test1', 3), ('test2', 1)])
+        
+        # test invalid arguments
+        self.assertEqual(self.client.get('/mechanics/leaderboard?since=yesterday').status_code, 400)
+        self.assertEqual(self.client.get('/mechanics/leaderboard?limit=abc').status_code, 400)
+    
     def test_create_mechanic(self):
         
         # test status & fields
@@ -159,6 +196,48 @@ class TestMechanics(unittest.TestCase):
         
         deleted = db.session.get(Mechanic, mechanic_id)
         self.assertIsNone(deleted)
-
+    
+    def test_get_mechanic_conditional(self):
+        mechanic = Mechanic(name='test0', email='test0@example.com', phone="1111111111", salary=100000)
+        db.session.add(mechanic)
+        db.session.commit()
+        
+        response = self.client.get(f'/mechanics/{mechanic.id}')
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers['ETag']
+        
+        response = self.client.get(f'/mechanics/{mechanic.id}', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        
+        # test a missing mechanic is still a 404, not a 304
+        response = self.client.get('/mechanics/999', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 404)
+    
+    def test_cached_mechanic_invalidation(self):
+        mechanic = Mechanic(name='test0', email='test0@example.com', phone="1111111111", salary=100000)
+        db.session.add(mechanic)
+        db.session.commit()
+        mechanic_id = mechanic.id
+        
+        # warm the detail & list caches
+        self.assertEqual(self.client.get(f'/mechanics/{mechanic_id}').json['salary'], 100000)
+        self.assertEqual(len(self.client.get('/mechanics/').json), 1)
+        
+        # test an update through the API purges the cached detail
+        payload = {'name': 'test0', 'email': 'test0@example.com', 'phone': '1111111111', 'salary': 150000}
+        self.client.put(f'/mechanics/{mechanic_id}', json=payload)
+        self.assertEqual(self.client.get(f'/mechanics/{mechanic_id}').json['salary'], 150000)
+        
+        # test a bulk UPDATE (no per-row events) purges it too
+        db.session.execute(update(Mechanic).values(salary=175000))
+        db.session.commit()
+        self.assertEqual(self.client.get(f'/mechanics/{mechanic_id}').json['salary'], 175000)
+        
+        # test inserts & deletes purge the list & detail
+        db.session.add(Mechanic(name='test1', email='test1@example.com', phone="2222222222", salary=100000))
+        db.session.commit()
+        self.assertEqual(len(self.client.get('/mechanics/').json), 2)
         
-       
\ No newline at end of file
+        self.client.delete(f'/mechanics/{mechanic_id}')
+        self.assertEqual(self.client.get(f'/mechanics/{mechanic_id}').status_code, 404)
+        self.assertEqual(len(self.client.get('/mechanics/').json), 1)
@@ -0,0 +1,93 @@
+from app.models import Mechanic
+from app.extensions import db
+from app import create_app
+from app.utils.metrics import exposition
+from prometheus_client.parser import text_string_to_metric_families
+from unittest.mock import patch
+import subprocess
+import tempfile
+import unittest
+import sys
+import os
+
+def scrape(body) -> dict:
+    """{(sample name, sorted labels): value} of a metrics page"""
+    text = body.decode() if isinstance(body, bytes) else body
+    return {
+        (sample.name, tuple(sorted(sample.labels.items()))): sample.value
+        for family in text_string_to_metric_families(text) for sample in family.samples
+    }
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app("TestingConfig")
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.drop_all()
+        db.create_all()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        db.session.remove()
+        db.engine.dispose()
+        self.ctx.pop()
+
+    def metrics(self) -> dict:
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith("text/plain"))
+        return scrape(response.data)
+
+    def delta(self, before, after, name, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        return after.get(key, 0) - before.get(key, 0)
+
+    def test_request_metrics(self):
+        db.session.add(Mechanic(name='m', email='m@example.com', phone='1111111111', salary=1))
+        db.session.commit()
+        endpoint = {"blueprint": "mechanics_bp", "endpoint": "mechanics_bp.get_mechanic"}
+
+        before = self.metrics()
+        self.client.get('/mechanics/1')
+        self.client.get('/mechanics/1')
+        self.client.get('/no-such-path')
+        after = self.metrics()
+
+        self.assertEqual(self.delta(before, after, "http_requests_total", method="GET", status="200", **endpoint), 2)
+        self.assertEqual(self.delta(before, after, "http_request_duration_seconds_count", method="GET", **endpoint), 2)
+        self.assertEqual(self.delta(before, after, "http_response_size_bytes_count", **endpoint), 2)
+        self.assertGreater(self.delta(before, after, "http_response_size_bytes_sum", **endpoint), 0)
+        self.assertGreater(self.delta(before, after, "http_request_db_seconds_sum", **endpoint), 0)
+        self.assertEqual(self.delta(before, after, "http_requests_total", blueprint="", endpoint="unmatched", method="GET", status="404"), 1)
+
+        # test the first lookup misses & fills the cache, the second is served from it
+        self.assertEqual(self.delta(before, after, "cache_requests_total", endpoint="mechanics_bp.get_mechanic", result="miss"), 1)
+        self.assertEqual(self.delta(before, after, "cache_requests_total", endpoint="mechanics_bp.get_mechanic", result="hit"), 1)
+
+    def test_rate_limit_rejections(self):
+        before = self.metrics()
+        statuses = [self.client.get('/mechanics/').status_code for _ in range(6)] # 5 per hour
+        after = self.metrics()
+
+        self.assertEqual(statuses[-1], 429)
+        self.assertEqual(self.delta(before, after, "rate_limit_rejections_total", endpoint="mechanics_bp.get_mechanics", limit="5 per 1 hour"), 1)
+        self.assertEqual(self.delta(before, after, "http_requests_total", blueprint="mechanics_bp", endpoint="mechanics_bp.get_mechanics", method="GET", status="429"), 1)
+
+    def test_metrics_aggregate_across_processes(self):
+        # test two "workers" writing to PROMETHEUS_MULTIPROC_DIR are summed into one page
+        worker = (
+            "from app import create_app\n"
+            "client = create_app('TestingConfig').test_client()\n"
+            "for _ in range(3): client.get('/no-such-path')\n"
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": directory}
+            for _ in range(2):
+                subprocess.run([sys.executable, "-c", worker], env=env, check=True, capture_output=True)
+
+            with patch.dict(os.environ, {"PROMETHEUS_MULTIPROC_DIR": directory}):
+                body, _ = exposition()
+        samples = scrape(body)
+
+        key = ("http_requests_total", (("blueprint", ""), ("endpoint", "unmatched"), ("method", "GET"), ("status", "404")))
+        self.assertEqual(samples[key], 6)
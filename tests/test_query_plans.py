@@ -0,0 +1,86 @@
+from app.models import Ticket, TicketInventory, ticket_mechanic_joint_table
+from app.extensions import db
+from app.blueprints.tickets.routes import TICKET_SORT_KEYS
+from app.blueprints.mechanics.routes import leaderboard_query
+from app.blueprints.inventory.routes import parts_usage_query
+from app.utils.pagination import keyset_query, encode_cursor
+from app import create_app
+from sqlalchemy import select, text
+from datetime import date
+import unittest
+import re
+
+# Runs EXPLAIN QUERY PLAN on the hot queries & fails if any of them scans a whole table
+# (or a whole index, e.g. a composite key searched on its second column) instead of
+# searching an index. Queries that must visit every row list those tables as allowed.
+TABLE_SCAN = re.compile(r"^SCAN (\w+)\b")
+
+class TestQueryPlans(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app("TestingConfig")
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.drop_all()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.engine.dispose()
+        self.ctx.pop()
+
+    def query_plan(self, statement):
+        sql = statement.compile(dialect=db.engine.dialect, compile_kwargs={"literal_binds": True})
+        return [row.detail for row in db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+    def assertNoTableScan(self, statement, allowed=()):
+        plan = self.query_plan(statement)
+        scans = {match.group(1) for match in map(TABLE_SCAN.match, plan) if match}
+        self.assertFalse(scans - set(allowed), f"full table scan in query plan: {plan}")
+
+    def test_my_tickets_plan(self):
+        keys = TICKET_SORT_KEYS["service_date"]
+        cursor = encode_cursor([date(2025, 1, 1).isoformat(), 50])
+        statement = keyset_query(select(Ticket).where(Ticket.customer_id == 1), keys, cursor, 50)
+        self.assertNoTableScan(statement)
+        self.assertNotIn("USE TEMP B-TREE FOR ORDER BY", self.query_plan(statement))
+
+    def test_ticket_page_by_service_date_plan(self):
+        keys = TICKET_SORT_KEYS["service_date"]
+        cursor = encode_cursor([date(2025, 1, 1).isoformat(), 50])
+        statement = keyset_query(select(Ticket), keys, cursor, 50)
+        self.assertNoTableScan(statement)
+        self.assertNotIn("USE TEMP B-TREE FOR ORDER BY", self.query_plan(statement))
+
+    def test_ticket_by_vin_plan(self):
+        self.assertNoTableScan(select(Ticket).where(Ticket.VIN == "1HGBH41JXMN109186"))
+
+    def test_mechanic_tickets_plan(self):
+        statement = (
+            select(Ticket)
+            .join(ticket_mechanic_joint_table, ticket_mechanic_joint_table.c.ticket_id == Ticket.id)
+            .where(ticket_mechanic_joint_table.c.mechanic_id == 1)
+        )
+        self.assertNoTableScan(statement)
+
+    def test_mechanic_leaderboard_plan(self):
+        # Ranking every mechanic visits every mechanic & assignment, but the counts must
+        # come off the mechanic_id index in order rather than a temp b-tree
+        statement = leaderboard_query(10)
+        self.assertNoTableScan(statement, allowed={"mechanics", "ticket_mechanic"})
+        self.assertNotIn("USE TEMP B-TREE FOR GROUP BY", self.query_plan(statement))
+        
+        # A date window starts from the tickets in range instead
+        self.assertNoTableScan(leaderboard_query(10, since=date(2025, 1, 1), until=date(2025, 12, 31)), allowed={"mechanics"})
+
+    def test_parts_usage_plan(self):
+        # Totals over all time visit every item (& its uses by index), a date window starts from the tickets in range
+        self.assertNoTableScan(parts_usage_query(10), allowed={"inventory"})
+        self.assertNoTableScan(parts_usage_query(10, since=date(2025, 1, 1), until=date(2025, 12, 31)))
+
+    def test_tickets_using_inventory_plan(self):
+        statement = select(TicketInventory.ticket_id).where(TicketInventory.inventory_id.in_([1, 2]))
+        self.assertNoTableScan(statement)
+
+    def test_invoice_line_items_plan(self):
+        statement = select(TicketInventory).where(TicketInventory.ticket_id.in_([1, 2]))
+        self.assertNoTableScan(statement)
@@ -0,0 +1,89 @@
+from app.extensions import db
+from app import create_app
+from app.models import Customer, Ticket, Inventory, TicketInventory, ticket_mechanic_joint_table
+from sqlalchemy import select, func, text
+import unittest
+
+class TestSeed(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app("TestingConfig")
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.drop_all()
+        db.create_all()
+        self.client = self.app.test_client()
+        self.runner = self.app.test_cli_runner()
+
+    def tearDown(self):
+        db.session.remove()
+        db.engine.dispose()
+        self.ctx.pop()
+
+    def seed(self, *args):
+        result = self.runner.invoke(args=["seed", "--customers", "20", "--mechanics", "5", "--inventory", "30",
+                                          "--tickets", "200", "--batch-size", "64", *args])
+        self.assertEqual(result.exit_code, 0, result.output)
+        db.session.remove()
+        return result
+
+    def dump(self):
+        return [
+            db.session.execute(select(table).order_by(*table.primary_key.columns)).all()
+            for table in db.metadata.sorted_tables if table.name != "customers" # one password hash, salted per run
+        ]
+
+    def test_seed(self):
+        result = self.seed()
+        self.assertIn("tickets: 200", result.output)
+
+        self.assertEqual(db.session.scalar(select(func.count()).select_from(Ticket)), 200)
+        self.assertEqual(db.session.scalar(select(func.count(func.distinct(Customer.email)))), 20)
+        links = db.session.execute(select(ticket_mechanic_joint_table)).all()
+        self.assertGreaterEqual(len(links), 200) # at least one mechanic each
+        # parts_total is what the API would have computed
+        totals = dict(db.session.execute(
+            select(TicketInventory.ticket_id, func.sum(TicketInventory.quantity * Inventory.price))
+            .join(Inventory).group_by(TicketInventory.ticket_id)
+        ).tuples().all())
+        for ticket_id, parts_total in db.session.execute(select(Ticket.id, Ticket.parts_total)):
+            self.assertAlmostEqual(parts_total, totals.get(ticket_id, 0), places=2)
+
+        # indexes & search trigger are back, with the seeded tickets indexed
+        names = db.session.scalars(text("SELECT name FROM sqlite_master WHERE type IN ('index', 'trigger')")).all()
+        self.assertIn("ix_tickets_vin", names)
+        self.assertIn("tickets_fts_ai", names)
+        vin = db.session.scalar(select(Ticket.VIN).where(Ticket.id == 1))
+        self.assertGreater(db.session.scalar(text("SELECT count(*) FROM tickets_fts WHERE tickets_fts MATCH :vin"), {"vin": f'"{vin}"'}), 0)
+
+    def test_seed_login(self):
+        self.seed("--tickets", "0")
+        email = db.session.scalar(select(Customer.email).where(Customer.id == 1))
+
+        response = self.client.post('/customers/login', json={"email": email, "password": "password"})
+        self.assertEqual(response.status_code, 200)
+        
+        # test the API's own inserts get ids after the seeded ones
+        response = self.client.post('/customers/', json={"name": "new", "email": "new@example.com", "phone": "1111111111", "password": "x"})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json["id"], 21)
+
+    def test_seed_deterministic(self):
+        self.seed("--seed", "7")
+        first = self.dump()
+        db.drop_all()
+        db.create_all()
+        self.seed("--seed", "7")
+        self.assertEqual(self.dump(), first)
+
+        db.drop_all()
+        db.create_all()
+        self.seed("--seed", "8")
+        self.assertNotEqual(self.dump(), first)
+
+    def test_seed_appends(self):
+        self.seed()
+        self.seed("--seed", "2") # same counts, ids & unique names continue after the first run
+
+        self.assertEqual(db.session.scalar(select(func.count(func.distinct(Customer.email)))), 40)
+        self.assertEqual(db.session.scalar(select(func.count(func.distinct(Inventory.name)))), 60)
+        self.assertEqual(db.session.scalar(select(func.max(Ticket.id))), 400)
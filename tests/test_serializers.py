@@ -0,0 +1,108 @@
+from app import create_app
+from app.extensions import db
+from app.models import Customer, Mechanic, Ticket, Inventory
+from app.blueprints.customers.schemas import customers_schema, customers_serializer
+from app.blueprints.mechanics.schemas import mechanics_schema, mechanics_serializer
+from app.blueprints.tickets.schemas import tickets_schema, tickets_serializer
+from app.blueprints.inventory.schemas import inventory_items_schema, inventory_items_serializer
+from app.utils.serializers import compile_serializer
+from app.utils import json_provider
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import select
+from datetime import date
+import unittest
+
+class TestSerializers(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app("TestingConfig")
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.drop_all()
+        db.create_all()
+        
+        customers = [
+            Customer(name="Zoë Ångström", phone="2159151004", email="zoe@example.com", password="x"),
+            Customer(name='quote " and \\ backslash', phone="", email="q@example.com", password="x")
+        ]
+        db.session.add_all(customers)
+        db.session.add_all([
+            Mechanic(name="mech", email="m@example.com", phone="1", salary=55000.5),
+            Mechanic(name="mech 2", email="m2@example.com", phone="2", salary=0)
+        ])
+        db.session.add_all([
+            Inventory(name="brake pads", price=0.1 + 0.2),
+            Inventory(name="oil", price=1e-7)
+        ])
+        db.session.flush()
+        db.session.add_all([
+            Ticket(VIN="1HGCM82633A004352", service_date=date(2025, 1, 31), service_description="brakes", customer_id=customers[0].id, parts_total=12.34),
+            Ticket(VIN="é", service_date=date(1999, 12, 1), service_description="", customer_id=customers[1].id)
+        ])
+        db.session.commit()
+        
+    def tearDown(self):
+        db.session.remove()
+        db.engine.dispose()
+        self.ctx.pop()
+        
+    def test_serializers_match_schemas(self):
+        for model, schema, serializer in [
+            (Customer, customers_schema, customers_serializer),
+            (Mechanic, mechanics_schema, mechanics_serializer),
+            (Ticket, tickets_schema, tickets_serializer),
+            (Inventory, inventory_items_schema, inventory_items_serializer)
+        ]:
+            rows = db.session.query(model).all()
+            expected, actual = schema.dump(rows), serializer.dump(rows)
+            
+            # test same keys in the same order with the same value types, so any encoder writes the same bytes
+            self.assertEqual([list(row.items()) for row in actual], [list(row.items()) for row in expected])
+            self.assertEqual([[type(v) for v in row.values()] for row in actual], [[type(v) for v in row.values()] for row in expected])
+            self.assertEqual(serializer.jsonify(rows).data, schema.jsonify(rows).data)
+            self.assertEqual(serializer.dump(rows[0], many=False), schema.dump(rows[0], many=False))
+            
+    def test_column_rows_match_entities(self):
+        for model, schema, serializer, url in [
+            (Customer, customers_schema, customers_serializer, "/customers/"),
+            (Mechanic, mechanics_schema, mechanics_serializer, "/mechanics/"),
+            (Inventory, inventory_items_schema, inventory_items_serializer, "/inventory/")
+        ]:
+            rows = db.session.execute(select(*serializer.columns).order_by(model.id)).all()
+            entities = db.session.execute(select(model).order_by(model.id)).scalars().all()
+            self.assertEqual(serializer.jsonify(rows).data, schema.jsonify(entities).data)
+            
+            # test the column-only list endpoints serve exactly what the schema dumps
+            self.assertEqual(self.app.test_client().get(url).json, schema.dump(entities))
+            
+        tickets = db.session.execute(select(Ticket).order_by(Ticket.id)).scalars().all()
+        self.assertEqual(self.app.test_client().get("/tickets/").json["tickets"], tickets_schema.dump(tickets))
+        
+    def test_fields_without_inline_conversion_fall_back(self):
+        from app.blueprints.tickets.schemas import update_ticket_mechanics_response_schema
+        serializer = compile_serializer(update_ticket_mechanics_response_schema)
+        ticket = db.session.get(Ticket, 1)
+        ticket.mechanics = db.session.query(Mechanic).all()
+        self.assertEqual(serializer.dump(ticket), update_ticket_mechanics_response_schema.dump(ticket))
+        
+    @unittest.skipUnless(json_provider.orjson, "orjson not installed")
+    def test_orjson_provider_matches_default_provider(self):
+        payload = {"tickets": tickets_serializer.dump(db.session.query(Ticket).all()), "meta": {"limit": 50, "next_cursor": None, "has_more": False}, "when": date(2025, 1, 31), "price": 0.1 + 0.2}
+        payload["tickets"][1]["service_description"] = "Bremsbeläge 🚗" # non-ASCII text
+        
+        for debug in (True, False):
+            self.app.debug = debug
+            default = DefaultJSONProvider(self.app)
+            fast = json_provider.OrjsonProvider(self.app)
+            self.assertEqual(fast.loads(fast.response(payload).data), default.loads(default.response(payload).data))
+            # test the bytes are the same, but for non-ASCII written as UTF-8 instead of \u escapes
+            default.ensure_ascii = False
+            self.assertEqual(fast.response(payload).data, default.response(payload).data)
+        
+        # test small floats decode the same, though orjson spells the exponent without a leading zero
+        small = {"price": 1e-7}
+        self.assertEqual(json_provider.OrjsonProvider(self.app).response(small).data, b'{"price":1e-7}\n')
+        self.assertEqual(DefaultJSONProvider(self.app).response(small).data, b'{"price":1e-07}\n')
+        self.assertEqual(json_provider.OrjsonProvider(self.app).response(small).json, small)
+            
+        # test values orjson can't encode still go through the stdlib encoder
+        self.assertEqual(json_provider.OrjsonProvider(self.app).response({"big": 2 ** 70}).json, {"big": 2 ** 70})
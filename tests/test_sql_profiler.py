@@ -0,0 +1,114 @@
+from app.models import Mechanic, Ticket, Customer
+from app.extensions import db
+from app import create_app
+from app.utils.sql_profiler import statement_shape
+from config import TestingConfig
+from flask import jsonify
+from sqlalchemy import select
+from unittest.mock import patch
+from datetime import date
+import unittest
+import logging
+import json
+import sys
+import io
+
+class TestSqlProfiler(unittest.TestCase):
+    def setUp(self):
+        with patch.object(TestingConfig, "SQL_PROFILER_ENABLED", True, create=True):
+            self.app = create_app("TestingConfig")
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.drop_all()
+        db.create_all()
+        self.client = self.app.test_client()
+        self.app.add_url_rule('/n-plus-one', view_func=self.n_plus_one_view)
+
+    def n_plus_one_view(self):
+        # one lazy load of mechanics per ticket
+        tickets = db.session.execute(select(Ticket)).scalars().all()
+        return jsonify([len(ticket.mechanics) for ticket in tickets]), 200
+
+    def tearDown(self):
+        db.session.remove()
+        db.engine.dispose()
+        self.ctx.pop()
+
+    def seed_mechanic_with_tickets(self, tickets):
+        customer = Customer(name='c', email='c@example.com', phone='1111111111', password='x')
+        mechanic = Mechanic(name='m', email='m@example.com', phone='2222222222', salary=1)
+        mechanic.tickets = [
+            Ticket(VIN=f'VIN{i:014d}', service_date=date(2024, 1, 1), service_description='oil', customer=customer)
+            for i in range(tickets)
+        ]
+        db.session.add(mechanic)
+        db.session.commit()
+        mechanic_id = mechanic.id
+        db.session.remove()
+        return mechanic_id
+
+    def test_statement_shape(self):
+        self.assertEqual(statement_shape("SELECT a\n  FROM t WHERE id IN (?, ?,  ?)"), "SELECT a FROM t WHERE id IN (?)")
+        self.assertEqual(statement_shape("SELECT a FROM t WHERE id IN (%(id_1)s, %(id_2)s)"), "SELECT a FROM t WHERE id IN (?)")
+        self.assertEqual(statement_shape("SELECT a FROM t WHERE id = ?"), "SELECT a FROM t WHERE id = ?")
+
+    def test_profile_headers(self):
+        self.seed_mechanic_with_tickets(2)
+        response = self.client.get('/mechanics/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["X-SQL-Query-Count"], "1")
+        self.assertGreaterEqual(float(response.headers["X-SQL-Time-Ms"]), 0)
+        self.assertIn('desc="1 queries"', response.headers["Server-Timing"])
+        self.assertNotIn("X-SQL-N-Plus-One", response.headers)
+
+    def test_flags_n_plus_one(self):
+        self.seed_mechanic_with_tickets(6)
+        response = self.client.get('/n-plus-one')
+
+        self.assertEqual(response.status_code, 200)
+        suspects = response.headers.getlist("X-SQL-N-Plus-One")
+        self.assertEqual(len(suspects), 1)
+        self.assertTrue(suspects[0].startswith("6x SELECT"))
+
+    def test_profile_logs(self):
+        # test production (non-debug) apps log instead of adding headers
+        self.app.debug = False
+
+        self.seed_mechanic_with_tickets(6)
+        with self.assertLogs("app.utils.sql_profiler", "INFO") as logs:
+            self.client.get('/mechanics/')
+            response = self.client.get('/n-plus-one')
+
+        self.assertNotIn("X-SQL-Query-Count", response.headers)
+        (list_log, n_plus_one_log) = logs.records
+        self.assertEqual(list_log.levelname, "INFO")
+        self.assertEqual(n_plus_one_log.levelname, "WARNING")
+        record = json.loads(n_plus_one_log.getMessage())
+        self.assertEqual((record["path"], record["status"], record["queries"]), ("/n-plus-one", 200, 7))
+        self.assertEqual(record["n_plus_one"][0]["count"], 6)
+
+    def test_profile_logs_reach_stderr(self):
+        # test with logging left unconfigured (as under gunicorn) every request's record is written
+        profiler_logger = logging.getLogger("app.utils.sql_profiler")
+        saved = (profiler_logger.level, profiler_logger.handlers[:], profiler_logger.propagate)
+        profiler_logger.setLevel(logging.NOTSET)
+        profiler_logger.handlers.clear()
+        stderr = io.StringIO()
+        try:
+            with patch.object(sys, "stderr", stderr), patch.object(logging.getLogger(), "handlers", []), \
+                    patch.object(TestingConfig, "SQL_PROFILER_ENABLED", True, create=True), \
+                    patch.object(TestingConfig, "SQL_PROFILER_OUTPUT", "log", create=True):
+                app = create_app("TestingConfig")
+                app.debug = False
+                with app.app_context():
+                    self.assertEqual(app.test_client().get('/mechanics/').status_code, 200)
+                    db.session.remove()
+                    db.engine.dispose()
+        finally:
+            profiler_logger.setLevel(saved[0])
+            profiler_logger.handlers[:] = saved[1]
+            profiler_logger.propagate = saved[2]
+
+        record = json.loads(stderr.getvalue().splitlines()[0])
+        self.assertEqual((record["event"], record["path"], record["n_plus_one"]), ("sql_profile", "/mechanics/", []))
@@ -1,10 +1,17 @@
 from app.models import Customer, Ticket, Mechanic, Inventory, TicketInventory
 from app.extensions import db
 from app.utils.util import encode_token
+from app.utils import util
+from unittest.mock import patch
 from app import create_app
-from sqlalchemy import select
+from sqlalchemy import select, event, update
+from app.blueprints.tickets import routes as ticket_routes
+from app.blueprints.tickets.schemas import ticket_schema
+from app.utils import search
+from sqlalchemy.dialects import postgresql
 from datetime import date
 import unittest
+import json
 
 class TestTickets(unittest.TestCase):
     def setUp(self):
@@ -46,11 +53,13 @@ class TestTickets(unittest.TestCase):
         # test status_code & quantity
         response = self.client.get('/tickets/')
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.json), len(tickets))
+        self.assertEqual(len(response.json['tickets']), len(tickets))
+        self.assertFalse(response.json['meta']['has_more'])
+        self.assertIsNone(response.json['meta']['next_cursor'])
         
         # test persistence via id
         expected = { t.id for t in tickets }
-        received = { item['id'] for item in response.json }
+        received = { item['id'] for item in response.json['tickets'] }
         self.assertEqual(expected, received)
         
         # test serialization
@@ -60,8 +69,57 @@ class TestTickets(unittest.TestCase):
             if f == 'service_date': # normalize for ORM objects
                 expected = { d.isoformat() for d in expected }
                 
-            received = { item[f] for item in response.json }
+            received = { item[f] for item in response.json['tickets'] }
             self.assertEqual(expected, received)
+        
+        # test streamed NDJSON export of every ticket
+        response = self.client.get('/tickets/', headers={'Accept': 'application/x-ndjson'})
+        self.assertEqual(response.status_code, 200)
+        lines = response.get_data(as_text=True).splitlines()
+        self.assertEqual([json.loads(line)['id'] for line in lines], sorted(t.id for t in tickets))
+    
+    def test_get_tickets_pagination(self):
+        # seed customer & tickets with repeating service dates
+        customer = Customer(name='test_customer', email='test@email.com', phone='2159151004', password='test-password')
+        db.session.add(customer)
+        db.session.flush()
+        
+        tickets = [
+            Ticket(VIN=f"{i}" * 7, service_date=date(2026, 1, 1 + (i % 3)), service_description=f"test description {i}", customer_id=customer.id)
+            for i in range(7)
+        ]
+        db.session.add_all(tickets)
+        db.session.commit()
+        
+        # walk every page for each sort key & compare against the expected ordering
+        expected_orders = {
+            'id': [t.id for t in sorted(tickets, key=lambda t: t.id)],
+            'service_date': [t.id for t in sorted(tickets, key=lambda t: (t.service_date, t.id))]
+        }
+        for sort, expected in expected_orders.items():
+            received, cursor, pages = [], None, 0
+            while True:
+                url = f'/tickets/?limit=3&sort={sort}' + (f'&cursor={cursor}' if cursor else '')
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertLessEqual(len(response.json['tickets']), 3)
+                received.extend(item['id'] for item in response.json['tickets'])
+                pages += 1
+                cursor = response.json['meta']['next_cursor']
+                if not response.json['meta']['has_more']:
+                    break
+            self.assertEqual(received, expected)
+            self.assertEqual(pages, 3)
+        
+        # test page size cap
+        response = self.client.get('/tickets/?limit=100000')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['meta']['limit'], 200)
+        
+        # test invalid arguments
+        self.assertEqual(self.client.get('/tickets/?cursor=not-a-cursor').status_code, 400)
+        self.assertEqual(self.client.get('/tickets/?limit=0').status_code, 400)
+        self.assertEqual(self.client.get('/tickets/?sort=VIN').status_code, 400)
             
     def test_get_ticket(self):
         
@@ -125,6 +183,110 @@ class TestTickets(unittest.TestCase):
         
         self.assertEqual(response.status_code, 200)
         
+    def seed_my_tickets(self, count):
+        """A customer with 'count' tickets, each with a mechanic & a part, plus another customer's ticket"""
+        customer = Customer(name="john pork", phone="2224445555", email="johnpork@gmail.com", password="testpassword")
+        other = Customer(name="jane pork", phone="2224446666", email="janepork@gmail.com", password="testpassword")
+        mechanic = Mechanic(name="mech", email="mech@example.com", phone="1111111111", salary=100000)
+        part = Inventory(name="brake pad", price=25.0)
+        for i in range(count):
+            ticket = Ticket(VIN=f"VIN{i:05d}", service_date=date(2024, 1, 1 + i), service_description=f"job {i}", customer=customer, mechanics=[mechanic])
+            ticket.ticket_inventory_items.append(TicketInventory(inventory_item=part, quantity=i + 1))
+            db.session.add(ticket)
+        db.session.add(Ticket(VIN="OTHER", service_date=date(2024, 1, 1), service_description="other", customer=other))
+        db.session.commit()
+        return {'Authorization': f"Bearer {encode_token(customer.id)}"}, {'Authorization': f"Bearer {encode_token(other.id)}"}
+    
+    def test_get_my_tickets_expand(self):
+        headers, _ = self.seed_my_tickets(5)
+        
+        # test the plain page has no expansions & walks the customer's tickets by service date
+        response = self.client.get("/tickets/my-tickets?limit=3", headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([t['VIN'] for t in response.json['tickets']], ["VIN00000", "VIN00001", "VIN00002"])
+        self.assertNotIn('mechanics', response.json['tickets'][0])
+        self.assertNotIn('parts', response.json['tickets'][0])
+        cursor = response.json['meta']['next_cursor']
+        response = self.client.get(f"/tickets/my-tickets?limit=3&cursor={cursor}", headers=headers)
+        self.assertEqual([t['VIN'] for t in response.json['tickets']], ["VIN00003", "VIN00004"])
+        self.assertFalse(response.json['meta']['has_more'])
+        
+        # test expansions nest the ticket's mechanics & parts
+        response = self.client.get("/tickets/my-tickets?expand=mechanics,parts&limit=1", headers=headers)
+        ticket = response.json['tickets'][0]
+        self.assertEqual(ticket['mechanics'], [{'id': 1, 'name': 'mech'}])
+        self.assertEqual(ticket['parts'], [{'inventory_id': 1, 'name': 'brake pad', 'price': 25.0, 'quantity': 1}])
+        self.assertNotIn('mechanics', self.client.get("/tickets/my-tickets?expand=parts", headers=headers).json['tickets'][0])
+        
+        # test each expansion is one query for the whole page, whatever its size
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, "before_cursor_execute", listener)
+        try:
+            counts = []
+            for limit in (2, 5): # not requested yet, so not cached
+                statements.clear()
+                self.client.get(f"/tickets/my-tickets?expand=mechanics,parts&limit={limit}", headers=headers)
+                counts.append(len(statements))
+        finally:
+            event.remove(db.engine, "before_cursor_execute", listener)
+        self.assertEqual(counts, [3, 3])
+        
+        # test unknown expansions & bad cursors are rejected
+        self.assertEqual(self.client.get("/tickets/my-tickets?expand=invoice", headers=headers).status_code, 400)
+        self.assertEqual(self.client.get("/tickets/my-tickets?cursor=nope", headers=headers).status_code, 400)
+    
+    def test_my_tickets_cache(self):
+        headers, other_headers = self.seed_my_tickets(2)
+        self.assertEqual(self.client.get("/tickets/my-tickets?expand=parts", headers=headers).json['meta']['count'], 2)
+        self.assertEqual(self.client.get("/tickets/my-tickets?expand=parts", headers=other_headers).json['meta']['count'], 1)
+        
+        # test the same URL is cached per customer & another customer's tickets don't purge it
+        with patch.object(db.session, "scalars", side_effect=AssertionError("cache miss")):
+            self.assertEqual(self.client.get("/tickets/my-tickets?expand=parts", headers=headers).json['meta']['count'], 2)
+        other_ticket = db.session.scalar(select(Ticket).where(Ticket.VIN == "OTHER"))
+        other_ticket.service_description = "changed"
+        db.session.commit()
+        with patch.object(db.session, "scalars", side_effect=AssertionError("cache miss")):
+            self.assertEqual(self.client.get("/tickets/my-tickets?expand=parts", headers=headers).json['meta']['count'], 2)
+        
+        # test the customer's own tickets & the expanded rows purge it
+        other_ticket.customer_id = 1 # moving a ticket purges both customers' pages
+        db.session.commit()
+        self.assertEqual(self.client.get("/tickets/my-tickets?expand=parts", headers=headers).json['meta']['count'], 3)
+        self.assertEqual(self.client.get("/tickets/my-tickets?expand=parts", headers=other_headers).json['meta']['count'], 0)
+        db.session.get(Inventory, 1).price = 30.0
+        db.session.commit()
+        parts = self.client.get("/tickets/my-tickets?expand=parts", headers=headers).json['tickets'][0]['parts']
+        self.assertEqual(parts[0]['price'], 30.0)
+        
+    def test_token_verification_cache(self):
+        customer = Customer(name="john pork", phone="2224445555", email="johnpork@gmail.com", password="testpassword")
+        db.session.add(customer)
+        db.session.commit()
+        token = encode_token(customer.id)
+        util._verified_tokens.clear() # an earlier test may have cached the same token
+        
+        # test repeated calls with one token verify its signature once, bare tokens still accepted
+        with patch.object(util.jwt, "decode", wraps=util.jwt.decode) as decode:
+            for headers in [{'Authorization': f"Bearer {token}"}, {'Authorization': f"bearer  {token}"}, {'Authorization': token}]:
+                self.assertEqual(self.client.get("/tickets/my-tickets", headers=headers).status_code, 200)
+            self.assertEqual(decode.call_count, 1)
+        
+        # test tokens sharing a prefix with a cached one are verified on their own
+        for forged in [token[:-1], token + "A", token[:-2] + ("AA" if token[-2:] != "AA" else "BB")]:
+            response = self.client.get("/tickets/my-tickets", headers={'Authorization': f"Bearer {forged}"})
+            self.assertEqual(response.status_code, 401)
+            self.assertEqual(response.json['message'], 'Invalid Token!')
+        
+        # test cached claims are never served once the token's exp has passed
+        exp = util.jwt.get_unverified_claims(token)['exp']
+        with patch.object(util.time, "time", return_value=exp), patch.object(util.jwt, "decode", side_effect=util.jose.exceptions.ExpiredSignatureError) as decode:
+            response = self.client.get("/tickets/my-tickets", headers={'Authorization': f"Bearer {token}"})
+            self.assertEqual(response.status_code, 401)
+            self.assertEqual(response.json['message'], 'Token has expired!')
+            self.assertEqual(decode.call_count, 1)
+        
     def test_create_ticket(self):
         
         # seed customer
@@ -174,6 +336,32 @@ class TestTickets(unittest.TestCase):
         response = self.client.post('/tickets/', json={})
         self.assertEqual(response.status_code, 400)
         
+    def test_update_ticket_concurrent_change(self):
+        customer = Customer(name='test0', phone='1234567890', email='test@example.com', password='testpassword')
+        ticket = Ticket(VIN='1111111', service_date=date.today(), service_description='example description', customer=customer)
+        db.session.add(ticket)
+        db.session.commit()
+        ticket_id, customer_id = ticket.id, customer.id
+        
+        # another request bumps the ticket (e.g. adding parts re-totals it) after this one loaded it
+        load = ticket_schema.load
+        def concurrent_bump(data):
+            with db.engine.begin() as connection:
+                connection.execute(update(Ticket).where(Ticket.id == ticket_id).values(parts_total=10, version=Ticket.version + 1))
+            return load(data)
+        
+        payload = {'VIN': '2222222', 'service_date': '2026-01-07', 'service_description': 'updated', 'customer_id': customer_id}
+        headers = {'Authorization': f'Bearer {encode_token(customer_id)}'}
+        with patch.object(ticket_routes.ticket_schema, "load", side_effect=concurrent_bump):
+            response = self.client.put(f'/tickets/{ticket_id}', json=payload, headers=headers)
+        
+        # test the lost race is a 409 that leaves the other write in place, & a retry succeeds
+        self.assertEqual(response.status_code, 409)
+        db.session.expire_all()
+        self.assertEqual(db.session.get(Ticket, ticket_id).VIN, '1111111')
+        self.assertEqual(db.session.get(Ticket, ticket_id).parts_total, 10)
+        self.assertEqual(self.client.put(f'/tickets/{ticket_id}', json=payload, headers=headers).status_code, 200)
+        
     def test_update_ticket(self):
         # NOTE: Partial test coverage
         
@@ -264,6 +452,58 @@ class TestTickets(unittest.TestCase):
         self.assertIn(m2, updated_ticket2.mechanics)
         self.assertNotIn(m1, updated_ticket2.mechanics)
         
+        # unknown mechanic ids are reported instead of silently skipped
+        payload_unknown = {"add_mechanic_ids": [m1.id, 9999], "remove_mechanic_ids": [8888]}
+        resp3 = self.client.put(f"/tickets/{ticket.id}/update-mechanics", json=payload_unknown)
+        self.assertEqual(resp3.status_code, 200)
+        self.assertEqual(resp3.json["unknown_mechanic_ids"], [8888, 9999])
+        self.assertEqual(sorted(m["id"] for m in resp3.json["mechanics"]), sorted([m1.id, m2.id]))
+        
+        # unknown ticket
+        resp4 = self.client.put("/tickets/999999/update-mechanics", json=payload_add)
+        self.assertEqual(resp4.status_code, 404)
+    
+    def test_bulk_update_ticket_mechanics(self):
+        # seed customer, tickets & mechanics
+        customer = Customer(name='test0', phone='1111111111', email='me0@ex.com', password='testpass0')
+        db.session.add(customer)
+        db.session.flush()
+        
+        t1 = Ticket(VIN='1111111', service_date=date.today(), service_description='one', customer_id=customer.id)
+        t2 = Ticket(VIN='2222222', service_date=date.today(), service_description='two', customer_id=customer.id)
+        m1 = Mechanic(name='m1', email='m1@me.com', phone='9999999999', salary=100000)
+        m2 = Mechanic(name='m2', email='m2@me.com', phone='8888888888', salary=120000)
+        t1.mechanics.append(m1)
+        db.session.add_all([t1, t2, m1, m2])
+        db.session.commit()
+        
+        # move m1 from t1 to t2, put m2 on both, reference unknown ids
+        payload = {"updates": [
+            {"ticket_id": t1.id, "add_mechanic_ids": [m2.id], "remove_mechanic_ids": [m1.id]},
+            {"ticket_id": t2.id, "add_mechanic_ids": [m1.id, m2.id, 9999], "remove_mechanic_ids": []},
+            {"ticket_id": 999999, "add_mechanic_ids": [m1.id], "remove_mechanic_ids": []}
+        ]}
+        response = self.client.put("/tickets/update-mechanics", json=payload)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["unknown_ticket_ids"], [999999])
+        self.assertEqual(response.json["added_count"], 3)
+        self.assertEqual(response.json["removed_count"], 1)
+        
+        results = {r["ticket_id"]: r for r in response.json["results"]}
+        self.assertEqual(results[t1.id]["removed_mechanic_ids"], [m1.id])
+        self.assertEqual(results[t2.id]["added_mechanic_ids"], sorted([m1.id, m2.id]))
+        self.assertEqual(results[t2.id]["unknown_mechanic_ids"], [9999])
+        
+        # test persistence
+        db.session.expire_all()
+        self.assertEqual({m.id for m in db.session.get(Ticket, t1.id).mechanics}, {m2.id})
+        self.assertEqual({m.id for m in db.session.get(Ticket, t2.id).mechanics}, {m1.id, m2.id})
+        
+        # test duplicate ticket ids & malformed payloads
+        duplicate = {"updates": [payload["updates"][0], payload["updates"][0]]}
+        self.assertEqual(self.client.put("/tickets/update-mechanics", json=duplicate).status_code, 400)
+        self.assertEqual(self.client.put("/tickets/update-mechanics", json={"updates": []}).status_code, 400)
+        
     def test_assign_mechanic(self):
         # NOTE: Partial test coverage
 
@@ -496,9 +736,190 @@ class TestTickets(unittest.TestCase):
         self.assertEqual(row_map[inv1.id], 2)
         self.assertEqual(row_map[inv2.id], 1)  # original quantity remains unchanged by your endpoint
         self.assertEqual(row_map[inv3.id], 1)
+    
+    def test_get_ticket_invoice(self):
+        # seed customer, ticket & inventory
+        customer = Customer(name='test_customer', email='test@email.com', phone='2159151004', password='test-password')
+        db.session.add(customer)
+        db.session.flush()
+        ticket = Ticket(VIN="1111111", service_date=date(2026, 1, 6), service_description="brakes", customer_id=customer.id)
+        pads = Inventory(name="brake pads", price=40.0)
+        rotor = Inventory(name="rotor", price=75.5)
+        db.session.add_all([ticket, pads, rotor])
+        db.session.commit()
         
+        # parts_total is maintained by add_inventory
+        payload = {"add_inventory_items": [{"inventory_id": pads.id, "quantity": 2}, {"inventory_id": rotor.id, "quantity": 1}]}
+        self.client.post(f"/tickets/{ticket.id}/inventory", json=payload)
         
+        response = self.client.get(f"/tickets/{ticket.id}/invoice")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["parts_total"], 155.5)
+        self.assertEqual(response.json["item_count"], 3)
+        line_totals = {item["name"]: item["line_total"] for item in response.json["line_items"]}
+        self.assertEqual(line_totals, {"brake pads": 80.0, "rotor": 75.5})
         
+        # price changes & deleted parts re-total the ticket
+        self.client.put(f"/inventory/{pads.id}", json={"name": "brake pads", "price": 50.0})
+        self.assertEqual(self.client.get(f"/tickets/{ticket.id}/invoice").json["parts_total"], 175.5)
+        self.client.delete(f"/inventory/{rotor.id}")
+        self.assertEqual(self.client.get(f"/tickets/{ticket.id}/invoice").json["parts_total"], 100.0)
         
+        # test ticket not found
+        response = self.client.get("/tickets/999999/invoice")
+        self.assertEqual(response.status_code, 404)
+    
+    def test_get_ticket_invoices(self):
+        # seed customer, tickets & parts directly, leaving parts_total stale
+        customer = Customer(name='test_customer', email='test@email.com', phone='2159151004', password='test-password')
+        db.session.add(customer)
+        db.session.flush()
+        tickets = [Ticket(VIN=f"{i}" * 7, service_date=date.today(), service_description="parts", customer_id=customer.id) for i in range(3)]
+        oil = Inventory(name="oil", price=12.5)
+        db.session.add_all(tickets + [oil])
+        db.session.flush()
+        db.session.add_all([TicketInventory(ticket_id=t.id, inventory_id=oil.id, quantity=i + 1) for i, t in enumerate(tickets)])
+        db.session.commit()
+        
+        # repair command recomputes every total in one statement
+        result = self.app.test_cli_runner().invoke(args=["tickets", "recompute-totals"])
+        self.assertIn("Recomputed parts_total for 3 tickets", result.output)
         
-        
\ No newline at end of file
+        ids = ",".join(str(t.id) for t in tickets[:2])
+        response = self.client.get(f"/tickets/invoices?ids={ids},999999")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([i["ticket_id"] for i in response.json["invoices"]], [tickets[0].id, tickets[1].id])
+        self.assertEqual([i["parts_total"] for i in response.json["invoices"]], [12.5, 25.0])
+        self.assertEqual(response.json["missing_ids"], [999999])
+        
+        # test malformed ids
+        self.assertEqual(self.client.get("/tickets/invoices?ids=a,b").status_code, 400)
+        self.assertEqual(self.client.get("/tickets/invoices").status_code, 400)
+    
+    def test_create_tickets_bulk(self):
+        # seed customer
+        customer = Customer(name='test_customer', email='test@email.com', phone='2159151004', password='test-password')
+        db.session.add(customer)
+        db.session.commit()
+        
+        payload = [
+            {'VIN': '1111111', 'service_date': '2026-01-06', 'service_description': 'oil change', 'customer_id': customer.id},
+            {'VIN': '2222222', 'service_date': '2026-01-06', 'service_description': 'no customer', 'customer_id': 9999},
+            {'service_date': '2026-01-06', 'service_description': 'missing VIN', 'customer_id': customer.id},
+            {'VIN': '3333333', 'service_date': '2026-01-07', 'service_description': 'tire rotation', 'customer_id': customer.id}
+        ]
+        response = self.client.post('/tickets/bulk', json=payload)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json['created_count'], 2)
+        self.assertEqual(response.json['error_count'], 2)
+        
+        # test per-row results keep payload order
+        results = response.json['results']
+        self.assertEqual([r['status'] for r in results], ['created', 'error', 'error', 'created'])
+        self.assertIn('customer_id', results[1]['errors'])
+        self.assertIn('VIN', results[2]['errors'])
+        
+        # test persistence & id mapping
+        for index in (0, 3):
+            created = db.session.get(Ticket, results[index]['id'])
+            self.assertEqual(created.VIN, payload[index]['VIN'])
+        
+        # test nothing valid & malformed bodies
+        response = self.client.post('/tickets/bulk', json=[payload[1]])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json['created_count'], 0)
+        self.assertEqual(self.client.post('/tickets/bulk', json=[]).status_code, 400)
+        self.assertEqual(self.client.post('/tickets/bulk', json=payload[0]).status_code, 400)
+    
+    def test_search_tickets(self):
+        # seed customer & tickets
+        customer = Customer(name='test_customer', email='test@email.com', phone='2159151004', password='test-password')
+        db.session.add(customer)
+        db.session.flush()
+        
+        tickets = [
+            Ticket(VIN="1HGBH41JXMN109186", service_date=date.today(), service_description="oil change", customer_id=customer.id),
+            Ticket(VIN="2T1BURHE5JC034512", service_date=date.today(), service_description="front brake pads and brake rotors", customer_id=customer.id),
+            Ticket(VIN="3FA6P0H72HR123456", service_date=date.today(), service_description="replaced rear brakes", customer_id=customer.id),
+            Ticket(VIN="5YJSA1E26HF000001", service_date=date.today(), service_description="tire rotation", customer_id=customer.id)
+        ]
+        db.session.add_all(tickets)
+        db.session.commit()
+        
+        # test stemmed matches, best match first
+        response = self.client.get('/tickets/search?q=brake')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([t['id'] for t in response.json['tickets']], [tickets[1].id, tickets[2].id])
+        
+        # test VIN prefix & keyset pagination across pages
+        response = self.client.get('/tickets/search?q=1HGBH41')
+        self.assertEqual([t['id'] for t in response.json['tickets']], [tickets[0].id])
+        first = self.client.get('/tickets/search?q=brake&limit=1')
+        self.assertTrue(first.json['meta']['has_more'])
+        second = self.client.get(f"/tickets/search?q=brake&limit=1&cursor={first.json['meta']['next_cursor']}")
+        self.assertEqual([t['id'] for t in second.json['tickets']], [tickets[2].id])
+        self.assertFalse(second.json['meta']['has_more'])
+        
+        # test index follows updates
+        self.client.put(f'/tickets/{tickets[3].id}', json={
+            'VIN': tickets[3].VIN, 'service_date': '2026-01-07', 'service_description': 'brake fluid flush', 'customer_id': customer.id
+        }, headers={'Authorization': f'Bearer {encode_token(customer.id)}'})
+        response = self.client.get('/tickets/search?q=fluid')
+        self.assertEqual([t['id'] for t in response.json['tickets']], [tickets[3].id])
+        self.assertEqual(self.client.get('/tickets/search?q=tire').json['tickets'], [])
+        
+        # test FTS syntax in user input is treated as text & empty queries are rejected
+        self.assertEqual(self.client.get('/tickets/search?q=brake" OR "').status_code, 200)
+        self.assertEqual(self.client.get('/tickets/search?q=').status_code, 400)
+    
+    def test_search_expressions(self):
+        # test both backends quote user input & prefix match every term
+        self.assertEqual(search.fts5_match_expression('brak "pads'), '"brak"* """pads"*')
+        self.assertEqual(search.tsquery_expression("brak pad's a\\b"), "'brak':* & 'pad''s':* & 'a\\\\b':*")
+        
+        # test Postgres builds its tsquery from those terms, not websearch_to_tsquery (no prefix matching)
+        ranked = search.ranked_ticket_ids("postgresql", "brak 1HGBH41")
+        compiled = ranked.element.compile(dialect=postgresql.dialect())
+        self.assertIn("to_tsquery(", str(compiled))
+        self.assertNotIn("websearch_to_tsquery", str(compiled))
+        self.assertIn("'brak':* & '1HGBH41':*", compiled.params.values())
+    
+    def test_get_ticket_conditional(self):
+        customer = Customer(name='test_customer', email='test@email.com', phone='2159151004', password='test-password')
+        db.session.add(customer)
+        db.session.flush()
+        ticket = Ticket(VIN="1111111", service_date=date.today(), service_description="oil change", customer_id=customer.id)
+        db.session.add(ticket)
+        db.session.commit()
+        
+        # test first fetch carries an ETag & a matching If-None-Match gets an empty 304
+        response = self.client.get(f'/tickets/{ticket.id}')
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers['ETag']
+        self.assertNotIn('version', response.json)
+        
+        response = self.client.get(f'/tickets/{ticket.id}', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+        self.assertEqual(response.headers['ETag'], etag)
+        
+        # test page ETags the same way
+        page_etag = self.client.get('/tickets/').headers['ETag']
+        self.assertEqual(self.client.get('/tickets/', headers={'If-None-Match': page_etag}).status_code, 304)
+        
+        # test any change to the row, including bulk parts_total upkeep, changes both ETags
+        ticket.service_description = "oil change and tire rotation"
+        db.session.commit()
+        response = self.client.get(f'/tickets/{ticket.id}', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+        self.assertEqual(self.client.get('/tickets/', headers={'If-None-Match': page_etag}).status_code, 200)
+        
+        etag = response.headers['ETag']
+        inventory = Inventory(name="oil filter", price=8.5)
+        db.session.add(inventory)
+        db.session.commit()
+        self.client.post(f'/tickets/{ticket.id}/inventory', json={"add_inventory_items": [{"inventory_id": inventory.id, "quantity": 1}]})
+        response = self.client.get(f'/tickets/{ticket.id}', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['parts_total'], 8.5)
@@ -0,0 +1,143 @@
+from app.utils import two_tier_cache
+from app.utils.two_tier_cache import TwoTierCache
+from flask import Flask
+from unittest.mock import patch
+from collections import defaultdict
+import tempfile
+import unittest
+import os
+
+class FakeRedis:
+    """In-process stand-in for the publish() & pubsub() calls RedisInvalidationBus makes, delivering synchronously"""
+    def __init__(self):
+        self.subscriptions = defaultdict(list) # channel -> [(handler, exception_handler, pubsub)]
+
+    def publish(self, channel, message):
+        for handler, _, _ in list(self.subscriptions[channel]):
+            handler({"type": "message", "channel": channel.encode(), "data": message.encode()})
+        return len(self.subscriptions[channel])
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return FakePubSub(self)
+
+    def disconnect(self):
+        """Every listener loses its connection, as when the server restarts"""
+        for subscriptions in self.subscriptions.values():
+            for _, exception_handler, pubsub in subscriptions:
+                exception_handler(ConnectionError("connection lost"), pubsub, None)
+
+class FakePubSub:
+    def __init__(self, server):
+        self.server = server
+        self.handlers = {}
+
+    def subscribe(self, **handlers):
+        self.handlers.update(handlers)
+
+    def run_in_thread(self, sleep_time, daemon=False, exception_handler=None):
+        for channel, handler in self.handlers.items():
+            self.server.subscriptions[channel].append((handler, exception_handler, self))
+
+# Two TwoTierCache instances over one shared L2 stand in for two gunicorn workers
+class TestTwoTierCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.config = {
+            "CACHE_DIR": os.path.join(self.tmp.name, "cache"),
+            "CACHE_THRESHOLD": 500,
+            "CACHE_IGNORE_ERRORS": False,
+            "CACHE_KEY_PREFIX": "test_",
+            "CACHE_L1_MAX_ENTRIES": 3
+        }
+        self.worker_a = self.make_worker()
+        self.worker_b = self.make_worker()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_worker(self, **config):
+        return TwoTierCache.factory(Flask(__name__), {**self.config, **config}, [], {"default_timeout": 300})
+
+    def test_reads_fall_through_to_shared_l2(self):
+        self.worker_a.set("customer", {"name": "a"})
+        self.assertEqual(self.worker_b.get("customer"), {"name": "a"})
+        self.assertEqual(self.worker_b.l1.get("customer"), {"name": "a"})
+        self.assertEqual(self.worker_b.get_many("customer", "missing"), [{"name": "a"}, None])
+
+    def test_writes_invalidate_other_workers_l1(self):
+        self.worker_a.set("tag/customer:1", "gen-1")
+        self.assertEqual(self.worker_b.get("tag/customer:1"), "gen-1")
+
+        # test set, set_many, delete & clear on one worker are seen by the other's next read
+        self.worker_a.set("tag/customer:1", "gen-2")
+        self.assertEqual(self.worker_b.get("tag/customer:1"), "gen-2")
+
+        self.worker_a.set_many({"tag/customer:1": "gen-3", "tag/customers": "gen-1"})
+        self.assertEqual(self.worker_b.get_many("tag/customer:1", "tag/customers"), ["gen-3", "gen-1"])
+
+        self.worker_a.delete("tag/customer:1")
+        self.assertIsNone(self.worker_b.get("tag/customer:1"))
+
+        self.worker_a.clear()
+        self.assertIsNone(self.worker_b.get("tag/customers"))
+
+    def test_l1_is_bounded_lru_of_copies(self):
+        for key in ["a", "b", "c", "d"]:
+            self.worker_a.set(key, [key])
+        self.assertIsNone(self.worker_a.l1.get("a"))
+        self.assertEqual(self.worker_a.get("a"), ["a"]) # still served from L2
+
+        # test callers can't mutate cached values in place
+        self.worker_a.get("d").append("mutated")
+        self.assertEqual(self.worker_a.get("d"), ["d"])
+
+    def test_journal_rotation_drops_l1(self):
+        self.worker_a.set("key", 1)
+        self.assertEqual(self.worker_b.get("key"), 1)
+
+        # test a restarted journal makes readers distrust their whole L1
+        with patch.object(two_tier_cache, "JOURNAL_MAX_BYTES", 0):
+            self.worker_a.set("other", 1)
+        self.worker_b.l2.set("key", 2) # a write whose message was lost with the old journal
+        self.assertEqual(self.worker_b.get("key"), 2)
+
+    def test_redis_invalidation_bus(self):
+        # L2 stays the shared file cache, the L1 invalidations go over a fake Redis pub/sub
+        server = FakeRedis()
+        with patch.object(two_tier_cache, "redis_client", return_value=server):
+            worker_a = self.make_worker(CACHE_REDIS_URL="redis://stand-in", CACHE_L2_TYPE="FileSystemCache")
+            worker_b = self.make_worker(CACHE_REDIS_URL="redis://stand-in", CACHE_L2_TYPE="FileSystemCache")
+        self.assertIsInstance(worker_a.bus, two_tier_cache.RedisInvalidationBus)
+        worker_a.get("key") # starts each worker's listener
+        worker_b.get("key")
+
+        worker_a.set("key", 1)
+        self.assertEqual(worker_b.get("key"), 1)
+        worker_a.set("key", 2)
+        self.assertEqual(worker_b.get("key"), 2)
+        worker_b.delete("key")
+        self.assertIsNone(worker_a.get("key"))
+
+        # test a worker ignores its own messages but still drops everything on a lost connection
+        worker_a.set("other", 1)
+        self.assertEqual(worker_a.l1.get("other"), 1)
+        worker_b.l2.set("other", 2) # a write whose message was lost while disconnected
+        with patch.object(two_tier_cache.time, "sleep"), self.assertLogs(two_tier_cache.logger, "WARNING"):
+            server.disconnect()
+        self.assertEqual(worker_a.get("other"), 2)
+
+    @unittest.skipUnless(os.getenv("TEST_REDIS_URL"), "set TEST_REDIS_URL to a Redis-protocol server")
+    def test_redis_l2(self):
+        import time
+
+        worker_a = self.make_worker(CACHE_REDIS_URL=os.getenv("TEST_REDIS_URL"))
+        worker_b = self.make_worker(CACHE_REDIS_URL=os.getenv("TEST_REDIS_URL"))
+        worker_a.clear()
+        worker_b.get("key") # starts worker_b's listener
+        time.sleep(0.5)
+
+        worker_a.set("key", 1)
+        self.assertEqual(worker_b.get("key"), 1)
+        worker_a.set("key", 2)
+        time.sleep(0.5) # pub/sub delivery is asynchronous
+        self.assertEqual(worker_b.get("key"), 2)